@@ -1,585 +1,147 @@
+"""EC2 rectangular RC beam design tool.
+
+Importing this module only loads the Qt-free design engine; the PyQt5 window
+(RCBeamDesignApp) is imported on first access. Run it as a script to open the
+window, with 'batch' for the headless batch runner, 'report' for a PDF report
+of a beam schedule, 'sweep' for parametric sweeps and design charts, 'bench'
+for the benchmark suite, 'project' for project files holding many beams,
+'serve' for the local HTTP/JSON design service, or with --profile-startup to
+print how long each startup phase takes.
+
+--profile PATH records the timing spans and counters of ec2_profile for the
+whole run, window or subcommand, and writes them to PATH as JSON on exit.
+--profile-capture adds a cProfile and tracemalloc capture (the report goes to
+stderr when no PATH is given). In the window, Ctrl+Shift+D opens the same
+report in the diagnostics panel.
+"""
 import sys
-import math
-import matplotlib.pyplot as plt
-from matplotlib.patches import Rectangle, Circle
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-from PyQt5.QtWidgets import (QApplication, QWidget, QVBoxLayout, QHBoxLayout, QFormLayout, QLineEdit, QLabel, QPushButton, QGroupBox, QGridLayout, QTextEdit, QFileDialog, QComboBox)
-from fpdf import FPDF
-import tempfile  # Added this import
-import os  # Also add os if it isn't already imported for file removal
-from PIL import Image  # Ensure this is imported for loading image dimensions
-
-# Define concrete strength classes as per Eurocode 2
-CONCRETE_CLASSES = {
-    1: 'C12/15', 2: 'C16/20', 3: 'C20/25', 4: 'C25/30',
-    5: 'C30/37', 6: 'C32/40', 7: 'C35/45', 8: 'C40/50',
-    9: 'C45/55', 10: 'C50/60', 11: 'C55/67', 12: 'C60/75'
-}
-CONCRETE_STRENGTHS = {
-    'C12/15': 12, 'C16/20': 16, 'C20/25': 20, 'C25/30': 25,
-    'C30/37': 30, 'C32/40': 32, 'C35/45': 35, 'C40/50': 40,
-    'C45/55': 45, 'C50/60': 50, 'C55/67': 55, 'C60/75': 60
-}
-
-# Modulus of Elasticity for Reinforcement (Default = 200 kN/mm²)
-E_s = 200 * 1e3
-
-class RCBeamDesignApp(QWidget):
-    def __init__(self):
-        super().__init__()
-        self.init_ui()
-
-    def init_ui(self):
-        main_layout = QVBoxLayout()
-
-        # Top left: Diagram of the rectangular section
-        top_layout = QHBoxLayout()
-        self.section_figure = plt.figure(figsize=(4, 4))  # Adjusted figure size
-        self.section_canvas = FigureCanvas(self.section_figure)
-        self.section_canvas.setMinimumWidth(300)  # Add minimum width
-        top_layout.addWidget(self.section_canvas)
-
-        # Material and Section Details next to the diagram
-        details_layout = QHBoxLayout()
-
-        # Material Details
-        material_group_box = QGroupBox("Material Details Input")
-        material_form_layout = QFormLayout()
-        self.concrete_class_input = QComboBox()
-        self.concrete_class_input.addItems(list(CONCRETE_CLASSES.values()))
-        self.concrete_class_input.setMaximumWidth(150)
-        self.f_yk_main_input = QLineEdit('500')
-        self.f_yk_shear_input = QLineEdit('500')
-        self.gamma_c_input = QLineEdit('1.5')
-        self.alpha_cc_input = QLineEdit('0.85')
-        self.gamma_s_input = QLineEdit('1.15')
-        material_form_layout.addRow(QLabel('Concrete Class:'), self.create_input_with_unit(self.concrete_class_input, ''))
-        material_form_layout.addRow(QLabel('Main Reinforcement Strength:'), self.create_input_with_unit(self.f_yk_main_input, 'N/mm²'))
-        material_form_layout.addRow(QLabel('Shear Reinforcement Strength:'), self.create_input_with_unit(self.f_yk_shear_input, 'N/mm²'))
-        material_form_layout.addRow(QLabel('Partial Factor for Concrete (γ_c):'), self.create_input_with_unit(self.gamma_c_input, ''))
-        material_form_layout.addRow(QLabel('Compressive Strength Coefficient (α_cc):'), self.create_input_with_unit(self.alpha_cc_input, ''))
-        material_form_layout.addRow(QLabel('Partial Factor for Steel (γ_s):'), self.create_input_with_unit(self.gamma_s_input, ''))
-        material_group_box.setLayout(material_form_layout)
-        details_layout.addWidget(material_group_box)
-
-        # Section Details
-        section_group_box = QGroupBox("Section Details Input")
-        section_form_layout = QFormLayout()
-        self.min_cover_input = QLineEdit('30')
-        self.cover_dev_input = QLineEdit('10')
-        self.section_depth_input = QLineEdit('500')
-        self.section_width_input = QLineEdit('300')
-        self.rdp_input = QLineEdit('15')
-        section_form_layout.addRow(QLabel('Minimum Cover:'), self.create_input_with_unit(self.min_cover_input, 'mm'))
-        section_form_layout.addRow(QLabel('Cover Deviation:'), self.create_input_with_unit(self.cover_dev_input, 'mm'))
-        section_form_layout.addRow(QLabel('Section Depth:'), self.create_input_with_unit(self.section_depth_input, 'mm'))
-        section_form_layout.addRow(QLabel('Section Width:'), self.create_input_with_unit(self.section_width_input, 'mm'))
-        section_form_layout.addRow(QLabel('Redistribution Percentage:'), self.create_input_with_unit(self.rdp_input, '%'))
-        section_group_box.setLayout(section_form_layout)
-        details_layout.addWidget(section_group_box)
-
-        # Design Loading Details
-        design_load_group_box = QGroupBox("Design Loading Input")
-        design_load_form_layout = QFormLayout()
-        self.sls_m_ed_input = QLineEdit('0')
-        self.uls_m_ed_input = QLineEdit('500')
-        self.v_ed_input = QLineEdit('0')
-        self.v_ef_input = QLineEdit('0')
-        self.t_ed_input = QLineEdit('0')
-        self.t_ef_input = QLineEdit('0')
-        design_load_form_layout.addRow(QLabel('SLS M_Ed:'), self.create_input_with_unit(self.sls_m_ed_input, 'kNm'))
-        design_load_form_layout.addRow(QLabel('ULS M_Ed:'), self.create_input_with_unit(self.uls_m_ed_input, 'kNm'))
-        design_load_form_layout.addRow(QLabel('V_Ed:'), self.create_input_with_unit(self.v_ed_input, 'kN'))
-        design_load_form_layout.addRow(QLabel('V_Ef:'), self.create_input_with_unit(self.v_ef_input, 'kN'))
-        design_load_form_layout.addRow(QLabel('T_Ed:'), self.create_input_with_unit(self.t_ed_input, 'kN'))
-        design_load_form_layout.addRow(QLabel('T_Ef:'), self.create_input_with_unit(self.t_ef_input, 'kN'))
-        design_load_group_box.setLayout(design_load_form_layout)
-        details_layout.addWidget(design_load_group_box)
-
-        top_layout.addLayout(details_layout)
-        main_layout.addLayout(top_layout)
-
-        # Row 3: Reinforcement and Shear Reinforcement Details
-        reinforcement_layout = QHBoxLayout()
-
-        # Tension Reinforcement Details
-        tension_group_box = QGroupBox("Tension Reinforcement Details Input")
-        tension_form_layout = QGridLayout()
-        tension_form_layout.addWidget(QLabel("Layer"), 0, 0)
-        tension_form_layout.addWidget(QLabel("Diameter"), 0, 1)
-        tension_form_layout.addWidget(QLabel("Number of Bars"), 0, 2)
-
-        self.tension_layers_input = []
-        for i in range(1, 7):
-            tension_form_layout.addWidget(QLabel(f"Layer {i}"), i, 0)
-            tension_diameter_input = QComboBox()
-            tension_diameter_input.addItems([""])
-            tension_diameter_input.addItems(['10', '12', '13', '16', '20', '25', '32', '40', '55'])
-            tension_diameter_input.setFixedWidth(60)  # Set width to match existing input field size
-            tension_number_input = QLineEdit('')
-            tension_number_input.setFixedWidth(60)  # Set width to match existing input field size
-            tension_form_layout.addWidget(tension_diameter_input, i, 1)
-            tension_form_layout.addWidget(tension_number_input, i, 2)
-            self.tension_layers_input.append((tension_diameter_input, tension_number_input))
-
-        tension_group_box.setLayout(tension_form_layout)
-        reinforcement_layout.addWidget(tension_group_box)
-
-        # Compression Reinforcement Details
-        compression_group_box = QGroupBox("Compression Reinforcement Details Input")
-        compression_form_layout = QGridLayout()
-        compression_form_layout.addWidget(QLabel("Layer"), 0, 0)
-        compression_form_layout.addWidget(QLabel("Diameter"), 0, 1)
-        compression_form_layout.addWidget(QLabel("Number of Bars"), 0, 2)
-
-        self.compression_layers_input = []
-        for i in range(1, 7):
-            compression_form_layout.addWidget(QLabel(f"Layer {i}"), i, 0)
-            compression_diameter_input = QComboBox()
-            compression_diameter_input.addItems([""])
-            compression_diameter_input.addItems(['10', '12', '13', '16', '20', '25', '32', '40', '55'])
-            compression_diameter_input.setFixedWidth(60)  # Set width to match existing input field size
-            compression_number_input = QLineEdit('')
-            compression_number_input.setFixedWidth(60)  # Set width to match existing input field size
-            compression_form_layout.addWidget(compression_diameter_input, i, 1)
-            compression_form_layout.addWidget(compression_number_input, i, 2)
-            self.compression_layers_input.append((compression_diameter_input, compression_number_input))
-
-        compression_group_box.setLayout(compression_form_layout)
-        reinforcement_layout.addWidget(compression_group_box)
-
-        # Shear Reinforcement Details
-        shear_group_box = QGroupBox("Shear Reinforcement Details Input")
-        shear_form_layout = QFormLayout()
-        self.d_w_input = QComboBox()
-        self.d_w_input.addItem("")  # Add an empty item as the default selection
-        self.d_w_input.addItems(['6', '8', '10', '12', '13', '16', '20', '25'])
-        self.d_w_input.setFixedWidth(60)  # Set width to match existing input field size
-        self.n_l_input = QLineEdit('2')
-        self.s_input = QLineEdit('150')
-
-        shear_form_layout.addRow(QLabel('Shear Reinforcement Diameter:'), self.create_input_with_unit(self.d_w_input, 'mm'))
-        shear_form_layout.addRow(QLabel('Number of Legs:'), self.create_input_with_unit(self.n_l_input, ''))
-        shear_form_layout.addRow(QLabel('Spacing:'), self.create_input_with_unit(self.s_input, 'mm'))
-        shear_group_box.setLayout(shear_form_layout)
-        reinforcement_layout.addWidget(shear_group_box)
-
-        main_layout.addLayout(reinforcement_layout)
-
-        # Row 4: Calculate and Save PDF Buttons
-        buttons_layout = QHBoxLayout()
-        self.calculate_button = QPushButton('Calculate')
-        self.calculate_button.clicked.connect(self.calculate)
-        buttons_layout.addWidget(self.calculate_button)
-
-        self.save_pdf_button = QPushButton('Save PDF')
-        self.save_pdf_button.clicked.connect(self.save_pdf)
-        buttons_layout.addWidget(self.save_pdf_button)
-        main_layout.addLayout(buttons_layout)
-
-        # Row 5: Output Screen
-        self.result_display = QTextEdit()
-        self.result_display.setReadOnly(True)
-        main_layout.addWidget(self.result_display)
-
-        self.setLayout(main_layout)
-        self.setWindowTitle("RC Beam Design Input")
-        self.setGeometry(100, 100, 1200, 800)
-
-    def create_input_with_unit(self, input_field, unit):
-        layout = QHBoxLayout()
-        layout.addWidget(input_field)
-        layout.addWidget(QLabel(unit))
-        container = QWidget()
-        container.setLayout(layout)
-        return container
-
-
-    def calculate(self):
-        try:
-            # Get input values from the UI
-            f_ck = CONCRETE_STRENGTHS[self.concrete_class_input.currentText()]  # Get concrete class directly from ComboBox
-            f_yk_main = float(self.f_yk_main_input.text())
-            f_yk_shear = float(self.f_yk_shear_input.text())
-            gamma_c = float(self.gamma_c_input.text())
-            alpha_cc = float(self.alpha_cc_input.text())
-            gamma_s = float(self.gamma_s_input.text())
-            min_cover = float(self.min_cover_input.text())
-            cover_dev = float(self.cover_dev_input.text())
-            c_nom = min_cover + cover_dev
-            h = float(self.section_depth_input.text())
-            b = float(self.section_width_input.text())
-
-            # Get shear reinforcement diameter from ComboBox (can be empty or zero)
-            d_w = float(self.d_w_input.currentText()) if self.d_w_input.currentText() else 0
-
-            # Validation for the first layer of tension reinforcement
-            first_tension_diameter_input, first_tension_number_input = self.tension_layers_input[0]
-
-            if not first_tension_diameter_input.currentText() or not first_tension_number_input.text():
-                raise ValueError("Please provide tension reinforcement diameter & number of bars.")
-
-            try:
-                first_layer_diameter = float(first_tension_diameter_input.currentText())
-                first_layer_number = int(first_tension_number_input.text())
-            except ValueError:
-                raise ValueError("Please provide valid numeric values for tension reinforcement diameter & number of bars.")
-
-            # Continue processing other tension and compression layers
-            reinforcement_layers = {'tension': [], 'compression': []}
-            for diameter_input, number_input in self.tension_layers_input:
-                if not diameter_input.currentText() or not number_input.text():
-                    continue
-                try:
-                    d_s = float(diameter_input.currentText())  # Get diameter from ComboBox
-                    n_s = int(number_input.text())
-                    if d_s > 0 and n_s > 0:
-                        A_s = math.pi * (d_s ** 2) * 0.25 * n_s
-                        reinforcement_layers['tension'].append((d_s, A_s))
-                except ValueError:
-                    continue
-
-            for diameter_input, number_input in self.compression_layers_input:
-                if not diameter_input.currentText() or not number_input.text():
-                    continue
-                try:
-                    d_sc = float(diameter_input.currentText())  # Get diameter from ComboBox
-                    n_sc = int(number_input.text())
-                    if d_sc > 0 and n_sc > 0:
-                        A_sc = math.pi * (d_sc ** 2) * 0.25 * n_sc
-                        reinforcement_layers['compression'].append((d_sc, A_sc))
-                except ValueError:
-                    continue
-
-            # Total area of tension reinforcement
-            A_s_total = sum(A_s for _, A_s in reinforcement_layers['tension'])
-            if A_s_total == 0:
-                raise ValueError("Total tension reinforcement area is zero. Please provide valid tension reinforcement data.")
-
-            y_t = 0
-            # Corrected Centroid Calculation for Tension Reinforcement Layers
-            for i, (d_s, A_s) in enumerate(reinforcement_layers['tension']):
-                if i == 0:
-                    layer_depth = d_s * 0.5
-                else:
-                    previous_layers_depth = sum(
-                        (reinforcement_layers['tension'][j][0] + max(25, reinforcement_layers['tension'][j][0]))
-                        for j in range(i)
-                    )
-                    layer_depth = previous_layers_depth + (d_s * 0.5)
-                y_t += A_s * layer_depth
-
-            y_t /= A_s_total
-
-            # Total area of compression reinforcement
-            A_sc_total = sum(A_sc for _, A_sc in reinforcement_layers['compression'])
-            y_c = 0
-            if A_sc_total > 0:
-                # Corrected Centroid Calculation for Compression Reinforcement Layers
-                for i, (d_sc, A_sc) in enumerate(reinforcement_layers['compression']):
-                    if i == 0:
-                        layer_depth = d_sc * 0.5
-                    else:
-                        previous_layers_depth = sum(
-                            (reinforcement_layers['compression'][j][0] + max(25, reinforcement_layers['compression'][j][0]))
-                            for j in range(i)
-                        )
-                        layer_depth = previous_layers_depth + (d_sc * 0.5)
-                    y_c += A_sc * layer_depth
-
-                y_c /= A_sc_total
-
-            d_eff = h - c_nom - d_w - y_t
-            dc_eff = c_nom + d_w + y_c
-
-            # Redistribution
-            rdp = float(self.rdp_input.text())  # Get Redistribution Percentage from user input
-
-            mr = 1 - (rdp / 100)
-
-            # K calculations
-            K_bal = 0.453 * (mr - 0.4) * (1 - 0.4 * (mr - 0.4))
-            M_Ed = float(self.uls_m_ed_input.text()) * 1e6  # Get ULS M_Ed value from user input (converted to Nmm)
-
-            K = M_Ed / (b * d_eff ** 2 * f_ck)
-
-            if K <= K_bal:
-                # Singly reinforced
-                section_type = "Singly Reinforced Section"
-                # Calculate lever arm 'z_m'
-                if (0.25 - 0.881 * K) < 0:
-                    # If the value inside the square root is negative, use 0.95 * d_eff
-                    z_m = 0.95 * d_eff
-                else:
-                    z_m = min(((0.5 + (0.25 - 0.881 * K) ** 0.5) * d_eff), 0.95 * d_eff)
-                A_s_min = 0.001572 * b * d_eff
-                A_s_req = max(M_Ed / (z_m * (f_yk_main / gamma_s)), A_s_min)
-                A_sc_req = 0  # No compression reinforcement required
-                compression_utilisation_ratio = None  # No compression reinforcement needed
-            else:
-                # Doubly reinforced
-                section_type = "Doubly Reinforced Section"
-                z_m = d_eff * 0.82
-                A_sc_req = ((K - K_bal) * f_ck * b * d_eff ** 2) / ((f_yk_main / gamma_s) * (d_eff - dc_eff))
-                A_s_req = ((K_bal * f_ck * b * d_eff ** 2) / (z_m * (f_yk_main / gamma_s))) + A_sc_req
-                compression_utilisation_ratio = A_sc_req / A_sc_total if A_sc_total > 0 else None
-
-            # Minimum and Maximum Reinforcement Check
-            A_s_min_check = 0.001572 * b * d_eff
-            A_s_max = 0.04 * b * h
-
-            A_s_req = max(A_s_req, A_s_min_check)
-            A_s_req = min(A_s_req, A_s_max)
-
-            # Calculations for utilization ratios
-            tension_utilisation_ratio = A_s_req / A_s_total if A_s_total > 0 else 0
-            compression_utilisation_ratio = A_sc_req / A_sc_total if A_sc_total > 0 else None
-
-            # Define all labels to calculate the maximum label length
-            labels = [
-                "Section Type",
-                "Tension Reinforcement Utilisation Ratio",
-                "Compression Reinforcement Utilisation Ratio",
-                "Concrete strength (f_ck)",
-                "Main reinforcement strength (f_yk_main)",
-                "Shear reinforcement strength (f_yk_shear)",
-                "Partial factor for concrete (gamma_c)",
-                "Compressive strength coefficient (alpha_cc)",
-                "Partial factor for steel (gamma_s)",
-                "A_s_Pro",
-                "A_s_req",
-                "A_s_req / A_s_Pro",
-                "A_sc_Pro",
-                "A_sc_req",
-                "A_sc_req / A_sc_Pro"
-            ]
-
-            # Calculate maximum label length and add padding
-            max_label_length = max(len(label) for label in labels) + 4  # Adjust padding as needed
-            label_width_css = f"{max_label_length}ch"  # Use the calculated width for CSS
-
-            # Define HTML with inline CSS for dynamically set label width
-            html_output = f"""
-            <style>
-                .label {{ width: {label_width_css}; text-align: left; padding-right: 10px; }}
-                .equal {{ width: 4ch; text-align: center; }}
-                .value {{ width: 10ch; text-align: right; }}
-                .unit {{ width: 8ch; text-align: left; padding-left: 10px; }}
-            </style>
-            <table>
-            """
-
-
-
-            # Helper function to create each row in the table
-            def format_row(parameter, value, unit=""):
-                # Format the value to 3 decimal places if it is a float
-                value_str = f"{value:.3f}" if isinstance(value, float) else value
-                return f"""
-                    <tr>
-                        <td class="label">{parameter}</td>
-                        <td class="equal">=</td>
-                        <td class="value">{value_str}</td>
-                        <td class="unit">{unit}</td>
-                    </tr>
-                """
-
-            # Start building the output table with headings
-            html_output += "<tr><td colspan='4'><b>DESIGN SUMMARY</b></td></tr>"
-            html_output += format_row("Section Type", section_type)
-
-            # Tension Utilization Check
-            if tension_utilisation_ratio >= 1:
-                html_output += format_row("Tension Reinforcement Utilisation Ratio", tension_utilisation_ratio, "; Check Fail")
-            else:
-                html_output += format_row("Tension Reinforcement Utilisation Ratio", tension_utilisation_ratio, "; Check ok")
-
-            # Compression Reinforcement Utilization Check if Doubly Reinforced Section
-            if section_type == "Doubly Reinforced Section":
-                if A_sc_req > 0 and A_sc_total == 0:
-                    html_output += format_row("Compression Reinforcement", "not provided", "; Check Fail")
-                elif compression_utilisation_ratio is not None:
-                    if compression_utilisation_ratio >= 1:
-                        html_output += format_row("Compression Reinforcement Utilisation Ratio", compression_utilisation_ratio, "; Check Fail")
-                    else:
-                        html_output += format_row("Compression Reinforcement Utilisation Ratio", compression_utilisation_ratio, "; Check ok")
-
-            # Material and Section Details
-            html_output += "<tr><td colspan='4'><b>MATERIAL AND SECTION DETAILS</b></td></tr>"
-            html_output += format_row("Concrete strength (f_ck)", f_ck, "N/mm²")
-            html_output += format_row("Main reinforcement strength (f_yk_main)", f_yk_main, "N/mm²")
-            html_output += format_row("Shear reinforcement strength (f_yk_shear)", f_yk_shear, "N/mm²")
-            html_output += format_row("Partial factor for concrete (gamma_c)", gamma_c)
-            html_output += format_row("Compressive strength coefficient (alpha_cc)", alpha_cc)
-            html_output += format_row("Partial factor for steel (gamma_s)", gamma_s)
-
-            # Bending Design Results
-            html_output += "<tr><td colspan='4'><b>BENDING DESIGN RESULTS</b></td></tr>"
-            html_output += format_row("Section Type", section_type)
-            html_output += format_row("A_s_Pro", A_s_total, "mm²")
-            html_output += format_row("A_s_req", A_s_req, "mm²")
-
-            # Bending Utilization Check
-            if tension_utilisation_ratio >= 1:
-                html_output += format_row("A_s_req / A_s_Pro", tension_utilisation_ratio, "; Check Fail")
-            else:
-                html_output += format_row("A_s_req / A_s_Pro", tension_utilisation_ratio, "; Check ok")
-
-            # Compression Reinforcement Check if Doubly Reinforced Section
-            if section_type == "Doubly Reinforced Section":
-                if A_sc_req > 0 and A_sc_total == 0:
-                    html_output += format_row("Compression Reinforcement", "not provided", "; Check Fail")
-                elif A_sc_req > 0:
-                    html_output += format_row("A_sc_Pro", A_sc_total, "mm²")
-                    html_output += format_row("A_sc_req", A_sc_req, "mm²")
-                    if compression_utilisation_ratio is not None:
-                        if compression_utilisation_ratio >= 1:
-                            html_output += format_row("A_sc_req / A_sc_Pro", compression_utilisation_ratio, "; Check Fail")
-                        else:
-                            html_output += format_row("A_sc_req / A_sc_Pro", compression_utilisation_ratio, "; Check ok")
-
-            # Close the table
-            html_output += "</table>"
-
-            # Display the HTML in your output field
-            self.result_display.setHtml(html_output)
-
-
-
-
-
-
-
-            # Update the diagram
-            self.plot_section_diagram(c_nom, b, h, reinforcement_layers, d_w)
-
-        except Exception as e:
-            self.result_display.setText(f"Error: {str(e)}")
-
-
-
-        except Exception as e:
-            self.result_display.setText(f"Unexpected error: {str(e)}")
-
-
-
-
-    def plot_section_diagram(self, c_nom, b, h, reinforcement_layers, d_w):
-        self.section_figure.clear()
-        ax = self.section_figure.add_subplot(111)
-        ax.add_patch(Rectangle((0, 0), b, h, fill=True, facecolor='lightblue', edgecolor='blue'))
-
-        # Draw Shear Link (Rectangular shape with rounded corners)
-        ax.add_patch(Rectangle((c_nom, c_nom), b - 2 * c_nom, h - 2 * c_nom,
-                               fill=False, edgecolor='red', linewidth=d_w / 10))
-
-        # Draw Tension Reinforcement
-        y_offset_tension = c_nom + d_w  # Initial offset from bottom
-        for i, (d_s, A_s) in enumerate(reinforcement_layers['tension']):
-            if i > 0:
-                # Add previous layer diameter and spacing
-                previous_diameter = reinforcement_layers['tension'][i - 1][0]
-                y_offset_tension += previous_diameter + max(25, previous_diameter)
-
-            y_position = y_offset_tension + d_s * 0.5
-            n_bars = int(A_s / (math.pi * (d_s ** 2) * 0.25))
-
-            # Calculate spacing between bars
-            spacing = (b - 2 * (c_nom + d_w + d_s * 0.5)) / (n_bars - 1) if n_bars > 1 else 0
-
-            for j in range(n_bars):
-                x_position = c_nom + d_w + d_s * 0.5 + j * spacing
-                ax.add_patch(Circle((x_position, y_position), d_s * 0.5, color='black'))
-
-        # Draw Compression Reinforcement
-        y_offset_compression = c_nom + d_w  # Initial offset from top
-        for i, (d_sc, A_sc) in enumerate(reinforcement_layers['compression']):
-            if i > 0:
-                # Add previous layer diameter and spacing
-                previous_diameter = reinforcement_layers['compression'][i - 1][0]
-                y_offset_compression += previous_diameter + max(25, previous_diameter)
-
-            y_position = h - (y_offset_compression + d_sc * 0.5)
-            n_bars = int(A_sc / (math.pi * (d_sc ** 2) * 0.25))
-
-            # Calculate spacing between bars
-            spacing = (b - 2 * (c_nom + d_w + d_sc * 0.5)) / (n_bars - 1) if n_bars > 1 else 0
-
-            for j in range(n_bars):
-                x_position = c_nom + d_w + d_sc * 0.5 + j * spacing
-                ax.add_patch(Circle((x_position, y_position), d_sc * 0.5, color='black'))
-
-
-        ax.set_xlim(-10, b + 10)
-        ax.set_ylim(-10, h + 10)
-        ax.set_aspect('equal')
-        ax.axis('off')
-        self.section_canvas.draw()
-
-
-    def save_pdf(self):
-        file_dialog = QFileDialog()
-        file_dialog.setFileMode(QFileDialog.AnyFile)
-        file_dialog.setNameFilter("PDF Files (*.pdf)")
-        file_dialog.setDefaultSuffix("pdf")
-        file_path, _ = file_dialog.getSaveFileName(self, "Save PDF", "output.pdf", "PDF Files (*.pdf);;All Files (*)")
-
-        if file_path:
-            try:
-                # Save the figure to a temporary file
-                with tempfile.NamedTemporaryFile(delete=False, suffix=".png") as temp_file:
-                    temp_filename = temp_file.name
-                    self.section_figure.savefig(temp_filename)
-
-                # Create PDF and add figure and text content
-                pdf = FPDF()
-                pdf.add_page()
-                pdf.set_font("Arial", size=12)
-
-                # Add figure to the PDF before the output text
-                pdf_height = pdf.h - 20  # Page height with padding
-                max_img_height = pdf_height * 0.3  # Image height limited to 30% of the page height
-                max_img_width = pdf.w - 20  # Allow padding on both sides
-
-                # Get figure dimensions from matplotlib directly
-                width, height = self.section_figure.get_size_inches() * self.section_figure.dpi
-
-                # Calculate scaling factor to maintain aspect ratio
-                scale_factor = min(max_img_height / height, max_img_width / width)
-                img_width_scaled = width * scale_factor
-                img_height_scaled = height * scale_factor
-
-                # Calculate X coordinate to center the image
-                x_position = (pdf.w - img_width_scaled) / 2
-
-                # Insert the image into the PDF centered
-                pdf.image(temp_filename, x=x_position, y=10, w=img_width_scaled, h=img_height_scaled)
-
-                # Adjust text start position to avoid overlapping with image
-                pdf.set_y(10 + img_height_scaled + 10)
-
-                # Add calculation results text to the PDF
-                for line in self.result_display.toPlainText().split('\n'):
-                    pdf.multi_cell(0, 10, txt=line)
-
-                # Output the final PDF
-                pdf.output(file_path)
-
-                # Remove the temporary file after saving the PDF
-                os.unlink(temp_filename)
-
-                # Show success message in the output window
-                current_text = self.result_display.toPlainText()
-                self.result_display.setText(f"{current_text}\n\nFile saved successfully at: {file_path}")
+import time
+
+from ec2_design import (CONCRETE_CLASSES, CONCRETE_STRENGTHS, E_s, SINGLY_REINFORCED, DOUBLY_REINFORCED,
+                        Material, Section, BarLayer, Reinforcement, Loads, SectionGeometry, BendingResult,
+                        section_geometry, check_bending, design_bending, case_from_record)
+
+_GUI_NAMES = ('RCBeamDesignApp', 'bending_results_html', 'format_row')
+
+# Modules that must stay unloaded until the user asks for a plot or a PDF
+HEAVY_MODULES = ('matplotlib', 'fpdf', 'PIL', 'numpy')
+
+
+def __getattr__(name):
+    if name in _GUI_NAMES:
+        import ec2_gui
+        return getattr(ec2_gui, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def startup_report(phases):
+    # phases is a list of (name, seconds); printed as an -X importtime style table
+    lines = ["startup phase                      ms"]
+    total = 0.0
+    for name, seconds in phases:
+        total += seconds
+        lines.append(f"{name:<30} {seconds * 1e3:>7.1f}")
+    lines.append(f"{'total':<30} {total * 1e3:>7.1f}")
+    loaded = [name for name in HEAVY_MODULES if name in sys.modules]
+    lines.append(f"heavy modules loaded: {', '.join(loaded) if loaded else 'none'}")
+    return "\n".join(lines)
+
+
+def split_profile_args(argv):
+    # (argv without the profiling options, JSON path or None, capture flag)
+    argv = list(argv)
+    path = None
+    capture = '--profile-capture' in argv
+    argv = [arg for arg in argv if arg != '--profile-capture']
+    for i, arg in enumerate(argv):
+        if arg.startswith('--profile='):
+            path = arg.split('=', 1)[1]
+            del argv[i]
+            break
+        if arg == '--profile' and i + 1 < len(argv):
+            path = argv[i + 1]
+            del argv[i:i + 2]
+            break
+    return argv, path, capture
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    argv, profile_path, capture = split_profile_args(argv)
+    if profile_path is None and not capture:
+        return run(argv)
+
+    import ec2_profile
+    ec2_profile.enable(cprofile=capture, tracemalloc=capture)
+    try:
+        return run(argv)
+    finally:
+        ec2_profile.disable()
+        if profile_path is not None:
+            ec2_profile.export_json(profile_path)
+        else:
+            print(ec2_profile.PROFILER.format_report(), file=sys.stderr)
+
+
+def run(argv):
+    if argv and argv[0] == 'batch':
+        # Headless batch runner, see ec2_cli.py
+        from ec2_cli import main as batch_main
+        return batch_main(argv[1:])
+    if argv and argv[0] == 'report':
+        # PDF report for a beam schedule, see ec2_report.py
+        from ec2_report import main as report_main
+        return report_main(argv[1:])
+    if argv and argv[0] == 'sweep':
+        # Parametric sweeps and design charts, see ec2_sweep.py
+        from ec2_sweep import main as sweep_main
+        return sweep_main(argv[1:])
+    if argv and argv[0] == 'bench':
+        # Benchmarks with JSON baselines, see ec2_bench.py
+        from ec2_bench import main as bench_main
+        return bench_main(argv[1:])
+    if argv and argv[0] == 'project':
+        # Project files with incremental recompute, see ec2_project.py
+        from ec2_project import main as project_main
+        return project_main(argv[1:])
+    if argv and argv[0] == 'serve':
+        # Local HTTP/JSON design service, see ec2_service.py
+        from ec2_service import main as serve_main
+        return serve_main(argv[1:])
+
+    profile_startup = '--profile-startup' in argv
+    argv = [arg for arg in argv if arg != '--profile-startup']
+
+    phases = []
+    start = time.perf_counter()
+    from PyQt5.QtCore import QTimer
+    from PyQt5.QtWidgets import QApplication
+    phases.append(('import PyQt5', time.perf_counter() - start))
+
+    start = time.perf_counter()
+    import ec2_gui
+    phases.append(('import ec2_gui', time.perf_counter() - start))
+
+    start = time.perf_counter()
+    app = QApplication([sys.argv[0]] + argv)
+    phases.append(('create QApplication', time.perf_counter() - start))
+
+    start = time.perf_counter()
+    rc_beam_app = ec2_gui.RCBeamDesignApp()
+    rc_beam_app.show()
+    phases.append(('build and show window', time.perf_counter() - start))
 
-            except Exception as e:
-                current_text = self.result_display.toPlainText()
-                self.result_display.setText(f"{current_text}\n\nError saving PDF: {str(e)}")
+    if profile_startup:
+        # Stop after the first pass of the event loop, once the window has been painted
+        def report():
+            phases.append(('first event loop pass', time.perf_counter() - shown))
+            print(startup_report(phases), file=sys.stderr)
+            app.quit()
+        shown = time.perf_counter()
+        QTimer.singleShot(0, report)
 
+    return app.exec_()
 
 
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
-    rc_beam_app = RCBeamDesignApp()
-    rc_beam_app.show()
-    sys.exit(app.exec_())
+    sys.exit(main())
@@ -0,0 +1,202 @@
+"""Vectorized EC2 bending check over columnar arrays of sections.
+
+Mirrors ec2_design.check_bending branch for branch with NumPy masks so a batch
+of sections gives the same numbers as the scalar path, without building any
+per-section Python objects.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+
+from ec2_design import SINGLY_REINFORCED, DOUBLY_REINFORCED
+from ec2_materials import concrete_arrays
+
+# Index into SECTION_TYPES with BendingBatchResult.section_type
+SECTION_TYPES = (SINGLY_REINFORCED, DOUBLY_REINFORCED)
+SINGLY = 0
+DOUBLY = 1
+
+SUMMARY_FIELDS = ('section_type', 'd_eff', 'dc_eff', 'K', 'K_bal', 'z_m', 'A_s_total', 'A_s_req', 'A_sc_total',
+                  'A_sc_req', 'tension_utilisation_ratio', 'compression_utilisation_ratio', 'passed')
+
+
+@dataclass
+class BendingBatchResult:
+    valid: np.ndarray  # False where no tension reinforcement is provided
+    section_type: np.ndarray
+    A_s_total: np.ndarray
+    A_sc_total: np.ndarray
+    d_eff: np.ndarray
+    dc_eff: np.ndarray
+    K: np.ndarray
+    K_bal: np.ndarray
+    z_m: np.ndarray
+    A_s_req: np.ndarray
+    A_sc_req: np.ndarray
+    A_s_min: np.ndarray
+    A_s_max: np.ndarray
+    tension_utilisation_ratio: np.ndarray
+    compression_utilisation_ratio: np.ndarray  # NaN where no compression steel is provided
+
+    def __len__(self):
+        return len(self.K)
+
+    @property
+    def passed(self):
+        # Same pass criteria as BendingResult.passed
+        doubly = self.section_type == DOUBLY
+        missing_compression = doubly & (self.A_sc_req > 0) & (self.A_sc_total == 0)
+        compression_fail = doubly & (self.compression_utilisation_ratio >= 1)
+        return self.valid & (self.tension_utilisation_ratio < 1) & ~missing_compression & ~compression_fail
+
+    def summaries(self):
+        # BendingResult.summary records, None where no tension steel is provided
+        names = ('d_eff', 'dc_eff', 'K', 'K_bal', 'z_m', 'A_s_total', 'A_s_req', 'A_sc_total', 'A_sc_req',
+                 'tension_utilisation_ratio')
+        columns = [getattr(self, name).tolist() for name in names]
+        compression = self.compression_utilisation_ratio.tolist()
+        section_types = self.section_type.tolist()
+        passed = self.passed.tolist()
+        records = []
+        for i, valid in enumerate(self.valid.tolist()):
+            if not valid:
+                records.append(None)
+                continue
+            record = {'section_type': SECTION_TYPES[section_types[i]]}
+            record.update((name, column[i]) for name, column in zip(names, columns))
+            record['compression_utilisation_ratio'] = None if compression[i] != compression[i] else compression[i]
+            record['passed'] = passed[i]
+            # Keep the key order of BendingResult.summary
+            records.append({key: record[key] for key in SUMMARY_FIELDS})
+        return records
+
+
+def _as_layers(diameters, counts, n):
+    if diameters is None:
+        return np.zeros((n, 0)), np.zeros((n, 0))
+    diameters = np.asarray(diameters, dtype=float)
+    counts = np.asarray(counts, dtype=float)
+    if diameters.ndim == 1:
+        diameters, counts = diameters[:, None], counts[:, None]
+    shape = (n, diameters.shape[1])
+    return np.broadcast_to(diameters, shape), np.broadcast_to(counts, shape)
+
+
+def batch_layer_centroid(diameters, counts):
+    # Column-by-column version of ec2_design.layer_centroid; empty layers add exact zeros
+    # so the summation order matches the scalar loop over the provided layers
+    n = diameters.shape[0]
+    A_total = np.zeros(n)
+    y = np.zeros(n)
+    offset = np.zeros(n)
+    for j in range(diameters.shape[1]):
+        d = diameters[:, j]
+        active = (d > 0) & (counts[:, j] > 0)
+        A = np.where(active, np.pi * (d * d) * 0.25 * counts[:, j], 0.0)
+        A_total = A_total + A
+        y = y + np.where(active, A * (offset + d * 0.5), 0.0)
+        offset = offset + np.where(active, d + np.maximum(25, d), 0.0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        y_bar = np.where(A_total > 0, y / A_total, 0.0)
+    return A_total, y_bar
+
+
+def design_bending_batch(b, h, f_ck, f_yk, c_nom, d_w, tension_diameters, tension_counts,
+                         M_Ed, rdp=15.0, compression_diameters=None, compression_counts=None,
+                         gamma_s=1.15):
+    """Bending check for n sections at once.
+
+    Scalar inputs are broadcast to length n; c_nom is min cover + cover deviation and
+    M_Ed is in kNm. Layer arrays have shape (n, layers), outer face inwards, with a
+    diameter or count of 0 marking an empty layer.
+    """
+    n = max(np.size(M_Ed), len(tension_diameters))
+    b, h, f_ck, f_yk, c_nom, d_w, M_Ed, rdp, gamma_s = (
+        np.broadcast_to(np.asarray(v, dtype=float), (n,))
+        for v in (b, h, f_ck, f_yk, c_nom, d_w, M_Ed, rdp, gamma_s))
+
+    A_s_total, y_t = batch_layer_centroid(*_as_layers(tension_diameters, tension_counts, n))
+    A_sc_total, y_c = batch_layer_centroid(*_as_layers(compression_diameters, compression_counts, n))
+    valid = A_s_total > 0
+
+    d_eff = h - c_nom - d_w - y_t
+    dc_eff = c_nom + d_w + y_c
+
+    f_yd = f_yk / gamma_s
+    # Stress block constants per section from the EC2 Table 3.1 lookup (ec2_design.balanced_k)
+    concrete = concrete_arrays(f_ck)
+    mr = 1 - (rdp / 100)
+    xi = (mr - 0.4) / concrete.k2
+    K_bal = 0.453 * concrete.block_scale * xi * (1 - 0.5 * concrete.lambda_block * xi)
+    M_Ed = M_Ed * 1e6  # kNm to Nmm
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        K = M_Ed / (b * (d_eff * d_eff) * f_ck)
+        singly = K <= K_bal
+
+        # Singly reinforced: lever arm falls back to 0.95d when the root is negative
+        root = 0.25 - concrete.lever_coefficient * K
+        z_singly = np.where(root < 0, 0.95 * d_eff,
+                            np.minimum((0.5 + np.sqrt(np.maximum(root, 0.0))) * d_eff, 0.95 * d_eff))
+        A_s_singly = np.maximum(M_Ed / (z_singly * f_yd), 0.001572 * b * d_eff)
+
+        # Doubly reinforced
+        z_doubly = d_eff * concrete.z_doubly
+        A_sc_doubly = ((K - K_bal) * f_ck * b * (d_eff * d_eff)) / (f_yd * (d_eff - dc_eff))
+        A_s_doubly = ((K_bal * f_ck * b * (d_eff * d_eff)) / (z_doubly * f_yd)) + A_sc_doubly
+
+        z_m = np.where(singly, z_singly, z_doubly)
+        A_sc_req = np.where(singly, 0.0, A_sc_doubly)
+        A_s_req = np.where(singly, A_s_singly, A_s_doubly)
+
+        # Minimum and Maximum Reinforcement Check
+        A_s_min = 0.001572 * b * d_eff
+        A_s_max = 0.04 * b * h
+        A_s_req = np.minimum(np.maximum(A_s_req, A_s_min), A_s_max)
+
+        tension_utilisation_ratio = A_s_req / A_s_total
+        compression_utilisation_ratio = np.where(A_sc_total > 0, A_sc_req / A_sc_total, np.nan)
+
+    section_type = np.where(singly, SINGLY, DOUBLY).astype(np.int8)
+    invalid = ~valid
+    if invalid.any():
+        for values in (d_eff, K, z_m, A_s_req, A_sc_req, tension_utilisation_ratio, compression_utilisation_ratio):
+            values[invalid] = np.nan
+
+    return BendingBatchResult(valid, section_type, A_s_total, A_sc_total, d_eff, dc_eff, K, K_bal, z_m,
+                              A_s_req, A_sc_req, A_s_min, A_s_max,
+                              tension_utilisation_ratio, compression_utilisation_ratio)
+
+
+def layer_arrays(layer_groups):
+    # Pad lists of BarLayer tuples into (n, layers) diameter and count arrays
+    width = max((len(layers) for layers in layer_groups), default=0)
+    diameters = np.zeros((len(layer_groups), width))
+    counts = np.zeros((len(layer_groups), width))
+    for i, layers in enumerate(layer_groups):
+        for j, layer in enumerate(layers):
+            diameters[i, j] = layer.diameter
+            counts[i, j] = layer.count
+    return diameters, counts
+
+
+def design_bending_cases(cases):
+    """Batch check of (Material, Section, Reinforcement, Loads) tuples."""
+    materials, sections, reinforcements, loads = zip(*cases) if cases else ((), (), (), ())
+    tension_diameters, tension_counts = layer_arrays([r.tension for r in reinforcements])
+    compression_diameters, compression_counts = layer_arrays([r.compression for r in reinforcements])
+    return design_bending_batch(
+        b=[s.b for s in sections],
+        h=[s.h for s in sections],
+        f_ck=[m.f_ck for m in materials],
+        f_yk=[m.f_yk_main for m in materials],
+        c_nom=[s.c_nom for s in sections],
+        d_w=[s.d_w for s in sections],
+        tension_diameters=tension_diameters,
+        tension_counts=tension_counts,
+        M_Ed=[l.uls_m_ed for l in loads],
+        rdp=[s.rdp for s in sections],
+        compression_diameters=compression_diameters,
+        compression_counts=compression_counts,
+        gamma_s=[m.gamma_s for m in materials],
+    )
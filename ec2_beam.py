@@ -0,0 +1,308 @@
+"""Continuous beam analysis feeding the section checks.
+
+A beam is a row of spans on supports that are pinned (free to rotate) or
+fixed. Each load case carries a uniform load per span and any number of point
+loads. The support rotations are found by the stiffness (slope-deflection)
+method for all load cases at once, one linear solve with a column per case;
+moments and shears at the stations of each span then follow from the simply
+supported diagrams plus the line between the span end moments, as (cases,
+stations) arrays that are enveloped over the cases.
+
+Hogging support moments are redistributed by section.rdp (EC2 5.5) before
+enveloping, with the span moments and shears rebuilt from the reduced support
+moments so each case stays in equilibrium.
+
+design_beam then checks the critical sections: bending at the peak sagging
+moment of each span and the peak hogging moment at each support, shear links
+along every span (ec2_shear.shear_along_span) and, for quasi-permanent cases,
+service stresses and crack widths (ec2_sls). The section geometry of each
+distinct section is computed once and shared by all its checks.
+
+Span lengths and positions are in m, distributed loads in kN/m, point loads in
+kN, moments in kNm and shear forces in kN.
+"""
+from dataclasses import dataclass, replace
+from typing import Optional, Tuple
+
+import numpy as np
+
+from ec2_design import Loads, check_bending, section_geometry
+
+PINNED = 'pinned'
+FIXED = 'fixed'
+SUPPORT_TYPES = (PINNED, FIXED)
+
+# Stations per span, including both ends
+N_STATIONS = 51
+
+
+@dataclass(frozen=True)
+class PointLoad:
+    span: int
+    position: float  # m from the left support of the span
+    force: float  # kN, downwards positive
+
+
+@dataclass(frozen=True)
+class LoadCase:
+    udl: Tuple[float, ...]  # kN/m per span, downwards positive
+    point_loads: Tuple[PointLoad, ...] = ()
+    name: str = ''
+
+    def __post_init__(self):
+        object.__setattr__(self, 'udl', tuple(self.udl))
+        object.__setattr__(self, 'point_loads', tuple(self.point_loads))
+
+
+@dataclass(frozen=True)
+class Beam:
+    spans: Tuple[float, ...]  # m
+    supports: Optional[Tuple[str, ...]] = None  # One per support, all pinned by default
+    stiffness: Optional[Tuple[float, ...]] = None  # Relative EI per span, equal by default
+
+    def __post_init__(self):
+        object.__setattr__(self, 'spans', tuple(self.spans))
+        supports = (PINNED,) * (len(self.spans) + 1) if self.supports is None else tuple(self.supports)
+        object.__setattr__(self, 'supports', supports)
+        stiffness = (1.0,) * len(self.spans) if self.stiffness is None else tuple(self.stiffness)
+        object.__setattr__(self, 'stiffness', stiffness)
+        if not self.spans or any(length <= 0 for length in self.spans):
+            raise ValueError("Please provide at least one span with a positive length.")
+        if len(self.supports) != len(self.spans) + 1 or any(s not in SUPPORT_TYPES for s in self.supports):
+            raise ValueError(f"Please provide one support per span end, each one of {', '.join(SUPPORT_TYPES)}.")
+        if len(self.stiffness) != len(self.spans):
+            raise ValueError("Please provide one stiffness per span.")
+
+
+def pattern_load_cases(n_spans, g_k, q_k, gamma_g=1.35, gamma_q=1.5):
+    """ULS load cases for EC2 5.1.3: all spans, alternate spans and adjacent pairs loaded.
+
+    Unloaded spans carry the permanent load at γ_G; g_k and q_k are kN/m, one
+    value for all spans or one per span.
+    """
+    g = np.broadcast_to(np.asarray(g_k, dtype=float), (n_spans,))
+    q = np.broadcast_to(np.asarray(q_k, dtype=float), (n_spans,))
+    patterns = [('all spans', range(n_spans)), ('odd spans', range(0, n_spans, 2)),
+                ('even spans', range(1, n_spans, 2))]
+    patterns += [(f'spans {i + 1}-{i + 2}', (i, i + 1)) for i in range(n_spans - 1)]
+    cases = []
+    for name, loaded in patterns:
+        loaded = set(loaded)
+        if loaded:
+            udl = [gamma_g * g[i] + (gamma_q * q[i] if i in loaded else 0.0) for i in range(n_spans)]
+            cases.append(LoadCase(tuple(udl), name=name))
+    return cases
+
+
+@dataclass
+class BeamAnalysis:
+    x: np.ndarray  # Station positions from the left end of the beam, m
+    span_index: np.ndarray  # Span of each station
+    M: np.ndarray  # (cases, stations) kNm, sagging positive
+    V: np.ndarray  # (cases, stations) kN
+    support_moments: np.ndarray  # (cases, supports) kNm after redistribution
+    elastic_support_moments: np.ndarray  # (cases, supports) kNm before redistribution
+
+    @property
+    def M_max(self):
+        return self.M.max(axis=0)
+
+    @property
+    def M_min(self):
+        return self.M.min(axis=0)
+
+    @property
+    def V_abs(self):
+        return np.abs(self.V).max(axis=0)
+
+    def span(self, i):
+        # Station slice of span i
+        stations = np.flatnonzero(self.span_index == i)
+        return slice(stations[0], stations[-1] + 1)
+
+
+def _case_arrays(beam, cases):
+    # (cases, spans) uniform loads and the point loads as flat (case, span, a, P) arrays
+    n_spans = len(beam.spans)
+    udl = np.zeros((len(cases), n_spans))
+    rows = []
+    for c, case in enumerate(cases):
+        if len(case.udl) != n_spans:
+            raise ValueError(f"Load case {case.name or c + 1!r} needs one distributed load per span.")
+        udl[c] = case.udl
+        for load in case.point_loads:
+            if not 0 <= load.span < n_spans or not 0 <= load.position <= beam.spans[load.span]:
+                raise ValueError(f"Point load {load} is outside the beam.")
+            rows.append((c, load.span, load.position, load.force))
+    points = np.array(rows, dtype=float).reshape(-1, 4)
+    return udl, points[:, 0].astype(int), points[:, 1].astype(int), points[:, 2], points[:, 3]
+
+
+def analyse_beam(beam, cases, rdp=0.0, n_stations=N_STATIONS):
+    """Moments and shears at n_stations per span for every load case."""
+    if not cases:
+        raise ValueError("Please provide at least one load case.")
+    L = np.asarray(beam.spans, dtype=float)
+    n_spans, n_cases = len(L), len(cases)
+    udl, point_case, point_span, a, P = _case_arrays(beam, cases)
+    b = L[point_span] - a
+
+    # Fixed end moments, clockwise positive on the member ends
+    fem_left = -udl * L * L / 12
+    fem_right = udl * L * L / 12
+    np.add.at(fem_left, (point_case, point_span), -P * a * b * b / L[point_span] ** 2)
+    np.add.at(fem_right, (point_case, point_span), P * a * a * b / L[point_span] ** 2)
+
+    # Slope-deflection: M_left = FEM + 2k (2 θ_i + θ_j), M_right = FEM + 2k (θ_i + 2 θ_j)
+    k = np.asarray(beam.stiffness, dtype=float) / L
+    stiffness = np.zeros((n_spans + 1, n_spans + 1))
+    spans = np.arange(n_spans)
+    np.add.at(stiffness, (spans, spans), 4 * k)
+    np.add.at(stiffness, (spans + 1, spans + 1), 4 * k)
+    stiffness[spans, spans + 1] += 2 * k
+    stiffness[spans + 1, spans] += 2 * k
+    load = np.zeros((n_spans + 1, n_cases))
+    np.add.at(load, spans, -fem_left.T)
+    np.add.at(load, spans + 1, -fem_right.T)
+    free = np.array([support != FIXED for support in beam.supports])
+    rotations = np.zeros((n_spans + 1, n_cases))
+    if free.any():
+        rotations[free] = np.linalg.solve(stiffness[np.ix_(free, free)], load[free])
+    theta_i, theta_j = rotations[:-1].T, rotations[1:].T
+    end_left = fem_left + 2 * k * (2 * theta_i + theta_j)
+    end_right = fem_right + 2 * k * (theta_i + 2 * theta_j)
+
+    # Support moments in the beam convention (sagging positive); the two spans meeting
+    # at a support agree up to round-off, so average them
+    elastic = np.zeros((n_cases, n_spans + 1))
+    elastic[:, :-1] += end_left
+    elastic[:, 1:] -= end_right
+    elastic[:, 1:-1] /= 2
+    # Pinned end supports carry no moment; drop the round-off
+    for end in (0, -1):
+        if beam.supports[end] == PINNED:
+            elastic[:, end] = 0.0
+    # EC2 5.5: hogging moments reduced to (1 - rdp) of their elastic values
+    support_moments = np.where(elastic < 0, (1 - rdp / 100) * elastic, elastic)
+
+    # Stations along each span, then the simply supported diagrams plus the end moments
+    t = np.linspace(0.0, 1.0, n_stations)
+    local = L[:, None] * t  # (spans, stations)
+    starts = np.concatenate(([0.0], np.cumsum(L)[:-1]))
+    x = (starts[:, None] + local).ravel()
+    span_index = np.repeat(spans, n_stations)
+    local = local.ravel()
+    span_length = L[span_index]
+    M = udl[:, span_index] * local * (span_length - local) / 2
+    V = udl[:, span_index] * (span_length / 2 - local)
+    for c, s, a_i, P_i in zip(point_case, point_span, a, P):
+        on_span = span_index == s
+        xs = local[on_span]
+        M[c, on_span] += np.where(xs <= a_i, P_i * (L[s] - a_i) * xs / L[s], P_i * a_i * (L[s] - xs) / L[s])
+        V[c, on_span] += np.where(xs < a_i, P_i * (L[s] - a_i) / L[s], -P_i * a_i / L[s])
+    M_left = support_moments[:, span_index]
+    M_right = support_moments[:, span_index + 1]
+    M += M_left * (1 - local / span_length) + M_right * (local / span_length)
+    V += (M_right - M_left) / span_length
+    return BeamAnalysis(x, span_index, M, V, support_moments, elastic)
+
+
+@dataclass
+class BeamDesign:
+    analysis: BeamAnalysis
+    span_moments: np.ndarray  # Peak sagging moment per span, kNm
+    span_positions: np.ndarray  # Where it occurs, m from the left end
+    support_moments: np.ndarray  # Peak hogging moment per support as a positive value, kNm
+    span_bending: Tuple  # BendingResult per span
+    support_bending: Tuple  # BendingResult per support, None where nothing hogs
+    shear: Tuple  # ec2_shear.SpanShearResult per span
+    span_sls: Optional[object] = None  # ec2_sls.SLSBatchResult over the spans
+    support_sls: Optional[object] = None  # ec2_sls.SLSBatchResult over the supports
+
+    @property
+    def passed(self):
+        checks = [r.passed for r in self.span_bending]
+        checks += [r.passed for r in self.support_bending if r is not None]
+        checks += [r.passed for r in self.shear]
+        for sls in (self.span_sls, self.support_sls):
+            if sls is not None:
+                checks.append(bool(sls.passed.all()))
+        return all(checks)
+
+
+def _per_member(value, count, what):
+    # One value for every span or support, or a sequence with one each
+    if isinstance(value, (list, tuple)):
+        if len(value) != count:
+            raise ValueError(f"Please provide one {what} reinforcement per {what}, or a single one for all.")
+        return list(value)
+    return [value] * count
+
+
+def design_beam(beam, cases, material, section, span_reinforcement, support_reinforcement=None, legs=2,
+                sls_cases=None, n_stations=N_STATIONS):
+    """Analyse the beam and check every critical section.
+
+    span_reinforcement holds the bottom bars as tension steel and
+    support_reinforcement the top bars; either is one Reinforcement for all
+    spans (supports) or a sequence with one per span (support). Links of
+    diameter section.d_w with the given legs are designed along each span.
+    sls_cases are quasi-permanent load cases for the stress and crack checks.
+    """
+    from ec2_shear import link_area, shear_along_span
+
+    n_spans = len(beam.spans)
+    analysis = analyse_beam(beam, cases, section.rdp, n_stations)
+    span_bars = _per_member(span_reinforcement, n_spans, 'span')
+    support_bars = _per_member(support_reinforcement if support_reinforcement is not None else span_reinforcement,
+                               n_spans + 1, 'support')
+
+    # The moment was only redistributed at the supports, so the spans need no ductility limit
+    span_section = replace(section, rdp=0.0)
+    geometries = {}
+
+    def geometry(bars):
+        if bars not in geometries:
+            geometries[bars] = section_geometry(section, bars)
+        return geometries[bars]
+
+    M_max, M_min = analysis.M_max, analysis.M_min
+    span_moments, span_positions, span_bending, shear = [], [], [], []
+    for i in range(n_spans):
+        stations = analysis.span(i)
+        peak = stations.start + int(np.argmax(M_max[stations]))
+        span_moments.append(max(float(M_max[peak]), 0.0))
+        span_positions.append(float(analysis.x[peak]))
+        span_geometry = geometry(span_bars[i])
+        span_bending.append(check_bending(material, span_section, span_geometry, Loads(uls_m_ed=span_moments[-1])))
+        x_local = (analysis.x[stations] - analysis.x[stations.start]) * 1e3
+        shear.append(shear_along_span(x_local, analysis.V[:, stations], section.b, span_geometry.d_eff,
+                                      span_geometry.A_s_total, material.f_ck, material.f_yk_shear,
+                                      link_area(section.d_w, legs), material.alpha_cc, material.gamma_c,
+                                      material.gamma_s))
+
+    # Peak hogging at each support, from the span ends meeting there
+    hogging = np.maximum(-analysis.support_moments.min(axis=0), 0.0)
+    support_bending = [check_bending(material, section, geometry(support_bars[j]), Loads(uls_m_ed=float(hogging[j])))
+                       if hogging[j] > 0 else None for j in range(n_spans + 1)]
+
+    span_sls = support_sls = None
+    if sls_cases:
+        service = analyse_beam(beam, sls_cases, 0.0, n_stations)
+        span_service = np.array([max(service.M_max[service.span(i)].max(), 0.0) for i in range(n_spans)])
+        support_service = np.maximum(-service.support_moments.min(axis=0), 0.0)
+        span_sls = _sls_checks(material, section, [geometry(bars) for bars in span_bars], span_service)
+        support_sls = _sls_checks(material, section, [geometry(bars) for bars in support_bars], support_service)
+
+    return BeamDesign(analysis, np.array(span_moments), np.array(span_positions), hogging, tuple(span_bending),
+                      tuple(support_bending), tuple(shear), span_sls, support_sls)
+
+
+def _sls_checks(material, section, geometries, moments):
+    # SLS check of each moment on its own section, sharing the cached terms of equal sections
+    from ec2_sls import CrackedSectionBatch, cracked_section
+
+    terms = [cracked_section(material, section, g) for g in geometries]
+    stacked = CrackedSectionBatch(*(np.concatenate([getattr(t, name) for t in terms])
+                                    for name in CrackedSectionBatch.__dataclass_fields__))
+    return stacked.check(moments)
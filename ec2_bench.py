@@ -0,0 +1,405 @@
+"""Benchmark suite with JSON baselines and a regression threshold.
+
+Each benchmark times a representative workload headless (Agg, and the Qt
+window on the offscreen platform when PyQt5 is available):
+
+    singly            design_bending of a singly reinforced beam
+    doubly_6_layer    design_bending of a doubly reinforced beam, 3 + 3 layers
+    batch_100k        design_bending_batch over 100 000 random sections
+    fibre_batch_10k   fibre_analysis_batch over 10 000 random sections
+    dense_diagram     render_section_rgb of 6 layers of 12 bars
+    report_200_pages  build_report of a 200 page schedule, in-process
+    gui_calculate     RCBeamDesignApp.calculate with every check, until shown
+    gui_plot_section  RCBeamDesignApp.plot_section_diagram, bars changing
+    gui_save_pdf      RCBeamDesignApp.save_pdf to a temporary file, until written
+
+Every workload is run `repeat` times after a warm-up; the median, p95 and best
+time per run and the median throughput are reported. --save writes the
+results as a JSON baseline and --baseline compares against one, failing with
+status 1 when a median is more than --threshold (a fraction) slower.
+
+Before timing anything, cross_check compares the scalar and batch engines on
+random sections (design_bending against design_bending_cases and design_fibre
+against fibre_analysis_cases) and fails on any disagreement beyond a relative
+tolerance.
+
+    python RC_Beam_EC2.py bench --save baseline.json
+    python RC_Beam_EC2.py bench --baseline baseline.json --threshold 0.25
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+from ec2_design import (CONCRETE_STRENGTHS, BarLayer, Loads, Material, Reinforcement, Section, design_bending,
+                        ENGINE_VERSION)
+
+SINGLY_CASE = (Material.from_class('C30/37'), Section(300, 500, d_w=10),
+               Reinforcement([BarLayer(20, 4)]), Loads(uls_m_ed=180))
+DOUBLY_CASE = (Material.from_class('C30/37'), Section(300, 600, d_w=10),
+               Reinforcement([BarLayer(32, 4), BarLayer(25, 4), BarLayer(20, 3)],
+                             [BarLayer(25, 3), BarLayer(20, 3), BarLayer(16, 2)]),
+               Loads(uls_m_ed=900, sls_m_ed=600, v_ed=350, v_ef=400, t_ed=25, t_ef=30))
+
+# Relative tolerance of the scalar/batch cross-check
+CROSS_CHECK_RTOL = 1e-9
+FIBRE_RTOL = 1e-6
+
+BENCHMARKS = {}
+
+
+def benchmark(name, repeat=20, gui=False):
+    # Registers a setup function returning (run, items per run, unit)
+    def register(setup):
+        BENCHMARKS[name] = {'setup': setup, 'repeat': repeat, 'gui': gui}
+        return setup
+    return register
+
+
+def random_cases(n, seed=0, max_layers=3):
+    rng = random.Random(seed)
+    classes = list(CONCRETE_STRENGTHS)
+    diameters = (10, 12, 16, 20, 25, 32)
+    cases = []
+    for _ in range(n):
+        material = Material.from_class(rng.choice(classes), f_yk_main=rng.choice((400.0, 500.0)))
+        section = Section(rng.randrange(200, 501, 25), rng.randrange(300, 901, 50), rng.choice((25.0, 30.0, 40.0)),
+                          10.0, rng.choice((0.0, 8.0, 10.0)), rng.choice((0.0, 10.0, 15.0, 30.0)))
+        tension = [BarLayer(rng.choice(diameters), rng.randint(2, 6)) for _ in range(rng.randint(1, max_layers))]
+        compression = [BarLayer(rng.choice(diameters), rng.randint(2, 4)) for _ in range(rng.randint(0, max_layers))]
+        cases.append((material, section, Reinforcement(tension, compression),
+                      Loads(uls_m_ed=rng.uniform(20, 1200))))
+    return cases
+
+
+def _relative_difference(a, b):
+    # None (no compression steel, no load) must match None
+    if a is None or b is None:
+        return 0.0 if a is None and b is None else math.inf
+    return abs(a - b) / max(abs(a), abs(b), 1e-12)
+
+
+def cross_check(n=2000, n_fibre=300, seed=0):
+    """Largest relative difference per output between the scalar and batch engines."""
+    import numpy as np
+
+    from ec2_batch import SECTION_TYPES, design_bending_cases
+    from ec2_fibre import design_fibre, fibre_analysis_cases
+
+    cases = random_cases(n, seed)
+    batch = design_bending_cases(cases)
+    worst = {}
+    for i, case in enumerate(cases):
+        scalar = design_bending(*case)
+        same_type = SECTION_TYPES[batch.section_type[i]] == scalar.section_type
+        worst['section_type'] = max(worst.get('section_type', 0.0), 0.0 if same_type else math.inf)
+        for name in ('K', 'z_m', 'A_s_req', 'A_sc_req', 'tension_utilisation_ratio',
+                     'compression_utilisation_ratio'):
+            value = float(getattr(batch, name)[i])
+            difference = _relative_difference(getattr(scalar, name), None if np.isnan(value) else value)
+            worst[name] = max(worst.get(name, 0.0), difference)
+
+    fibre_cases = cases[:n_fibre]
+    fibre_batch = fibre_analysis_cases(fibre_cases)
+    for i, case in enumerate(fibre_cases):
+        if not fibre_batch.valid[i]:
+            continue
+        scalar = design_fibre(*case)
+        result = fibre_batch.result(i)
+        for name in ('x', 'M_Rd', 'utilisation'):
+            key = f"fibre_{name}"
+            worst[key] = max(worst.get(key, 0.0), _relative_difference(getattr(scalar, name), getattr(result, name)))
+    return worst
+
+
+def cross_check_failures(worst):
+    return {name: value for name, value in worst.items()
+            if value > (FIBRE_RTOL if name.startswith('fibre_') else CROSS_CHECK_RTOL)}
+
+
+@benchmark('singly', repeat=30)
+def _singly():
+    return lambda: [design_bending(*SINGLY_CASE) for _ in range(1000)], 1000, 'checks'
+
+
+@benchmark('doubly_6_layer', repeat=30)
+def _doubly():
+    return lambda: [design_bending(*DOUBLY_CASE) for _ in range(1000)], 1000, 'checks'
+
+
+def _random_arrays(n, seed=0):
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    strengths = np.array(sorted(CONCRETE_STRENGTHS.values()), dtype=float)
+    return {
+        'b': rng.uniform(200, 500, n), 'h': rng.uniform(300, 900, n), 'f_ck': rng.choice(strengths, n),
+        'f_yk': np.full(n, 500.0), 'c_nom': np.full(n, 40.0), 'd_w': np.full(n, 10.0),
+        'tension_diameters': rng.choice([16.0, 20.0, 25.0, 32.0], (n, 2)),
+        'tension_counts': rng.integers(0, 6, (n, 2)).astype(float) + np.array([2.0, 0.0]),
+        'compression_diameters': rng.choice([12.0, 16.0, 20.0], (n, 1)),
+        'compression_counts': rng.integers(0, 4, (n, 1)).astype(float),
+        'M_Ed': rng.uniform(20, 1200, n),
+    }
+
+
+@benchmark('batch_100k', repeat=10)
+def _batch():
+    from ec2_batch import design_bending_batch
+
+    arrays = _random_arrays(100_000)
+    return lambda: design_bending_batch(**arrays), 100_000, 'sections'
+
+
+@benchmark('fibre_batch_10k', repeat=5)
+def _fibre_batch():
+    from ec2_fibre import batch_layer_depths, fibre_analysis_batch
+
+    arrays = _random_arrays(10_000)
+    depths, areas = batch_layer_depths(arrays['h'], arrays['c_nom'], arrays['d_w'], arrays['tension_diameters'],
+                                       arrays['tension_counts'], arrays['compression_diameters'],
+                                       arrays['compression_counts'])
+
+    def run():
+        return fibre_analysis_batch(arrays['b'], arrays['h'], arrays['f_ck'], arrays['f_yk'], depths, areas,
+                                    arrays['M_Ed'], d_eff=depths[:, 0])
+    return run, 10_000, 'sections'
+
+
+@benchmark('dense_diagram', repeat=10)
+def _dense_diagram():
+    from ec2_plot import render_section_rgb
+
+    bar = 3.14159 * 16 * 16 / 4
+    layouts = [{'tension': [(16, bar * 12)] * 3, 'compression': [(16, bar * 12)] * 3},
+               {'tension': [(16, bar * 11)] * 3, 'compression': [(16, bar * 12)] * 3}]
+
+    def run():
+        # Alternate the layouts so every render updates the bars as well as drawing
+        for layers in layouts:
+            render_section_rgb(45, 600, 800, layers, 10)
+    return run, len(layouts), 'renders'
+
+
+@benchmark('report_200_pages', repeat=3)
+def _report():
+    from ec2_report import build_report
+
+    # Four pages of summary table and a page per member
+    members = [(f"B{i + 1}", case) for i, case in enumerate(random_cases(196, seed=1))]
+    path = os.path.join(tempfile.mkdtemp(prefix='ec2-bench-'), 'report.pdf')
+    return lambda: build_report(members, path, workers=1), 200, 'pages'
+
+
+_app = None
+
+
+def _window(case=DOUBLY_CASE):
+    # One offscreen QApplication per process, and a window filled in with case
+    global _app
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from PyQt5.QtWidgets import QApplication
+
+    from ec2_gui import RCBeamDesignApp
+
+    _app = QApplication.instance() or QApplication([sys.argv[0]])
+    window = RCBeamDesignApp()
+    material, section, reinforcement, loads = case
+    window.concrete_class_input.setCurrentText(next(k for k, v in CONCRETE_STRENGTHS.items() if v == material.f_ck))
+    for name, value in (('section_width_input', section.b), ('section_depth_input', section.h),
+                        ('min_cover_input', section.min_cover), ('cover_dev_input', section.cover_dev),
+                        ('rdp_input', section.rdp), ('uls_m_ed_input', loads.uls_m_ed),
+                        ('sls_m_ed_input', loads.sls_m_ed), ('v_ed_input', loads.v_ed), ('v_ef_input', loads.v_ef),
+                        ('t_ed_input', loads.t_ed), ('t_ef_input', loads.t_ef)):
+        getattr(window, name).setText(f"{value:g}")
+    window.d_w_input.setCurrentText(f"{section.d_w:g}")
+    window.write_layers(window.tension_layers_input, reinforcement.tension)
+    window.write_layers(window.compression_layers_input, reinforcement.compression)
+    return window
+
+
+@benchmark('gui_calculate', repeat=20, gui=True)
+def _gui_calculate():
+    window = _window()
+
+    def run():
+        window.calculate()
+        window.wait_for_tasks()
+    return run, 1, 'calculations'
+
+
+@benchmark('gui_plot_section', repeat=20, gui=True)
+def _gui_plot_section():
+    window = _window()
+    bar = 3.14159 * 20 * 20 / 4
+    layouts = [{'tension': [(20, bar * n)], 'compression': [(16, bar)]} for n in (3, 4)]
+
+    def run():
+        for layers in layouts:
+            window.plot_section_diagram(45, 300, 600, layers, 10)
+    return run, len(layouts), 'diagrams'
+
+
+@benchmark('gui_save_pdf', repeat=5, gui=True)
+def _gui_save_pdf():
+    from PyQt5.QtWidgets import QFileDialog
+
+    window = _window()
+    window.calculate()
+    path = os.path.join(tempfile.mkdtemp(prefix='ec2-bench-'), 'output.pdf')
+    text = window.result_display.toHtml()
+
+    def run():
+        # Answer the save dialog with the temporary path, and restore the results the
+        # success message is appended to
+        window.result_display.setHtml(text)
+        original = QFileDialog.getSaveFileName
+        QFileDialog.getSaveFileName = lambda *args, **kwargs: (path, '')
+        try:
+            window.save_pdf()
+            window.wait_for_tasks()
+        finally:
+            QFileDialog.getSaveFileName = original
+    return run, 1, 'PDFs'
+
+
+def gui_available():
+    try:
+        import PyQt5.QtWidgets  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def measure(run, repeat, warmup=1):
+    for _ in range(warmup):
+        run()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def run_benchmarks(names=None, repeat_scale=1.0, gui=True, progress=None):
+    results = {}
+    for name, entry in BENCHMARKS.items():
+        if (names and name not in names) or (entry['gui'] and not gui):
+            continue
+        run, items, unit = entry['setup']()
+        times = sorted(measure(run, max(int(entry['repeat'] * repeat_scale), 3)))
+        median = statistics.median(times)
+        results[name] = {
+            'median_s': median,
+            'p95_s': times[min(int(math.ceil(0.95 * len(times))) - 1, len(times) - 1)],
+            'min_s': times[0],
+            'repeat': len(times),
+            'throughput': items / median,
+            'unit': f"{unit}/s",
+        }
+        if progress is not None:
+            progress(name, results[name])
+    return results
+
+
+def environment():
+    import numpy as np
+
+    return {
+        'engine_version': ENGINE_VERSION,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def compare(results, baseline, threshold):
+    # {name: (baseline median, current median, ratio)} for the benchmarks slower than allowed
+    regressions = {}
+    for name, result in results.items():
+        reference = baseline.get('benchmarks', {}).get(name)
+        if reference is None:
+            continue
+        ratio = result['median_s'] / reference['median_s']
+        if ratio > 1 + threshold:
+            regressions[name] = (reference['median_s'], result['median_s'], ratio)
+    return regressions
+
+
+def format_result(name, result, reference=None):
+    line = (f"{name:<18} median {result['median_s'] * 1e3:>9.3f} ms  p95 {result['p95_s'] * 1e3:>9.3f} ms  "
+            f"{result['throughput']:>12.1f} {result['unit']}")
+    if reference is not None:
+        line += f"  ({result['median_s'] / reference['median_s']:.2f}x baseline)"
+    return line
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='RC_Beam_EC2.py bench',
+                                     description='Time representative workloads and check for regressions.')
+    parser.add_argument('names', nargs='*', help=f"benchmarks to run (default: all of {', '.join(BENCHMARKS)})")
+    parser.add_argument('--save', metavar='PATH', help='write the results as a JSON baseline')
+    parser.add_argument('--baseline', metavar='PATH', help='JSON baseline to compare against')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='allowed slowdown of a median as a fraction of the baseline (default: 0.2)')
+    parser.add_argument('--quick', action='store_true', help='run a quarter of the repeats')
+    parser.add_argument('--no-gui', action='store_true', help='skip the Qt window benchmarks')
+    parser.add_argument('--skip-cross-check', action='store_true', help='skip the scalar/batch cross-check')
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    unknown = [name for name in args.names if name not in BENCHMARKS]
+    if unknown:
+        print(f"Unknown benchmark: {', '.join(unknown)}", file=sys.stderr)
+        return 2
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as stream:
+            baseline = json.load(stream)
+
+    status = 0
+    output = {'environment': environment()}
+    if not args.skip_cross_check:
+        worst = cross_check()
+        failures = cross_check_failures(worst)
+        output['cross_check'] = {'max_relative_difference': worst, 'passed': not failures}
+        for name, value in failures.items():
+            print(f"cross-check: {name} differs by {value:.3g} between the scalar and batch engines",
+                  file=sys.stderr)
+        if failures:
+            status = 1
+        else:
+            print(f"cross-check: scalar and batch engines agree on {len(worst)} outputs", file=sys.stderr)
+
+    references = baseline.get('benchmarks', {}) if baseline else {}
+
+    def progress(name, result):
+        print(format_result(name, result, references.get(name)), file=sys.stderr)
+
+    gui = not args.no_gui and gui_available()
+    output['benchmarks'] = run_benchmarks(args.names or None, 0.25 if args.quick else 1.0, gui, progress)
+    if baseline is not None:
+        regressions = compare(output['benchmarks'], baseline, args.threshold)
+        for name, (before, after, ratio) in regressions.items():
+            print(f"regression: {name} {before * 1e3:.3f} ms -> {after * 1e3:.3f} ms ({ratio:.2f}x)", file=sys.stderr)
+        if regressions:
+            status = 1
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as stream:
+            json.dump(output, stream, indent=2)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
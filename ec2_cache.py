@@ -0,0 +1,161 @@
+"""Memoization cache for bending design results.
+
+Results are keyed on a canonical hash of the engine inputs: numbers are
+normalized to floats (so '500' and '500.0' typed into the form hash the same),
+empty bar layers are dropped, and ENGINE_VERSION is part of the key. An
+in-memory LRU tier sits in front of an optional SQLite file that survives
+restarts; rows written by another engine version are purged when it is opened.
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+from collections import OrderedDict
+
+from ec2_design import ENGINE_VERSION, BendingResult, design_bending
+from ec2_profile import count
+
+
+def _number(value):
+    # Adding 0.0 folds -0.0 into 0.0
+    return float(value) + 0.0
+
+
+def canonical_inputs(material, section, reinforcement, loads):
+    # Only the load that the bending check reads is part of the key
+    def layers(group):
+        return [[_number(layer.diameter), int(layer.count)] for layer in group
+                if layer.diameter > 0 and layer.count > 0]
+
+    return {
+        'material': [_number(material.f_ck), _number(material.f_yk_main), _number(material.f_yk_shear),
+                     _number(material.gamma_c), _number(material.alpha_cc), _number(material.gamma_s)],
+        'section': [_number(section.b), _number(section.h), _number(section.min_cover),
+                    _number(section.cover_dev), _number(section.d_w), _number(section.rdp)],
+        'tension': layers(reinforcement.tension),
+        'compression': layers(reinforcement.compression),
+        'uls_m_ed': _number(loads.uls_m_ed),
+    }
+
+
+def case_key(material, section, reinforcement, loads):
+    payload = json.dumps([ENGINE_VERSION, canonical_inputs(material, section, reinforcement, loads)],
+                         separators=(',', ':'))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class DesignCache:
+    def __init__(self, maxsize=4096, path=None, write_batch=256):
+        self.maxsize = maxsize
+        self.path = path
+        self.write_batch = write_batch
+        self._memory = OrderedDict()
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._connection = None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if path is not None:
+            self._connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, version TEXT, result TEXT)")
+            self._connection.execute("DELETE FROM results WHERE version != ?", (ENGINE_VERSION,))
+            self._connection.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return len(self._memory)
+
+    def _remember(self, key, result):
+        self._memory[key] = result
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.maxsize:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key):
+        with self._lock:
+            result = self._memory.get(key)
+            if result is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                count('cache hits')
+                return result
+            if self._connection is not None:
+                stored = self._pending.get(key)
+                if stored is None:
+                    row = self._connection.execute("SELECT result FROM results WHERE key = ?", (key,)).fetchone()
+                    stored = row[0] if row is not None else None
+                if stored is not None:
+                    result = BendingResult.from_dict(json.loads(stored))
+                    self._remember(key, result)
+                    self.hits += 1
+                    self.disk_hits += 1
+                    count('cache hits')
+                    return result
+            self.misses += 1
+            count('cache misses')
+            return None
+
+    def put(self, key, result):
+        with self._lock:
+            self._remember(key, result)
+            if self._connection is not None:
+                self._pending[key] = json.dumps(result.as_dict())
+                if len(self._pending) >= self.write_batch:
+                    self._flush()
+
+    def design_bending(self, material, section, reinforcement, loads):
+        # Cached drop-in for ec2_design.design_bending
+        key = case_key(material, section, reinforcement, loads)
+        result = self.get(key)
+        if result is None:
+            result = design_bending(material, section, reinforcement, loads)
+            self.put(key, result)
+        return result
+
+    def _flush(self):
+        if self._pending:
+            self._connection.executemany("INSERT OR REPLACE INTO results VALUES (?, ?, ?)",
+                                         ((key, ENGINE_VERSION, stored) for key, stored in self._pending.items()))
+            self._connection.commit()
+            self._pending = {}
+
+    def flush(self):
+        with self._lock:
+            if self._connection is not None:
+                self._flush()
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._flush()
+                self._connection.close()
+                self._connection = None
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._pending = {}
+            if self._connection is not None:
+                self._connection.execute("DELETE FROM results")
+                self._connection.commit()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'size': len(self._memory),
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
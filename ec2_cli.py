@@ -0,0 +1,265 @@
+"""Command-line batch runner for EC2 bending checks.
+
+Reads beam cases from CSV or JSONL (a file or stdin), checks them in chunks
+across a process pool and streams one result record per input row to CSV or
+JSONL. Rows that cannot be parsed or checked produce an error record instead
+of stopping the run. --engine fibre reports the strain-compatibility
+resistance from ec2_fibre instead of the rectangular-block check. Nothing here
+imports Qt.
+
+    python RC_Beam_EC2.py batch beams.csv -o results.jsonl --workers 16
+    python ec2_cli.py - --input-format jsonl < beams.jsonl
+"""
+import argparse
+import csv
+import io
+import itertools
+import json
+import os
+import sys
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+
+from ec2_cache import DesignCache
+from ec2_design import case_from_record, design_bending, section_geometry
+from ec2_profile import count, span
+
+OUTPUT_FIELDS = [
+    'line', 'id', 'status', 'error', 'section_type', 'd_eff', 'dc_eff', 'K', 'K_bal', 'z_m',
+    'A_s_total', 'A_s_req', 'A_sc_total', 'A_sc_req',
+    'tension_utilisation_ratio', 'compression_utilisation_ratio', 'passed',
+]
+FIBRE_OUTPUT_FIELDS = [
+    'line', 'id', 'status', 'error', 'x', 'x_limit', 'M_Rd', 'utilisation', 'min_tension_strain', 'ductile', 'passed',
+]
+
+
+# Per-process result cache, opened on the first chunk when --cache is given
+_cache = None
+
+
+def _worker_cache(cache_path):
+    global _cache
+    if _cache is None or _cache.path != cache_path:
+        _cache = DesignCache(path=cache_path)
+    return _cache
+
+
+def check_row(line, record, design=design_bending):
+    # record is the parsed input mapping, or the parse error message for a malformed row
+    output = {'line': line, 'id': None, 'status': 'error', 'error': None}
+    if isinstance(record, str):
+        output['error'] = record
+        return output
+    output['id'] = record.get('id')
+    try:
+        result = design(*case_from_record(record))
+    except Exception as e:
+        output['error'] = str(e)
+        return output
+    output['status'] = 'ok'
+    output.update(result.summary())
+    return output
+
+
+def check_chunk(rows, cache_path=None, engine='simplified'):
+    # Returns the result records and the (hits, misses) this chunk added to the cache
+    if engine == 'fibre':
+        return check_chunk_fibre(rows), (0, 0)
+    if cache_path is None:
+        return [check_row(line, record) for line, record in rows], (0, 0)
+    cache = _worker_cache(cache_path)
+    hits, misses = cache.hits, cache.misses
+    results = [check_row(line, record, cache.design_bending) for line, record in rows]
+    cache.flush()
+    return results, (cache.hits - hits, cache.misses - misses)
+
+
+def check_chunk_fibre(rows):
+    # Strain-compatibility check of a whole chunk in one ec2_fibre batch
+    from ec2_fibre import fibre_analysis_cases
+
+    results, cases, checked = [], [], []
+    for line, record in rows:
+        output = {'line': line, 'id': None, 'status': 'error', 'error': None}
+        results.append(output)
+        if isinstance(record, str):
+            output['error'] = record
+            continue
+        output['id'] = record.get('id')
+        try:
+            case = case_from_record(record)
+            section_geometry(case[1], case[2])  # Raises for missing tension steel as the scalar path does
+        except Exception as e:
+            output['error'] = str(e)
+            continue
+        cases.append(case)
+        checked.append(output)
+    if not cases:
+        return results
+    try:
+        batch = fibre_analysis_cases(cases)
+    except Exception:
+        # One bad case fails the whole batch; check each row on its own so only that row errors
+        for case, output in zip(cases, checked):
+            try:
+                summary = fibre_analysis_cases([case]).result(0).summary()
+            except Exception as e:
+                output['error'] = str(e)
+                continue
+            output['status'] = 'ok'
+            output.update(summary)
+        return results
+    for i, output in enumerate(checked):
+        output['status'] = 'ok'
+        output.update(batch.result(i).summary())
+    return results
+
+
+def read_csv_rows(stream):
+    reader = csv.DictReader(stream)
+    for record in reader:
+        if None in record:
+            yield reader.line_num, f"Row has {len(reader.fieldnames) + len(record[None])} values, expected {len(reader.fieldnames)}."
+        else:
+            yield reader.line_num, record
+
+
+def read_jsonl_rows(stream):
+    for line, text in enumerate(stream, 1):
+        if not text.strip():
+            continue
+        try:
+            record = json.loads(text)
+        except ValueError as e:
+            yield line, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(record, dict):
+            yield line, "Expected a JSON object."
+            continue
+        yield line, record
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class ResultWriter:
+    def __init__(self, stream, output_format, fields=OUTPUT_FIELDS):
+        self.stream = stream
+        self.output_format = output_format
+        if output_format == 'csv':
+            self.writer = csv.DictWriter(stream, fields, extrasaction='ignore')
+            self.writer.writeheader()
+
+    def write_chunk(self, results):
+        if self.output_format == 'csv':
+            self.writer.writerows(results)
+        else:
+            self.stream.write(''.join(json.dumps(r) + '\n' for r in results))
+        self.stream.flush()
+
+
+def run_chunks(chunks, workers, ordered=True, cache_path=None, engine='simplified'):
+    # Yield checked chunks while keeping at most two chunks per worker in flight, so
+    # memory stays flat however long the input is
+    if workers <= 1:
+        for chunk in chunks:
+            with span('check chunk'):
+                checked = check_chunk(chunk, cache_path, engine)
+            yield checked
+        return
+
+    max_pending = workers * 2
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        if ordered:
+            pending = deque()
+            for chunk in chunks:
+                pending.append(pool.submit(check_chunk, chunk, cache_path, engine))
+                if len(pending) >= max_pending:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        else:
+            pending = set()
+            for chunk in chunks:
+                pending.add(pool.submit(check_chunk, chunk, cache_path, engine))
+                if len(pending) >= max_pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+            for future in as_completed(pending):
+                yield future.result()
+
+
+def detect_format(path, default='csv'):
+    if path and path != '-':
+        extension = os.path.splitext(path)[1].lower()
+        if extension in ('.jsonl', '.json', '.ndjson'):
+            return 'jsonl'
+        if extension == '.csv':
+            return 'csv'
+    return default
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='RC_Beam_EC2.py batch',
+                                     description='Run EC2 bending checks on beam cases from CSV or JSONL.')
+    parser.add_argument('input', nargs='?', default='-', help="input file, or '-' for stdin (default)")
+    parser.add_argument('-o', '--output', default='-', help="output file, or '-' for stdout (default)")
+    parser.add_argument('--input-format', choices=['csv', 'jsonl'], help='default: from the file extension, else csv')
+    parser.add_argument('--output-format', choices=['csv', 'jsonl'], help='default: from the file extension, else jsonl')
+    parser.add_argument('-j', '--workers', type=int, default=os.cpu_count() or 1,
+                        help='worker processes; 1 checks in-process (default: CPU count)')
+    parser.add_argument('--chunk-size', type=int, default=2000, help='rows per chunk (default: 2000)')
+    parser.add_argument('--unordered', action='store_true', help='write chunks as they complete')
+    parser.add_argument('--engine', choices=['simplified', 'fibre'], default='simplified',
+                        help='rectangular-block check or strain-compatibility resistance (default: simplified)')
+    parser.add_argument('--cache', metavar='PATH', help='SQLite result cache shared across runs (simplified engine)')
+    parser.add_argument('--strict', action='store_true', help='exit with status 1 if any row errors or fails')
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    input_format = args.input_format or detect_format(args.input, 'csv')
+    output_format = args.output_format or detect_format(args.output, 'jsonl')
+
+    if args.input == '-':
+        input_stream = io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8-sig', newline='')
+        close_input = input_stream.detach  # Leave stdin itself open
+    else:
+        input_stream = open(args.input, encoding='utf-8-sig', newline='')
+        close_input = input_stream.close
+    output_stream = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8', newline='')
+
+    rows = read_csv_rows(input_stream) if input_format == 'csv' else read_jsonl_rows(input_stream)
+    writer = ResultWriter(output_stream, output_format,
+                          FIBRE_OUTPUT_FIELDS if args.engine == 'fibre' else OUTPUT_FIELDS)
+    clean = True
+    hits = misses = 0
+    try:
+        for results, (chunk_hits, chunk_misses) in run_chunks(chunked(rows, max(args.chunk_size, 1)), args.workers,
+                                                             not args.unordered, args.cache, args.engine):
+            with span('write chunk'):
+                writer.write_chunk(results)
+            count('rows checked', len(results))
+            clean = clean and all(r['status'] == 'ok' and r['passed'] for r in results)
+            hits += chunk_hits
+            misses += chunk_misses
+    finally:
+        close_input()
+        if output_stream is not sys.stdout:
+            output_stream.close()
+    if args.cache:
+        print(f"cache: {hits} hits, {misses} misses", file=sys.stderr)
+    return 1 if args.strict and not clean else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
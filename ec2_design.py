@@ -0,0 +1,397 @@
+"""Eurocode 2 bending design of rectangular RC beam sections.
+
+This module holds the design calculation used by the RC_Beam_EC2 GUI without
+any Qt, matplotlib or PDF dependencies, so it can be driven from scripts,
+batch jobs and servers.
+"""
+import math
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional, Tuple
+
+from ec2_materials import CONCRETE_CLASSES, CONCRETE_STRENGTHS, concrete_properties
+from ec2_profile import count
+
+# Bump whenever a design formula changes so cached results are recomputed
+ENGINE_VERSION = "2"
+
+# Available reinforcement bar diameters in mm
+BAR_DIAMETERS = (10, 12, 13, 16, 20, 25, 32, 40, 55)
+
+# Modulus of Elasticity for Reinforcement (Default = 200 kN/mm²)
+E_s = 200 * 1e3
+
+SINGLY_REINFORCED = "Singly Reinforced Section"
+DOUBLY_REINFORCED = "Doubly Reinforced Section"
+
+
+@dataclass(frozen=True)
+class Material:
+    f_ck: float
+    f_yk_main: float = 500.0
+    f_yk_shear: float = 500.0
+    gamma_c: float = 1.5
+    alpha_cc: float = 0.85
+    gamma_s: float = 1.15
+
+    @classmethod
+    def from_class(cls, concrete_class, **kwargs):
+        return cls(CONCRETE_STRENGTHS[concrete_class], **kwargs)
+
+
+@dataclass(frozen=True)
+class Section:
+    b: float
+    h: float
+    min_cover: float = 30.0
+    cover_dev: float = 10.0
+    d_w: float = 0.0  # Shear link diameter, 0 when no links are specified
+    rdp: float = 15.0  # Redistribution percentage
+
+    @property
+    def c_nom(self):
+        return self.min_cover + self.cover_dev
+
+
+@dataclass(frozen=True)
+class BarLayer:
+    diameter: float
+    count: int
+
+    @property
+    def area(self):
+        return math.pi * (self.diameter * self.diameter) * 0.25 * self.count
+
+
+@dataclass(frozen=True)
+class Reinforcement:
+    # Layers are ordered from the outer face inwards
+    tension: Tuple[BarLayer, ...] = ()
+    compression: Tuple[BarLayer, ...] = ()
+
+    def __post_init__(self):
+        object.__setattr__(self, 'tension', tuple(self.tension))
+        object.__setattr__(self, 'compression', tuple(self.compression))
+
+
+@dataclass(frozen=True)
+class Loads:
+    # Moments in kNm, shear forces in kN
+    uls_m_ed: float = 0.0
+    sls_m_ed: float = 0.0
+    v_ed: float = 0.0
+    v_ef: float = 0.0
+    t_ed: float = 0.0
+    t_ef: float = 0.0
+
+
+@dataclass(frozen=True)
+class SectionGeometry:
+    # (diameter, area) per provided layer, outer face inwards
+    tension_layers: Tuple[Tuple[float, float], ...]
+    compression_layers: Tuple[Tuple[float, float], ...]
+    A_s_total: float
+    y_t: float
+    A_sc_total: float
+    y_c: float
+    d_eff: float
+    dc_eff: float
+
+    @property
+    def reinforcement_layers(self) -> Dict[str, List[Tuple[float, float]]]:
+        return {'tension': list(self.tension_layers), 'compression': list(self.compression_layers)}
+
+    def as_dict(self):
+        data = asdict(self)
+        data['tension_layers'] = [list(layer) for layer in self.tension_layers]
+        data['compression_layers'] = [list(layer) for layer in self.compression_layers]
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        data = dict(data)
+        data['tension_layers'] = tuple(tuple(layer) for layer in data['tension_layers'])
+        data['compression_layers'] = tuple(tuple(layer) for layer in data['compression_layers'])
+        return cls(**data)
+
+
+@dataclass(frozen=True)
+class BendingResult:
+    section_type: str
+    K: float
+    K_bal: float
+    z_m: float
+    A_s_req: float
+    A_sc_req: float
+    A_s_min: float
+    A_s_max: float
+    tension_utilisation_ratio: float
+    compression_utilisation_ratio: Optional[float]
+    geometry: SectionGeometry
+
+    @property
+    def d_eff(self):
+        return self.geometry.d_eff
+
+    @property
+    def dc_eff(self):
+        return self.geometry.dc_eff
+
+    @property
+    def A_s_total(self):
+        return self.geometry.A_s_total
+
+    @property
+    def A_sc_total(self):
+        return self.geometry.A_sc_total
+
+    @property
+    def compression_provided(self):
+        # A doubly reinforced section needs some compression steel to pass
+        return not (self.section_type == DOUBLY_REINFORCED and self.A_sc_req > 0 and self.A_sc_total == 0)
+
+    @property
+    def passed(self):
+        if self.tension_utilisation_ratio >= 1 or not self.compression_provided:
+            return False
+        if self.section_type == DOUBLY_REINFORCED and self.compression_utilisation_ratio is not None:
+            return self.compression_utilisation_ratio < 1
+        return True
+
+    def as_dict(self):
+        data = {name: getattr(self, name) for name in self.__dataclass_fields__ if name != 'geometry'}
+        data['geometry'] = self.geometry.as_dict()
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        data = dict(data)
+        data['geometry'] = SectionGeometry.from_dict(data['geometry'])
+        return cls(**data)
+
+    def summary(self):
+        # Flat record of the headline results, e.g. for CSV/JSON output
+        return {
+            'section_type': self.section_type,
+            'd_eff': self.d_eff,
+            'dc_eff': self.dc_eff,
+            'K': self.K,
+            'K_bal': self.K_bal,
+            'z_m': self.z_m,
+            'A_s_total': self.A_s_total,
+            'A_s_req': self.A_s_req,
+            'A_sc_total': self.A_sc_total,
+            'A_sc_req': self.A_sc_req,
+            'tension_utilisation_ratio': self.tension_utilisation_ratio,
+            'compression_utilisation_ratio': self.compression_utilisation_ratio,
+            'passed': self.passed,
+        }
+
+
+def layer_areas(layers):
+    # Keep only layers with a positive diameter and number of bars
+    return tuple((layer.diameter, layer.area) for layer in layers if layer.diameter > 0 and layer.count > 0)
+
+
+def layer_centroid(layers):
+    # Centroid of a group of (diameter, area) layers measured from the outer face of the
+    # first layer, with a clear spacing of max(25, d) between successive layers
+    A_total = sum((A for _, A in layers), 0.0)
+    if A_total == 0:
+        return A_total, 0.0
+    y = 0.0
+    offset = 0
+    for d, A in layers:
+        y += A * (offset + d * 0.5)
+        offset += d + max(25, d)
+    return A_total, y / A_total
+
+
+class LayerGroup:
+    """Rows of one face that are edited one at a time, e.g. from the GUI layer inputs.
+
+    Each row keeps its offset from the outer face and its first moment, so setting
+    row i recomputes that row, and the rows behind it only when its depth changes.
+    centroid() adds the rows up in the same order as layer_centroid, so both give
+    the same numbers.
+    """
+
+    def __init__(self, rows):
+        self.rows = [None] * rows  # (diameter, area), None for an empty row
+        self.offsets = [0] * rows
+        self.moments = [0.0] * rows
+
+    @staticmethod
+    def _depth(row):
+        # Depth a row takes up in front of the next one
+        return 0 if row is None else row[0] + max(25, row[0])
+
+    def set(self, i, layer):
+        row = layer_areas(() if layer is None else (layer,))
+        row = row[0] if row else None
+        moved = self._depth(row) != self._depth(self.rows[i])
+        self.rows[i] = row
+        stop = len(self.rows) if moved else i + 1
+        for j in range(i, stop):
+            self.offsets[j] = self.offsets[j - 1] + self._depth(self.rows[j - 1]) if j else 0
+            self.moments[j] = 0.0 if self.rows[j] is None else \
+                self.rows[j][1] * (self.offsets[j] + self.rows[j][0] * 0.5)
+        count('layers processed', stop - i)
+
+    @property
+    def layers(self):
+        return tuple(row for row in self.rows if row is not None)
+
+    def centroid(self):
+        # (A_total, y) as layer_centroid gives it for self.layers
+        A_total = sum((row[1] for row in self.rows if row is not None), 0.0)
+        if A_total == 0:
+            return A_total, 0.0
+        return A_total, sum(self.moments, 0.0) / A_total
+
+
+def section_geometry(section, reinforcement):
+    tension_layers = layer_areas(reinforcement.tension)
+    compression_layers = layer_areas(reinforcement.compression)
+    count('layers processed', len(tension_layers) + len(compression_layers))
+    return geometry_from_centroids(section, tension_layers, layer_centroid(tension_layers),
+                                   compression_layers, layer_centroid(compression_layers))
+
+
+def geometry_from_centroids(section, tension_layers, tension_centroid, compression_layers, compression_centroid):
+    # SectionGeometry from the (A_total, y) of each face, as layer_centroid or LayerGroup give them
+    A_s_total, y_t = tension_centroid
+    if A_s_total == 0:
+        raise ValueError("Total tension reinforcement area is zero. Please provide valid tension reinforcement data.")
+    A_sc_total, y_c = compression_centroid
+
+    c_nom = section.c_nom
+    d_eff = section.h - c_nom - section.d_w - y_t
+    dc_eff = c_nom + section.d_w + y_c
+    return SectionGeometry(tension_layers, compression_layers, A_s_total, y_t, A_sc_total, y_c, d_eff, dc_eff)
+
+
+def balanced_k(rdp, concrete=None):
+    # Limiting K for the given redistribution percentage, with the stress block of the
+    # concrete (an ec2_materials.Concrete); the <=C50/60 block when none is given
+    mr = 1 - (rdp / 100)
+    if concrete is None:
+        return 0.453 * (mr - 0.4) * (1 - 0.4 * (mr - 0.4))
+    xi = (mr - 0.4) / concrete.k2
+    return 0.453 * concrete.block_scale * xi * (1 - 0.5 * concrete.lambda_block * xi)
+
+
+def check_bending(material, section, geometry, loads):
+    f_ck = material.f_ck
+    f_yd = material.f_yk_main / material.gamma_s
+    b = section.b
+    d_eff = geometry.d_eff
+
+    concrete = concrete_properties(f_ck)
+    K_bal = balanced_k(section.rdp, concrete)
+    M_Ed = loads.uls_m_ed * 1e6  # kNm to Nmm
+
+    K = M_Ed / (b * (d_eff * d_eff) * f_ck)
+
+    if K <= K_bal:
+        section_type = SINGLY_REINFORCED
+        # Calculate lever arm 'z_m'
+        root = 0.25 - concrete.lever_coefficient * K
+        if root < 0:
+            # If the value inside the square root is negative, use 0.95 * d_eff
+            z_m = 0.95 * d_eff
+        else:
+            z_m = min(((0.5 + math.sqrt(root)) * d_eff), 0.95 * d_eff)
+        A_s_req = max(M_Ed / (z_m * f_yd), 0.001572 * b * d_eff)
+        A_sc_req = 0.0  # No compression reinforcement required
+    else:
+        section_type = DOUBLY_REINFORCED
+        z_m = d_eff * concrete.z_doubly
+        A_sc_req = ((K - K_bal) * f_ck * b * (d_eff * d_eff)) / (f_yd * (d_eff - geometry.dc_eff))
+        A_s_req = ((K_bal * f_ck * b * (d_eff * d_eff)) / (z_m * f_yd)) + A_sc_req
+
+    # Minimum and Maximum Reinforcement Check
+    A_s_min = 0.001572 * b * d_eff
+    A_s_max = 0.04 * b * section.h
+    A_s_req = min(max(A_s_req, A_s_min), A_s_max)
+
+    tension_utilisation_ratio = A_s_req / geometry.A_s_total
+    compression_utilisation_ratio = A_sc_req / geometry.A_sc_total if geometry.A_sc_total > 0 else None
+
+    return BendingResult(section_type, K, K_bal, z_m, A_s_req, A_sc_req, A_s_min, A_s_max,
+                         tension_utilisation_ratio, compression_utilisation_ratio, geometry)
+
+
+def design_bending(material, section, reinforcement, loads):
+    return check_bending(material, section, section_geometry(section, reinforcement), loads)
+
+
+def _field(record, name, convert=float, default=None):
+    value = record.get(name)
+    if value is None or value == '':
+        if default is None:
+            raise ValueError(f"Missing value for '{name}'.")
+        return default
+    try:
+        return convert(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid value for '{name}': {value!r}")
+
+
+def _record_layers(record, group, prefix):
+    # Layers come either as a list of [diameter, count] pairs under 'tension'/'compression'
+    # or as flat t1_d, t1_n, t2_d, ... (c1_d, c1_n, ...) fields as read from a CSV header
+    if group in record:
+        return [BarLayer(float(d), int(n)) for d, n in record[group] or ()]
+    layers = []
+    i = 1
+    while f'{prefix}{i}_d' in record:
+        diameter = _field(record, f'{prefix}{i}_d', default=0.0)
+        count = _field(record, f'{prefix}{i}_n', int, default=0)
+        layers.append(BarLayer(diameter, count))
+        i += 1
+    return layers
+
+
+def case_from_record(record):
+    """Build (Material, Section, Reinforcement, Loads) from a flat field mapping.
+
+    Field names follow the record attributes; the concrete strength may be given
+    as 'f_ck' or 'concrete_class' and ULS M_Ed as 'uls_m_ed' or 'm_ed'.
+    """
+    if record.get('f_ck') in (None, ''):
+        concrete_class = record.get('concrete_class')
+        if concrete_class not in CONCRETE_STRENGTHS:
+            raise ValueError(f"Unknown concrete class: {concrete_class!r}")
+        f_ck = CONCRETE_STRENGTHS[concrete_class]
+    else:
+        f_ck = _field(record, 'f_ck')
+
+    material = Material(
+        f_ck=f_ck,
+        f_yk_main=_field(record, 'f_yk_main', default=_field(record, 'f_yk', default=Material.f_yk_main)),
+        f_yk_shear=_field(record, 'f_yk_shear', default=Material.f_yk_shear),
+        gamma_c=_field(record, 'gamma_c', default=Material.gamma_c),
+        alpha_cc=_field(record, 'alpha_cc', default=Material.alpha_cc),
+        gamma_s=_field(record, 'gamma_s', default=Material.gamma_s),
+    )
+    section = Section(
+        b=_field(record, 'b'),
+        h=_field(record, 'h'),
+        min_cover=_field(record, 'min_cover', default=Section.min_cover),
+        cover_dev=_field(record, 'cover_dev', default=Section.cover_dev),
+        d_w=_field(record, 'd_w', default=Section.d_w),
+        rdp=_field(record, 'rdp', default=Section.rdp),
+    )
+    reinforcement = Reinforcement(
+        tension=_record_layers(record, 'tension', 't'),
+        compression=_record_layers(record, 'compression', 'c'),
+    )
+    loads = Loads(
+        uls_m_ed=_field(record, 'uls_m_ed', default=_field(record, 'm_ed', default=Loads.uls_m_ed)),
+        sls_m_ed=_field(record, 'sls_m_ed', default=Loads.sls_m_ed),
+        v_ed=_field(record, 'v_ed', default=Loads.v_ed),
+        v_ef=_field(record, 'v_ef', default=Loads.v_ef),
+        t_ed=_field(record, 't_ed', default=Loads.t_ed),
+        t_ef=_field(record, 't_ef', default=Loads.t_ef),
+    )
+    return material, section, reinforcement, loads
@@ -0,0 +1,355 @@
+"""Strain-compatibility (fibre) bending resistance of rectangular sections.
+
+A second engine next to the simplified rectangular-block check in ec2_design.
+Concrete follows the EC2 3.1.7 parabola-rectangle diagram and reinforcement the
+bilinear diagram with a horizontal top branch (3.2.7), so the ultimate strain
+is reached at the compression face (ε_cu2) and the neutral axis depth x is
+found from force equilibrium.
+
+The concrete is discretised into fibres across the compressed depth. With the
+strain pinned at ε_cu2 on the compression face, the strain in a fibre depends
+only on its depth as a fraction of x, so the fibres are integrated into a force
+α f_cd b x acting at β x. α and β are integrated once per point of the
+ec2_materials f_ck grid and interpolated like the other concrete fields, so a
+batch with a different f_ck on every row costs no more than one with a single
+class; each solver step then only evaluates the bar layers. The neutral axis is found by a safeguarded
+Newton iteration on a bracket (steps that leave the bracket or stop converging
+fall back to bisection), vectorized over a whole batch of sections at once and
+restricted to the sections still iterating.
+
+Depths are measured from the compression face, forces are in N and moments in
+kNm. Displaced concrete is deducted at bars inside the compression zone.
+"""
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import numpy as np
+
+from ec2_design import E_s, section_geometry
+from ec2_materials import F_CK_MIN, F_CK_STEP, GRID_SIZE, concrete_arrays
+
+N_FIBRES = 200
+
+# α and β at every point of the ec2_materials f_ck grid, per fibre count
+_grid_factors = {}
+
+
+def parabola_rectangle_parameters(f_ck):
+    # EC2 Table 3.1: strain at peak stress ε_c2, ultimate strain ε_cu2 and exponent n
+    concrete = concrete_arrays(f_ck)
+    return concrete.eps_c2, concrete.eps_cu2, concrete.n
+
+
+def concrete_stress(strain, eps_c2, exponent):
+    # σ_c / f_cd of the parabola-rectangle diagram (zero in tension) and its slope d/dε
+    remaining = 1 - np.minimum(np.maximum(strain / eps_c2, 0.0), 1.0)
+    power = remaining if np.ndim(exponent) == 0 and exponent == 2 else remaining ** (exponent - 1)
+    slope = np.where((remaining > 0) & (remaining < 1), exponent / eps_c2 * power, 0.0)
+    return 1 - power * remaining, slope
+
+
+def stress_block_factors(f_ck, n_fibres=N_FIBRES):
+    """Fibre integrals of the compressed zone for each concrete strength in f_ck.
+
+    The zone is cut into n_fibres fibres of depth x / n_fibres. Returns α and β
+    with concrete force α f_cd b x acting at β x from the compression face.
+    """
+    eps_c2, eps_cu2, exponent = parabola_rectangle_parameters(f_ck)
+    t = (np.arange(n_fibres) + 0.5) / n_fibres
+    stress, _ = concrete_stress(eps_cu2[:, None] * (1 - t), eps_c2[:, None], exponent[:, None])
+    alpha = stress.mean(axis=1)
+    beta = (stress * t).mean(axis=1) / alpha
+    return alpha, beta
+
+
+def grid_stress_block_factors(n_fibres=N_FIBRES):
+    # Integrated once on the f_ck grid, so a batch only interpolates between grid points
+    factors = _grid_factors.get(n_fibres)
+    if factors is None:
+        factors = _grid_factors[n_fibres] = stress_block_factors(F_CK_MIN + F_CK_STEP * np.arange(GRID_SIZE), n_fibres)
+    return factors
+
+
+@dataclass
+class FibreBatchResult:
+    valid: np.ndarray  # False where the section has no steel
+    converged: np.ndarray
+    x: np.ndarray  # Neutral axis depth in mm
+    M_Rd: np.ndarray  # kNm
+    x_limit: np.ndarray  # Largest x allowed by the redistribution ductility rule (EC2 5.5)
+    concrete_force: np.ndarray  # N, compression positive
+    epsilon_cu2: np.ndarray
+    layer_depths: np.ndarray  # (n, layers), tension layers first, then compression layers
+    layer_areas: np.ndarray
+    strains: np.ndarray  # Compression positive
+    stresses: np.ndarray  # N/mm², compression positive
+    utilisation: np.ndarray  # M_Ed / M_Rd, NaN when no M_Ed was given
+    n_tension: Optional[int] = None  # Number of tension layer columns, when known
+
+    def __len__(self):
+        return len(self.x)
+
+    @property
+    def ductile(self):
+        return self.x <= self.x_limit
+
+    @property
+    def passed(self):
+        return self.valid & self.converged & (self.utilisation < 1) & self.ductile
+
+    def result(self, i):
+        # FibreResult for section i, keeping only the layers that hold steel
+        provided = self.layer_areas[i] > 0
+        n_tension = len(provided) if self.n_tension is None else self.n_tension
+        strains = self.strains[i].tolist()
+        stresses = self.stresses[i].tolist()
+
+        def pick(values, start, stop):
+            return tuple(v for v, keep in zip(values[start:stop], provided[start:stop]) if keep)
+
+        utilisation = float(self.utilisation[i])
+        return FibreResult(
+            x=float(self.x[i]),
+            M_Rd=float(self.M_Rd[i]),
+            x_limit=float(self.x_limit[i]),
+            epsilon_cu2=float(self.epsilon_cu2[i]),
+            concrete_force=float(self.concrete_force[i]),
+            tension_strains=pick(strains, 0, n_tension),
+            tension_stresses=pick(stresses, 0, n_tension),
+            compression_strains=pick(strains, n_tension, None),
+            compression_stresses=pick(stresses, n_tension, None),
+            utilisation=None if np.isnan(utilisation) else utilisation,
+            converged=bool(self.converged[i]),
+        )
+
+
+def batch_layer_depths(h, c_nom, d_w, tension_diameters, tension_counts,
+                       compression_diameters=None, compression_counts=None):
+    """(n, layers) depths from the compression face and areas of every bar layer.
+
+    Layers are spaced as in ec2_design.layer_centroid; tension columns come
+    first, then compression columns, and empty layers get zero area.
+    """
+    tension_diameters = np.atleast_2d(np.asarray(tension_diameters, dtype=float))
+    n = tension_diameters.shape[0]
+    depths, areas = [], []
+    for face, diameters, counts in (('tension', tension_diameters, tension_counts),
+                                    ('compression', compression_diameters, compression_counts)):
+        if diameters is None:
+            continue
+        diameters = np.broadcast_to(np.atleast_2d(np.asarray(diameters, dtype=float)), (n, np.shape(diameters)[-1]))
+        counts = np.broadcast_to(np.atleast_2d(np.asarray(counts, dtype=float)), diameters.shape)
+        offset = np.zeros(n)
+        for j in range(diameters.shape[1]):
+            d = diameters[:, j]
+            active = (d > 0) & (counts[:, j] > 0)
+            inset = c_nom + d_w + offset + d * 0.5
+            depths.append(h - inset if face == 'tension' else inset)
+            areas.append(np.where(active, np.pi * (d * d) * 0.25 * counts[:, j], 0.0))
+            offset = offset + np.where(active, d + np.maximum(25, d), 0.0)
+    if not depths:
+        return np.zeros((n, 0)), np.zeros((n, 0))
+    return np.column_stack(depths) * np.ones((n, 1)), np.column_stack(areas)
+
+
+def fibre_analysis_batch(b, h, f_ck, f_yk, layer_depths, layer_areas, M_Ed=None, rdp=0.0, d_eff=None,
+                         alpha_cc=0.85, gamma_c=1.5, gamma_s=1.15, n_fibres=N_FIBRES, tol=1e-7,
+                         max_iterations=60):
+    """Bending resistance of n sections from strain compatibility.
+
+    layer_depths and layer_areas are (n, layers) arrays from the compression
+    face (see batch_layer_depths); scalar inputs are broadcast. M_Ed in kNm
+    gives the utilisation. d_eff (default: the centroid depth of the steel in
+    tension at failure) and rdp set the ductility limit x <= (δ - k1) d / k2.
+    """
+    layer_depths = np.atleast_2d(np.asarray(layer_depths, dtype=float))
+    layer_areas = np.atleast_2d(np.asarray(layer_areas, dtype=float))
+    n = layer_depths.shape[0]
+    b, h, f_ck, f_yk, rdp, alpha_cc, gamma_c, gamma_s = (
+        np.broadcast_to(np.asarray(v, dtype=float), (n,))
+        for v in (b, h, f_ck, f_yk, rdp, alpha_cc, gamma_c, gamma_s))
+    f_cd = alpha_cc * f_ck / gamma_c
+    f_yd = f_yk / gamma_s
+
+    # Fibre integrals interpolated from the f_ck grid; strengths off the grid are integrated directly
+    concrete = concrete_arrays(f_ck)
+    alpha, beta = (concrete.interpolate(v) for v in grid_stress_block_factors(n_fibres))
+    if concrete.outside.size:
+        alpha[concrete.outside], beta[concrete.outside] = stress_block_factors(f_ck[concrete.outside], n_fibres)
+    eps_c2, eps_cu2, exponent = concrete.eps_c2, concrete.eps_cu2, concrete.n
+    eps_c2_l, eps_cu2_l, exponent_l, f_cd_l, f_yd_l = (v[:, None] for v in (eps_c2, eps_cu2, exponent, f_cd, f_yd))
+    # Concrete force per mm of neutral axis depth
+    concrete_slope = alpha * b * f_cd
+    # Up to C50 the parabola is a plain square
+    mixed = bool((exponent != 2).any())
+
+    def steel(x, rows):
+        x_l = x[:, None]
+        depths, eps_cu, f_yd_r, f_cd_r = layer_depths[rows], eps_cu2_l[rows], f_yd_l[rows], f_cd_l[rows]
+        strain = eps_cu * (x_l - depths) / x_l
+        elastic = E_s * strain
+        stress = np.minimum(np.maximum(elastic, -f_yd_r), f_yd_r)
+        # Less the concrete the bars displace
+        displaced, displaced_slope = concrete_stress(strain, eps_c2_l[rows], exponent_l[rows] if mixed else 2.0)
+        net = stress - f_cd_r * displaced
+        slope = np.where(np.abs(elastic) < f_yd_r, E_s, 0.0) - f_cd_r * displaced_slope
+        d_strain = eps_cu * depths / (x_l * x_l)
+        areas = layer_areas[rows]
+        return strain, stress, areas * net, areas * slope * d_strain
+
+    def residual(x, rows):
+        _, _, steel_forces, steel_slopes = steel(x, rows)
+        return concrete_slope[rows] * x + steel_forces.sum(axis=1), concrete_slope[rows] + steel_slopes.sum(axis=1)
+
+    # Bracket the root: as x -> 0 every bar yields in tension and at x = h every bar
+    # is compressed, so a root exists whenever there is steel
+    everything = slice(None)
+    valid = layer_areas.sum(axis=1) > 0
+    lo = h * 1e-6
+    hi = h.copy()
+
+    # Start from a rectangular block balancing the yielding steel in the lower half,
+    # then iterate on the sections that have not converged yet
+    x = np.clip(np.where(layer_depths > h[:, None] / 2, layer_areas, 0.0).sum(axis=1) * f_yd / concrete_slope,
+                0.05 * h, h)
+    x = np.where(valid, x, 0.5 * h)
+    previous_step = hi - lo
+    converged = ~valid
+    active = np.flatnonzero(valid)
+    for _ in range(max_iterations):
+        if not active.size:
+            break
+        x_a = x[active]
+        N, dN = residual(x_a, active)
+        lo_a = np.where(N < 0, x_a, lo[active])
+        hi_a = np.where(N > 0, x_a, hi[active])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            newton = x_a - N / dN
+        # Bisect when Newton leaves the bracket or stops halving the step, as it can
+        # when it cycles across a yield kink
+        use_newton = ((dN > 0) & (newton >= lo_a) & (newton <= hi_a)
+                      & (np.abs(newton - x_a) <= 0.5 * previous_step[active]))
+        x_new = np.where(use_newton, newton, 0.5 * (lo_a + hi_a))
+        step = np.abs(x_new - x_a)
+        x[active], lo[active], hi[active], previous_step[active] = x_new, lo_a, hi_a, step
+        done = (step <= tol * h[active]) | (N == 0)
+        converged[active[done]] = True
+        active = active[~done]
+
+    concrete_force = concrete_slope * x
+    strains, stresses, steel_forces, _ = steel(x, everything)
+    # Moment of the internal forces about the compression face, tension positive
+    M_Rd = ((-steel_forces * layer_depths).sum(axis=1) - concrete_force * beta * x) / 1e6
+
+    if d_eff is None:
+        in_tension = np.where(strains < 0, layer_areas, 0.0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            d_eff = (in_tension * layer_depths).sum(axis=1) / in_tension.sum(axis=1)
+    k2 = 0.6 + 0.0014 / eps_cu2
+    x_limit = (1 - rdp / 100 - 0.4) / k2 * np.asarray(d_eff, dtype=float)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        utilisation = np.full(n, np.nan) if M_Ed is None else np.asarray(M_Ed, dtype=float) / M_Rd
+    invalid = ~valid
+    if invalid.any():
+        for values in (x, M_Rd, concrete_force, utilisation):
+            values[invalid] = np.nan
+        strains[invalid] = np.nan
+        stresses[invalid] = np.nan
+    return FibreBatchResult(valid, converged & valid, x, M_Rd, x_limit, concrete_force, eps_cu2, layer_depths,
+                            layer_areas, strains, stresses, utilisation)
+
+
+@dataclass(frozen=True)
+class FibreResult:
+    x: float
+    M_Rd: float  # kNm
+    x_limit: float
+    epsilon_cu2: float
+    concrete_force: float  # N
+    # Per provided layer, outer face inwards; strains and stresses compression positive
+    tension_strains: Tuple[float, ...]
+    tension_stresses: Tuple[float, ...]
+    compression_strains: Tuple[float, ...]
+    compression_stresses: Tuple[float, ...]
+    utilisation: Optional[float]
+    converged: bool
+
+    @property
+    def ductile(self):
+        return self.x <= self.x_limit
+
+    @property
+    def passed(self):
+        return self.converged and self.utilisation is not None and self.utilisation < 1 and self.ductile
+
+    def summary(self):
+        # Flat record of the headline results, e.g. for CSV/JSON output
+        return {
+            'x': self.x,
+            'x_limit': self.x_limit,
+            'M_Rd': self.M_Rd,
+            'utilisation': self.utilisation,
+            'min_tension_strain': min(self.tension_strains, default=None),
+            'ductile': self.ductile,
+            'passed': self.passed,
+        }
+
+
+def fibre_analysis(material, section, geometry, loads=None, n_fibres=N_FIBRES):
+    """Strain-compatibility resistance of one section from its SectionGeometry."""
+    inset = section.c_nom + section.d_w
+
+    def depths(layers, from_bottom):
+        offset, result = 0, []
+        for d, _ in layers:
+            result.append(section.h - (inset + offset + d * 0.5) if from_bottom else inset + offset + d * 0.5)
+            offset += d + max(25, d)
+        return result
+
+    layer_depths = depths(geometry.tension_layers, True) + depths(geometry.compression_layers, False)
+    layer_areas = [A for _, A in geometry.tension_layers + geometry.compression_layers]
+    batch = fibre_analysis_batch(section.b, section.h, material.f_ck, material.f_yk_main, [layer_depths],
+                                 [layer_areas], None if loads is None else loads.uls_m_ed, section.rdp,
+                                 geometry.d_eff, material.alpha_cc, material.gamma_c, material.gamma_s, n_fibres)
+    if not batch.valid[0]:
+        raise ValueError("No neutral axis depth balances the section forces. Please check the tension reinforcement.")
+
+    batch.n_tension = len(geometry.tension_layers)
+    return batch.result(0)
+
+
+def design_fibre(material, section, reinforcement, loads=None, n_fibres=N_FIBRES):
+    # Counterpart of ec2_design.design_bending
+    return fibre_analysis(material, section, section_geometry(section, reinforcement), loads, n_fibres)
+
+
+def fibre_analysis_cases(cases, n_fibres=N_FIBRES):
+    """Batch strain-compatibility check of (Material, Section, Reinforcement, Loads) tuples."""
+    from ec2_batch import batch_layer_centroid, layer_arrays
+
+    materials, sections, reinforcements, loads = zip(*cases) if cases else ((), (), (), ())
+    tension_diameters, tension_counts = layer_arrays([r.tension for r in reinforcements])
+    compression_diameters, compression_counts = layer_arrays([r.compression for r in reinforcements])
+    h = np.array([s.h for s in sections], dtype=float)
+    inset = np.array([s.c_nom + s.d_w for s in sections], dtype=float)
+    layer_depths, layer_areas = batch_layer_depths(h, inset, 0.0, tension_diameters, tension_counts,
+                                                   compression_diameters, compression_counts)
+    _, y_t = batch_layer_centroid(tension_diameters, tension_counts)
+    batch = fibre_analysis_batch(
+        b=[s.b for s in sections],
+        h=h,
+        f_ck=[m.f_ck for m in materials],
+        f_yk=[m.f_yk_main for m in materials],
+        layer_depths=layer_depths,
+        layer_areas=layer_areas,
+        M_Ed=[l.uls_m_ed for l in loads],
+        rdp=[s.rdp for s in sections],
+        d_eff=h - inset - y_t,
+        alpha_cc=[m.alpha_cc for m in materials],
+        gamma_c=[m.gamma_c for m in materials],
+        gamma_s=[m.gamma_s for m in materials],
+        n_fibres=n_fibres,
+    )
+    batch.n_tension = tension_diameters.shape[1]
+    return batch
@@ -0,0 +1,853 @@
+"""PyQt5 window for the EC2 rectangular beam design tool.
+
+matplotlib is only imported when the section diagram is first drawn and fpdf
+when a PDF is first saved, so opening the window stays fast.
+
+Calculate, Optimize and Save PDF read the form on the GUI thread and run the
+rest on worker threads (ec2_tasks); only updating the widgets and drawing the
+canvas happen back on the GUI thread. A new Calculate press supersedes a run
+still in progress, and a progress bar with a Cancel button shows while any
+task is running. Live mode stays on the GUI thread: it only redoes the stages
+an edit touched. What If lists the change of each input that brings the
+utilisation ratio to 1.0, from the analytic sensitivities of ec2_sensitivity.
+"""
+from PyQt5.QtCore import QTimer
+from PyQt5.QtGui import QFontDatabase, QKeySequence
+from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QFormLayout, QLineEdit, QLabel, QPushButton, QGroupBox, QGridLayout, QTextEdit, QFileDialog, QComboBox, QCheckBox, QShortcut, QProgressBar)
+
+from ec2_design import (CONCRETE_CLASSES, CONCRETE_STRENGTHS, BAR_DIAMETERS,
+                        Material, Section, BarLayer, Reinforcement, Loads, LayerGroup, check_bending,
+                        geometry_from_centroids)
+from ec2_cache import DesignCache
+from ec2_profile import PROFILER, count, span
+from ec2_tasks import TaskRunner
+from ec2_report import bending_results_rows, shear_results_rows, sls_results_rows, torsion_results_rows
+
+
+# Helper function to create each row in the results table
+def format_row(parameter, value, unit=""):
+    count('rows formatted')
+    # Format the value to 3 decimal places if it is a float
+    value_str = f"{value:.3f}" if isinstance(value, float) else value
+    return f"""
+        <tr>
+            <td class="label">{parameter}</td>
+            <td class="equal">=</td>
+            <td class="value">{value_str}</td>
+            <td class="unit">{unit}</td>
+        </tr>
+    """
+
+
+def bending_results_html(material, result, shear=None, torsion=None, sls=None):
+    # Define all labels to calculate the maximum label length
+    labels = [
+        "Section Type",
+        "Tension Reinforcement Utilisation Ratio",
+        "Compression Reinforcement Utilisation Ratio",
+        "Concrete strength (f_ck)",
+        "Main reinforcement strength (f_yk_main)",
+        "Shear reinforcement strength (f_yk_shear)",
+        "Partial factor for concrete (gamma_c)",
+        "Compressive strength coefficient (alpha_cc)",
+        "Partial factor for steel (gamma_s)",
+        "A_s_Pro",
+        "A_s_req",
+        "A_s_req / A_s_Pro",
+        "A_sc_Pro",
+        "A_sc_req",
+        "A_sc_req / A_sc_Pro"
+    ]
+
+    # Calculate maximum label length and add padding
+    max_label_length = max(len(label) for label in labels) + 4  # Adjust padding as needed
+    label_width_css = f"{max_label_length}ch"  # Use the calculated width for CSS
+
+    # Define HTML with inline CSS for dynamically set label width
+    html_output = f"""
+    <style>
+        .label {{ width: {label_width_css}; text-align: left; padding-right: 10px; }}
+        .equal {{ width: 4ch; text-align: center; }}
+        .value {{ width: 10ch; text-align: right; }}
+        .unit {{ width: 8ch; text-align: left; padding-left: 10px; }}
+    </style>
+    <table>
+    """
+
+    rows = bending_results_rows(material, result)
+    if shear is not None:
+        rows += shear_results_rows(shear)
+    if torsion is not None:
+        rows += torsion_results_rows(torsion)
+    if sls is not None:
+        rows += sls_results_rows(sls)
+    for row in rows:
+        if isinstance(row, str):
+            html_output += f"<tr><td colspan='4'><b>{row}</b></td></tr>"
+        else:
+            html_output += format_row(*row)
+
+    # Close the table
+    html_output += "</table>"
+    return html_output
+
+
+# Delay between the last edit and a live recalculation
+LIVE_DEBOUNCE_MS = 250
+
+
+class RCBeamDesignApp(QWidget):
+    def __init__(self):
+        super().__init__()
+        self.design_cache = DesignCache()
+        self.tasks = TaskRunner(parent=self)
+        self.init_ui()
+        self.init_live_mode()
+        # Hidden diagnostics panel with the profiling report, created on first use
+        self.diagnostics_panel = None
+        self.what_if_panel = None
+        QShortcut(QKeySequence('Ctrl+Shift+D'), self, self.show_diagnostics)
+
+    def init_ui(self):
+        main_layout = QVBoxLayout()
+
+        # Top left: Diagram of the rectangular section, created on first use
+        top_layout = QHBoxLayout()
+        self.top_layout = top_layout
+        self.section_figure = None
+        self.section_canvas = None
+        self.section_renderer = None
+        self.section_args = None  # Arguments of the last diagram drawn
+        self.section_placeholder = QWidget()
+        self.section_placeholder.setMinimumWidth(300)  # Add minimum width
+        top_layout.addWidget(self.section_placeholder)
+
+        # Material and Section Details next to the diagram
+        details_layout = QHBoxLayout()
+
+        # Material Details
+        material_group_box = QGroupBox("Material Details Input")
+        material_form_layout = QFormLayout()
+        self.concrete_class_input = QComboBox()
+        self.concrete_class_input.addItems(list(CONCRETE_CLASSES.values()))
+        self.concrete_class_input.setMaximumWidth(150)
+        self.f_yk_main_input = QLineEdit('500')
+        self.f_yk_shear_input = QLineEdit('500')
+        self.gamma_c_input = QLineEdit('1.5')
+        self.alpha_cc_input = QLineEdit('0.85')
+        self.gamma_s_input = QLineEdit('1.15')
+        material_form_layout.addRow(QLabel('Concrete Class:'), self.create_input_with_unit(self.concrete_class_input, ''))
+        material_form_layout.addRow(QLabel('Main Reinforcement Strength:'), self.create_input_with_unit(self.f_yk_main_input, 'N/mm²'))
+        material_form_layout.addRow(QLabel('Shear Reinforcement Strength:'), self.create_input_with_unit(self.f_yk_shear_input, 'N/mm²'))
+        material_form_layout.addRow(QLabel('Partial Factor for Concrete (γ_c):'), self.create_input_with_unit(self.gamma_c_input, ''))
+        material_form_layout.addRow(QLabel('Compressive Strength Coefficient (α_cc):'), self.create_input_with_unit(self.alpha_cc_input, ''))
+        material_form_layout.addRow(QLabel('Partial Factor for Steel (γ_s):'), self.create_input_with_unit(self.gamma_s_input, ''))
+        material_group_box.setLayout(material_form_layout)
+        details_layout.addWidget(material_group_box)
+
+        # Section Details
+        section_group_box = QGroupBox("Section Details Input")
+        section_form_layout = QFormLayout()
+        self.min_cover_input = QLineEdit('30')
+        self.cover_dev_input = QLineEdit('10')
+        self.section_depth_input = QLineEdit('500')
+        self.section_width_input = QLineEdit('300')
+        self.rdp_input = QLineEdit('15')
+        section_form_layout.addRow(QLabel('Minimum Cover:'), self.create_input_with_unit(self.min_cover_input, 'mm'))
+        section_form_layout.addRow(QLabel('Cover Deviation:'), self.create_input_with_unit(self.cover_dev_input, 'mm'))
+        section_form_layout.addRow(QLabel('Section Depth:'), self.create_input_with_unit(self.section_depth_input, 'mm'))
+        section_form_layout.addRow(QLabel('Section Width:'), self.create_input_with_unit(self.section_width_input, 'mm'))
+        section_form_layout.addRow(QLabel('Redistribution Percentage:'), self.create_input_with_unit(self.rdp_input, '%'))
+        section_group_box.setLayout(section_form_layout)
+        details_layout.addWidget(section_group_box)
+
+        # Design Loading Details
+        design_load_group_box = QGroupBox("Design Loading Input")
+        design_load_form_layout = QFormLayout()
+        self.sls_m_ed_input = QLineEdit('0')
+        self.uls_m_ed_input = QLineEdit('500')
+        self.v_ed_input = QLineEdit('0')
+        self.v_ef_input = QLineEdit('0')
+        self.t_ed_input = QLineEdit('0')
+        self.t_ef_input = QLineEdit('0')
+        design_load_form_layout.addRow(QLabel('SLS M_Ed:'), self.create_input_with_unit(self.sls_m_ed_input, 'kNm'))
+        design_load_form_layout.addRow(QLabel('ULS M_Ed:'), self.create_input_with_unit(self.uls_m_ed_input, 'kNm'))
+        design_load_form_layout.addRow(QLabel('V_Ed:'), self.create_input_with_unit(self.v_ed_input, 'kN'))
+        design_load_form_layout.addRow(QLabel('V_Ef:'), self.create_input_with_unit(self.v_ef_input, 'kN'))
+        design_load_form_layout.addRow(QLabel('T_Ed:'), self.create_input_with_unit(self.t_ed_input, 'kNm'))
+        design_load_form_layout.addRow(QLabel('T_Ef:'), self.create_input_with_unit(self.t_ef_input, 'kNm'))
+        design_load_group_box.setLayout(design_load_form_layout)
+        details_layout.addWidget(design_load_group_box)
+
+        top_layout.addLayout(details_layout)
+        main_layout.addLayout(top_layout)
+
+        # Row 3: Reinforcement and Shear Reinforcement Details
+        reinforcement_layout = QHBoxLayout()
+
+        # Tension Reinforcement Details
+        tension_group_box = QGroupBox("Tension Reinforcement Details Input")
+        tension_form_layout = QGridLayout()
+        tension_form_layout.addWidget(QLabel("Layer"), 0, 0)
+        tension_form_layout.addWidget(QLabel("Diameter"), 0, 1)
+        tension_form_layout.addWidget(QLabel("Number of Bars"), 0, 2)
+
+        self.tension_layers_input = []
+        for i in range(1, 7):
+            tension_form_layout.addWidget(QLabel(f"Layer {i}"), i, 0)
+            tension_diameter_input = QComboBox()
+            tension_diameter_input.addItems([""])
+            tension_diameter_input.addItems([str(d) for d in BAR_DIAMETERS])
+            tension_diameter_input.setFixedWidth(60)  # Set width to match existing input field size
+            tension_number_input = QLineEdit('')
+            tension_number_input.setFixedWidth(60)  # Set width to match existing input field size
+            tension_form_layout.addWidget(tension_diameter_input, i, 1)
+            tension_form_layout.addWidget(tension_number_input, i, 2)
+            self.tension_layers_input.append((tension_diameter_input, tension_number_input))
+
+        tension_group_box.setLayout(tension_form_layout)
+        reinforcement_layout.addWidget(tension_group_box)
+
+        # Compression Reinforcement Details
+        compression_group_box = QGroupBox("Compression Reinforcement Details Input")
+        compression_form_layout = QGridLayout()
+        compression_form_layout.addWidget(QLabel("Layer"), 0, 0)
+        compression_form_layout.addWidget(QLabel("Diameter"), 0, 1)
+        compression_form_layout.addWidget(QLabel("Number of Bars"), 0, 2)
+
+        self.compression_layers_input = []
+        for i in range(1, 7):
+            compression_form_layout.addWidget(QLabel(f"Layer {i}"), i, 0)
+            compression_diameter_input = QComboBox()
+            compression_diameter_input.addItems([""])
+            compression_diameter_input.addItems([str(d) for d in BAR_DIAMETERS])
+            compression_diameter_input.setFixedWidth(60)  # Set width to match existing input field size
+            compression_number_input = QLineEdit('')
+            compression_number_input.setFixedWidth(60)  # Set width to match existing input field size
+            compression_form_layout.addWidget(compression_diameter_input, i, 1)
+            compression_form_layout.addWidget(compression_number_input, i, 2)
+            self.compression_layers_input.append((compression_diameter_input, compression_number_input))
+
+        compression_group_box.setLayout(compression_form_layout)
+        reinforcement_layout.addWidget(compression_group_box)
+
+        # Shear Reinforcement Details
+        shear_group_box = QGroupBox("Shear Reinforcement Details Input")
+        shear_form_layout = QFormLayout()
+        self.d_w_input = QComboBox()
+        self.d_w_input.addItem("")  # Add an empty item as the default selection
+        self.d_w_input.addItems(['6', '8', '10', '12', '13', '16', '20', '25'])
+        self.d_w_input.setFixedWidth(60)  # Set width to match existing input field size
+        self.n_l_input = QLineEdit('2')
+        self.s_input = QLineEdit('150')
+
+        shear_form_layout.addRow(QLabel('Shear Reinforcement Diameter:'), self.create_input_with_unit(self.d_w_input, 'mm'))
+        shear_form_layout.addRow(QLabel('Number of Legs:'), self.create_input_with_unit(self.n_l_input, ''))
+        shear_form_layout.addRow(QLabel('Spacing:'), self.create_input_with_unit(self.s_input, 'mm'))
+        shear_group_box.setLayout(shear_form_layout)
+        reinforcement_layout.addWidget(shear_group_box)
+
+        main_layout.addLayout(reinforcement_layout)
+
+        # Row 4: Calculate and Save PDF Buttons
+        buttons_layout = QHBoxLayout()
+        self.calculate_button = QPushButton('Calculate')
+        self.calculate_button.clicked.connect(self.calculate)
+        buttons_layout.addWidget(self.calculate_button)
+
+        self.optimize_button = QPushButton('Optimize')
+        self.optimize_button.clicked.connect(self.optimize)
+        buttons_layout.addWidget(self.optimize_button)
+
+        self.what_if_button = QPushButton('What If')
+        self.what_if_button.setToolTip('Change of each input that brings the utilisation ratio to 1.0')
+        self.what_if_button.clicked.connect(self.show_what_if)
+        buttons_layout.addWidget(self.what_if_button)
+
+        self.save_pdf_button = QPushButton('Save PDF')
+        self.save_pdf_button.clicked.connect(self.save_pdf)
+        buttons_layout.addWidget(self.save_pdf_button)
+
+        self.live_checkbox = QCheckBox('Live')
+        self.live_checkbox.setToolTip('Recalculate while typing')
+        buttons_layout.addWidget(self.live_checkbox)
+
+        # Busy indicator, shown while a calculation, optimization or export runs
+        self.busy_bar = QProgressBar()
+        self.busy_bar.setMaximumWidth(200)
+        self.busy_bar.setVisible(False)
+        buttons_layout.addWidget(self.busy_bar)
+        self.cancel_button = QPushButton('Cancel')
+        self.cancel_button.setVisible(False)
+        self.cancel_button.clicked.connect(lambda: self.tasks.cancel())
+        buttons_layout.addWidget(self.cancel_button)
+        self.tasks.busy_changed.connect(self.set_busy)
+        self.tasks.progress.connect(self.show_progress)
+        main_layout.addLayout(buttons_layout)
+
+        # Row 5: Output Screen
+        self.result_display = QTextEdit()
+        self.result_display.setReadOnly(True)
+        main_layout.addWidget(self.result_display)
+
+        self.setLayout(main_layout)
+        self.setWindowTitle("RC Beam Design Input")
+        self.setGeometry(100, 100, 1200, 800)
+
+    def create_input_with_unit(self, input_field, unit):
+        layout = QHBoxLayout()
+        layout.addWidget(input_field)
+        layout.addWidget(QLabel(unit))
+        container = QWidget()
+        container.setLayout(layout)
+        return container
+
+
+    def read_material(self):
+        # Get input values from the UI
+        f_ck = CONCRETE_STRENGTHS[self.concrete_class_input.currentText()]  # Get concrete class directly from ComboBox
+        return Material(
+            f_ck=f_ck,
+            f_yk_main=float(self.f_yk_main_input.text()),
+            f_yk_shear=float(self.f_yk_shear_input.text()),
+            gamma_c=float(self.gamma_c_input.text()),
+            alpha_cc=float(self.alpha_cc_input.text()),
+            gamma_s=float(self.gamma_s_input.text()),
+        )
+
+    def read_section(self):
+        # Get shear reinforcement diameter from ComboBox (can be empty or zero)
+        d_w = float(self.d_w_input.currentText()) if self.d_w_input.currentText() else 0
+        return Section(
+            b=float(self.section_width_input.text()),
+            h=float(self.section_depth_input.text()),
+            min_cover=float(self.min_cover_input.text()),
+            cover_dev=float(self.cover_dev_input.text()),
+            d_w=d_w,
+            rdp=float(self.rdp_input.text()),
+        )
+
+    def read_loads(self):
+        return Loads(uls_m_ed=float(self.uls_m_ed_input.text()),  # ULS and SLS M_Ed in kNm
+                     sls_m_ed=float(self.sls_m_ed_input.text()),
+                     v_ed=float(self.v_ed_input.text()),  # V_Ed and V_Ef in kN
+                     v_ef=float(self.v_ef_input.text()),
+                     t_ed=float(self.t_ed_input.text()),  # T_Ed and T_Ef in kNm
+                     t_ef=float(self.t_ef_input.text()))
+
+    def read_links(self):
+        # (legs, spacing) of the shear links
+        try:
+            return int(self.n_l_input.text()), float(self.s_input.text())
+        except ValueError:
+            raise ValueError("Please provide valid numeric values for the number of link legs & spacing.")
+
+    def check_shear(self, material, section, geometry, loads, links):
+        # None when no shear force is given, so the shear results are left out
+        if loads.v_ed == 0 and loads.v_ef == 0:
+            return None
+        from ec2_shear import check_shear
+
+        return check_shear(material, section, geometry, loads, *links)
+
+    def check_torsion(self, material, section, geometry, loads, links):
+        # None when no torsion is given
+        if loads.t_ed == 0 and loads.t_ef == 0:
+            return None
+        from ec2_torsion import check_torsion
+
+        return check_torsion(material, section, geometry, loads, *links)
+
+    def check_sls(self, material, section, geometry, loads):
+        # None when no SLS moment is given
+        if loads.sls_m_ed == 0:
+            return None
+        from ec2_sls import check_sls
+
+        return check_sls(material, section, geometry, loads)
+
+    def validate_first_tension_layer(self):
+        # Validation for the first layer of tension reinforcement
+        first_tension_diameter_input, first_tension_number_input = self.tension_layers_input[0]
+
+        if not first_tension_diameter_input.currentText() or not first_tension_number_input.text():
+            raise ValueError("Please provide tension reinforcement diameter & number of bars.")
+
+        try:
+            float(first_tension_diameter_input.currentText())
+            int(first_tension_number_input.text())
+        except ValueError:
+            raise ValueError("Please provide valid numeric values for tension reinforcement diameter & number of bars.")
+
+    def read_inputs(self):
+        material = self.read_material()
+        section = self.read_section()
+        self.validate_first_tension_layer()
+        reinforcement = Reinforcement(
+            tension=self.read_layers(self.tension_layers_input),
+            compression=self.read_layers(self.compression_layers_input),
+        )
+        return material, section, reinforcement, self.read_loads()
+
+    def read_layer(self, diameter_input, number_input):
+        # None for an empty or unreadable row, which is skipped
+        if not diameter_input.currentText() or not number_input.text():
+            return None
+        try:
+            return BarLayer(float(diameter_input.currentText()), int(number_input.text()))
+        except ValueError:
+            return None
+
+    def read_layers(self, layer_inputs):
+        layers = (self.read_layer(diameter_input, number_input) for diameter_input, number_input in layer_inputs)
+        return [layer for layer in layers if layer is not None]
+
+    def calculate(self):
+        # The form is read here; the checks and the HTML run on a worker thread
+        try:
+            with span('read inputs'):
+                material, section, reinforcement, loads = self.read_inputs()
+                links = self.read_links()
+        except Exception as e:
+            self.tasks.cancel('calculate')
+            self.show_error(e)
+            return
+
+        def run(task):
+            with span('calculate'):
+                with span('bending'):
+                    result = self.design_cache.design_bending(material, section, reinforcement, loads)
+                task.progress(25, 'Shear')
+                with span('shear'):
+                    shear = self.check_shear(material, section, result.geometry, loads, links)
+                task.progress(45, 'Torsion')
+                with span('torsion'):
+                    torsion = self.check_torsion(material, section, result.geometry, loads, links)
+                task.progress(60, 'SLS')
+                with span('sls'):
+                    sls = self.check_sls(material, section, result.geometry, loads)
+                task.progress(80, 'Formatting results')
+                with span('format results'):
+                    html = bending_results_html(material, result, shear, torsion, sls)
+                return section, result, html
+
+        self.tasks.submit('calculate', run, self.show_calculation, self.show_error)
+
+    def show_calculation(self, calculation):
+        section, result, html = calculation
+        try:
+            with span('display results'):
+                self.result_display.setHtml(html)
+
+            # Update the diagram
+            self.plot_section_diagram(section.c_nom, section.b, section.h,
+                                      result.geometry.reinforcement_layers, section.d_w)
+        except Exception as e:
+            self.show_error(e)
+        if self.what_if_panel is not None and self.what_if_panel.isVisible():
+            self.refresh_what_if()
+
+    def show_error(self, error):
+        self.result_display.setText(f"Error: {str(error)}")
+        if self.what_if_panel is not None and self.what_if_panel.isVisible():
+            self.refresh_what_if()
+
+    def set_busy(self, busy):
+        self.busy_bar.setRange(0, 0)  # Indeterminate until a task reports progress
+        self.busy_bar.setFormat("")
+        self.busy_bar.setVisible(busy)
+        self.cancel_button.setVisible(busy)
+
+    def show_progress(self, name, percent, message):
+        self.busy_bar.setRange(0, 100)
+        self.busy_bar.setValue(percent)
+        self.busy_bar.setFormat(message or "%p%")
+
+    def wait_for_tasks(self, msecs=-1):
+        # Block until background work has finished and its results are shown
+        return self.tasks.wait(msecs)
+
+    def closeEvent(self, event):
+        # Stop at the next stage boundary rather than leave workers behind
+        self.tasks.cancel()
+        self.tasks.pool.waitForDone()
+        super().closeEvent(event)
+
+    def init_live_mode(self):
+        # Each input marks the stage it feeds as dirty; the debounce timer then reruns
+        # only what depends on the dirty stages:
+        #   material, loads          -> bending, shear, torsion and SLS checks -> result table
+        #   links                    -> shear and torsion checks -> result table
+        #   section                  -> geometry (h, cover, links) -> bending check -> table, diagram
+        #   tension/compression row  -> that row's bars -> geometry -> ...
+        self.live_timer = QTimer(self)
+        self.live_timer.setSingleShot(True)
+        self.live_timer.setInterval(LIVE_DEBOUNCE_MS)
+        self.live_timer.timeout.connect(self.recalculate_live)
+        self.live_checkbox.toggled.connect(self.set_live_mode)
+        self.reset_live_state()
+
+        stage_inputs = {
+            'material': [self.concrete_class_input, self.f_yk_main_input, self.f_yk_shear_input,
+                         self.gamma_c_input, self.alpha_cc_input, self.gamma_s_input],
+            'section': [self.min_cover_input, self.cover_dev_input, self.section_depth_input,
+                        self.section_width_input, self.rdp_input, self.d_w_input],
+            'loads': [self.sls_m_ed_input, self.uls_m_ed_input, self.v_ed_input, self.v_ef_input,
+                      self.t_ed_input, self.t_ef_input],
+            'links': [self.n_l_input, self.s_input],
+        }
+        for face, layer_inputs in (('tension', self.tension_layers_input),
+                                   ('compression', self.compression_layers_input)):
+            for i, widgets in enumerate(layer_inputs):
+                stage_inputs[(face, i)] = widgets
+        for stage, widgets in stage_inputs.items():
+            for widget in widgets:
+                signal = widget.currentTextChanged if isinstance(widget, QComboBox) else widget.textChanged
+                signal.connect(lambda *_, stage=stage: self.mark_dirty(stage))
+
+    def reset_live_state(self):
+        self.live_dirty = {'material', 'section', 'loads', 'links'}
+        self.live_dirty.update((face, i) for face, layer_inputs in (('tension', self.tension_layers_input),
+                                                                     ('compression', self.compression_layers_input))
+                               for i in range(len(layer_inputs)))
+        self.live_values = {}
+        # Per face, the rows read so far and their contributions to the centroid
+        self.live_groups = {'tension': LayerGroup(len(self.tension_layers_input)),
+                            'compression': LayerGroup(len(self.compression_layers_input))}
+        self.live_geometry_key = None
+        self.live_geometry = None
+        self.live_result = None
+        self.live_shear = None
+        self.live_torsion = None
+        self.live_sls = None
+        self.live_diagram_key = None
+
+    def set_live_mode(self, enabled):
+        if enabled:
+            self.reset_live_state()
+            self.live_timer.start()
+        else:
+            self.live_timer.stop()
+
+    def mark_dirty(self, stage):
+        self.live_dirty.add(stage)
+        if self.live_checkbox.isChecked():
+            self.live_timer.start()  # Restarting the timer debounces bursts of edits
+
+    def live_layers(self, face, count):
+        layers = (self.live_values[(face, i)] for i in range(count))
+        return tuple(layer for layer in layers if layer is not None)
+
+    def recalculate_live(self):
+        with span('live recalculate'):
+            dirty, self.live_dirty = self.live_dirty, set()
+            done = set()
+            try:
+                with span('read inputs'):
+                    readers = {'material': self.read_material, 'section': self.read_section,
+                               'loads': self.read_loads, 'links': self.read_links}
+                    for stage, reader in readers.items():
+                        if stage in dirty:
+                            self.live_values[stage] = reader()
+                            done.add(stage)
+                    for face, layer_inputs in (('tension', self.tension_layers_input),
+                                               ('compression', self.compression_layers_input)):
+                        for i, (diameter_input, number_input) in enumerate(layer_inputs):
+                            if (face, i) in dirty:
+                                layer = self.read_layer(diameter_input, number_input)
+                                self.live_values[(face, i)] = layer
+                                with span('layer geometry'):
+                                    self.live_groups[face].set(i, layer)
+                                done.add((face, i))
+
+                material = self.live_values['material']
+                section = self.live_values['section']
+                loads = self.live_values['loads']
+                tension = self.live_layers('tension', len(self.tension_layers_input))
+                compression = self.live_layers('compression', len(self.compression_layers_input))
+
+                # Geometry only depends on the depth, cover, links and bar layers; an edited row
+                # has already updated its own contribution to the area and moment of its face
+                geometry_key = (section.h, section.c_nom, section.d_w, tension, compression)
+                if geometry_key != self.live_geometry_key:
+                    self.validate_first_tension_layer()
+                    with span('geometry'):
+                        groups = self.live_groups
+                        self.live_geometry = geometry_from_centroids(
+                            section, groups['tension'].layers, groups['tension'].centroid(),
+                            groups['compression'].layers, groups['compression'].centroid())
+                    self.live_geometry_key = geometry_key
+
+                bending_dirty = dirty & {'material', 'section', 'loads'} or self.live_result is None \
+                    or self.live_result.geometry is not self.live_geometry
+                if bending_dirty:
+                    with span('bending'):
+                        self.live_result = check_bending(material, section, self.live_geometry, loads)
+                    with span('sls'):
+                        self.live_sls = self.check_sls(material, section, self.live_geometry, loads)
+                if bending_dirty or 'links' in dirty:
+                    links = self.live_values['links']
+                    with span('shear'):
+                        self.live_shear = self.check_shear(material, section, self.live_geometry, loads, links)
+                    with span('torsion'):
+                        self.live_torsion = self.check_torsion(material, section, self.live_geometry, loads, links)
+                    with span('format results'):
+                        html = bending_results_html(material, self.live_result, self.live_shear, self.live_torsion,
+                                                    self.live_sls)
+                    with span('display results'):
+                        self.result_display.setHtml(html)
+
+                diagram_key = (section.c_nom, section.b, section.h, section.d_w, tension, compression)
+                if diagram_key != self.live_diagram_key:
+                    self.plot_section_diagram(section.c_nom, section.b, section.h,
+                                              self.live_geometry.reinforcement_layers, section.d_w)
+                    self.live_diagram_key = diagram_key
+
+            except Exception as e:
+                # Keep the failed stages dirty so they are retried after the next edit
+                self.live_dirty |= dirty - done
+                self.live_result = None
+                self.result_display.setText(f"Error: {str(e)}")
+
+    def write_layers(self, layer_inputs, layers):
+        for i, (diameter_input, number_input) in enumerate(layer_inputs):
+            if i < len(layers):
+                diameter_input.setCurrentText(f"{layers[i].diameter:g}")
+                number_input.setText(str(layers[i].count))
+            else:
+                diameter_input.setCurrentText("")
+                number_input.setText("")
+
+    def optimize(self):
+        # Replace the bar layers with the lightest arrangement that passes, then recalculate
+        try:
+            material, section, loads = self.read_material(), self.read_section(), self.read_loads()
+        except Exception as e:
+            self.show_error(e)
+            return
+        max_layers = len(self.tension_layers_input)
+
+        def run(task):
+            from ec2_optimize import optimize_reinforcement
+
+            with span('optimize'):
+                return optimize_reinforcement(material, section, loads, max_layers=max_layers)
+
+        self.tasks.submit('optimize', run, self.apply_optimized, self.show_error)
+
+    def apply_optimized(self, optimized):
+        self.write_layers(self.tension_layers_input, optimized.reinforcement.tension)
+        self.write_layers(self.compression_layers_input, optimized.reinforcement.compression)
+        self.calculate()
+
+    def ensure_section_canvas(self):
+        # matplotlib is only loaded once there is something to draw
+        if self.section_canvas is None:
+            from matplotlib.figure import Figure
+            from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+            from ec2_plot import SectionRenderer
+            self.section_figure = Figure(figsize=(4, 4))  # Adjusted figure size
+            self.section_canvas = FigureCanvas(self.section_figure)
+            self.section_canvas.setMinimumWidth(300)  # Add minimum width
+            self.section_renderer = SectionRenderer(self.section_figure, blit=True)
+            self.top_layout.replaceWidget(self.section_placeholder, self.section_canvas)
+            self.section_placeholder.deleteLater()
+            self.section_placeholder = None
+        return self.section_canvas
+
+    def plot_section_diagram(self, c_nom, b, h, reinforcement_layers, d_w):
+        with span('section diagram'):
+            self.ensure_section_canvas()
+            self.section_args = (c_nom, b, h, reinforcement_layers, d_w)
+            if self.section_renderer.update(c_nom, b, h, reinforcement_layers, d_w):
+                self.section_renderer.draw()
+
+    def show_diagnostics(self):
+        if self.diagnostics_panel is None:
+            self.diagnostics_panel = DiagnosticsPanel()
+        self.diagnostics_panel.refresh()
+        self.diagnostics_panel.show()
+        self.diagnostics_panel.raise_()
+
+    def show_what_if(self):
+        if self.what_if_panel is None:
+            self.what_if_panel = WhatIfPanel()
+        self.refresh_what_if()
+        self.what_if_panel.show()
+        self.what_if_panel.raise_()
+
+    def refresh_what_if(self):
+        # A few analytic Newton steps per input, quick enough for the GUI thread
+        from ec2_sensitivity import bending_sensitivity, format_what_if, required_changes
+
+        try:
+            with span('what if'):
+                material, section, reinforcement, loads = self.read_inputs()
+                sensitivity = bending_sensitivity(material, section, reinforcement, loads)
+                changes = required_changes(material, section, reinforcement, loads)
+                self.what_if_panel.report_display.setPlainText(format_what_if(sensitivity, changes))
+        except Exception as e:
+            self.what_if_panel.report_display.setPlainText(f"Error: {str(e)}")
+
+    def save_pdf(self):
+        file_dialog = QFileDialog()
+        file_dialog.setFileMode(QFileDialog.AnyFile)
+        file_dialog.setNameFilter("PDF Files (*.pdf)")
+        file_dialog.setDefaultSuffix("pdf")
+        file_path, _ = file_dialog.getSaveFileName(self, "Save PDF", "output.pdf", "PDF Files (*.pdf);;All Files (*)")
+
+        if not file_path:
+            return
+        # Everything read from the window is taken here; the worker only sees copies
+        text = self.result_display.toPlainText()
+        section_args = self.section_args
+        image = None
+        if section_args is None:
+            # Nothing drawn yet: grab the empty canvas, which lives on this thread
+            try:
+                from ec2_plot import figure_rgb
+
+                self.ensure_section_canvas()
+                image = figure_rgb(self.section_figure)
+            except Exception as e:
+                self.show_pdf_error(e)
+                return
+
+        def run(task):
+            with span('save pdf'):
+                return write_results_pdf(task, file_path, text, section_args, image)
+
+        self.tasks.submit('save_pdf', run, self.show_pdf_saved, self.show_pdf_error)
+
+    def show_pdf_saved(self, file_path):
+        # Show success message in the output window
+        current_text = self.result_display.toPlainText()
+        self.result_display.setText(f"{current_text}\n\nFile saved successfully at: {file_path}")
+
+    def show_pdf_error(self, error):
+        current_text = self.result_display.toPlainText()
+        self.result_display.setText(f"{current_text}\n\nError saving PDF: {str(error)}")
+
+
+def write_results_pdf(task, file_path, text, section_args=None, image=None):
+    # Runs on a worker thread: the section is drawn on the thread's own headless figure
+    from fpdf import FPDF
+
+    from ec2_plot import render_section_rgb
+    from ec2_report import add_section_image, compress_image
+
+    # Render the diagram in memory; the bars on screen are blitted on top of
+    # the canvas, so draw it headless instead
+    task.progress(10, 'Rendering diagram')
+    with span('render image'):
+        if section_args is not None:
+            image = render_section_rgb(*section_args)
+        image = compress_image(image)
+
+    # Create PDF and add figure and text content
+    task.progress(50, 'Building PDF')
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_font("Arial", size=12)
+
+    # Add figure to the PDF before the output text
+    pdf_height = pdf.h - 20  # Page height with padding
+    max_img_height = pdf_height * 0.3  # Image height limited to 30% of the page height
+    max_img_width = pdf.w - 20  # Allow padding on both sides
+
+    width, height = image[:2]
+
+    # Calculate scaling factor to maintain aspect ratio
+    scale_factor = min(max_img_height / height, max_img_width / width)
+    img_width_scaled = width * scale_factor
+    img_height_scaled = height * scale_factor
+
+    # Calculate X coordinate to center the image
+    x_position = (pdf.w - img_width_scaled) / 2
+
+    # Insert the image into the PDF centered
+    add_section_image(pdf, "section", image, x_position, 10, img_width_scaled, img_height_scaled)
+
+    # Adjust text start position to avoid overlapping with image
+    pdf.set_y(10 + img_height_scaled + 10)
+
+    # Add calculation results text to the PDF
+    with span('add text'):
+        for line in text.split('\n'):
+            pdf.multi_cell(0, 10, txt=line)
+
+    # Output the final PDF
+    task.progress(80, 'Writing PDF')
+    with span('write pdf'):
+        pdf.output(file_path)
+    return file_path
+
+
+class WhatIfPanel(QWidget):
+    # Required change of each input for a utilisation ratio of 1.0, from ec2_sensitivity
+    def __init__(self):
+        super().__init__()
+        self.setWindowTitle("What If")
+        self.setGeometry(150, 150, 800, 360)
+        layout = QVBoxLayout()
+        self.report_display = QTextEdit()
+        self.report_display.setReadOnly(True)
+        self.report_display.setFont(QFontDatabase.systemFont(QFontDatabase.FixedFont))
+        layout.addWidget(self.report_display)
+        self.setLayout(layout)
+
+
+class DiagnosticsPanel(QWidget):
+    # Profiling report of ec2_profile; opened with Ctrl+Shift+D from the main window
+    def __init__(self):
+        super().__init__()
+        self.setWindowTitle("Diagnostics")
+        self.setGeometry(150, 150, 900, 600)
+        layout = QVBoxLayout()
+
+        options_layout = QHBoxLayout()
+        self.record_checkbox = QCheckBox('Record timings')
+        self.record_checkbox.setChecked(PROFILER.enabled)
+        self.record_checkbox.toggled.connect(self.set_recording)
+        self.cprofile_checkbox = QCheckBox('cProfile')
+        self.tracemalloc_checkbox = QCheckBox('tracemalloc')
+        self.cprofile_checkbox.setToolTip('Captured from the next time recording is switched on')
+        self.tracemalloc_checkbox.setToolTip('Captured from the next time recording is switched on')
+        for widget in (self.record_checkbox, self.cprofile_checkbox, self.tracemalloc_checkbox):
+            options_layout.addWidget(widget)
+        options_layout.addStretch()
+        for text, slot in (('Refresh', self.refresh), ('Reset', self.reset), ('Export JSON', self.export_json)):
+            button = QPushButton(text)
+            button.clicked.connect(slot)
+            options_layout.addWidget(button)
+        layout.addLayout(options_layout)
+
+        self.report_display = QTextEdit()
+        self.report_display.setReadOnly(True)
+        self.report_display.setFont(QFontDatabase.systemFont(QFontDatabase.FixedFont))
+        layout.addWidget(self.report_display)
+        self.setLayout(layout)
+
+    def set_recording(self, enabled):
+        if enabled:
+            PROFILER.enable(cprofile=self.cprofile_checkbox.isChecked(),
+                            tracemalloc=self.tracemalloc_checkbox.isChecked())
+        else:
+            PROFILER.disable()
+        self.refresh()
+
+    def refresh(self):
+        self.report_display.setPlainText(PROFILER.format_report())
+
+    def reset(self):
+        PROFILER.reset()
+        self.refresh()
+
+    def export_json(self):
+        file_path, _ = QFileDialog.getSaveFileName(self, "Export Profile", "profile.json",
+                                                   "JSON Files (*.json);;All Files (*)")
+        if file_path:
+            try:
+                PROFILER.export_json(file_path)
+            except OSError as e:
+                self.report_display.append(f"\nError exporting profile: {str(e)}")
@@ -0,0 +1,268 @@
+"""Concrete properties of EC2 Table 3.1 for classes C12/15 to C90/105.
+
+Every property is evaluated once, at import, on a grid of f_ck from 12 to 90
+N/mm² in steps of 0.5, which holds every strength class. A lookup is then
+O(1): a class strength (or any other grid value) returns a prebuilt Concrete
+record, and a custom f_ck is interpolated linearly between its two
+neighbouring grid points. Strengths outside the grid fall back to the Table
+3.1 expressions themselves (table_3_1, or table_3_1_arrays for a batch).
+
+    concrete = concrete_properties(35)
+    concrete.f_ctm, concrete.E_cm, concrete.eps_cu3, concrete.lambda_block
+
+The batch engines use concrete_arrays(f_ck), which does the same lookup for a
+whole array of strengths from contiguous NumPy copies of the grid; NumPy is
+only imported on the first batch lookup, so the scalar path and the GUI start
+without it.
+
+Strains are absolute (3.5e-3, not 3.5 ‰) and stresses and moduli in N/mm².
+Alongside the tabulated values each record carries the rectangular stress
+block constants of the simplified bending check (ec2_design.check_bending),
+which change above C50/60 with λ, η and ε_cu:
+
+    lever_coefficient   z = d (0.5 + sqrt(0.25 - lever_coefficient K)), 0.881 up to C50
+    block_scale         η λ / 0.8, scales K_bal = 0.453 ξ (1 - λ ξ / 2); 1 up to C50
+    k2                  neutral axis limit x_u <= (δ - 0.4) d / k2 (5.5), 1 up to C50
+    z_doubly            lever arm factor of the doubly reinforced check, 0.82 up to C50
+"""
+import math
+from dataclasses import astuple, dataclass, fields
+
+# Define concrete strength classes as per Eurocode 2
+CONCRETE_CLASSES = {
+    1: 'C12/15', 2: 'C16/20', 3: 'C20/25', 4: 'C25/30',
+    5: 'C30/37', 6: 'C32/40', 7: 'C35/45', 8: 'C40/50',
+    9: 'C45/55', 10: 'C50/60', 11: 'C55/67', 12: 'C60/75',
+    13: 'C70/85', 14: 'C80/95', 15: 'C90/105'
+}
+CONCRETE_STRENGTHS = {
+    'C12/15': 12, 'C16/20': 16, 'C20/25': 20, 'C25/30': 25,
+    'C30/37': 30, 'C32/40': 32, 'C35/45': 35, 'C40/50': 40,
+    'C45/55': 45, 'C50/60': 50, 'C55/67': 55, 'C60/75': 60,
+    'C70/85': 70, 'C80/95': 80, 'C90/105': 90
+}
+
+# Lookup grid of f_ck in N/mm²; every class strength is a grid point
+F_CK_MIN = 12.0
+F_CK_MAX = 90.0
+F_CK_STEP = 0.5
+GRID_SIZE = int(round((F_CK_MAX - F_CK_MIN) / F_CK_STEP)) + 1
+# Grid index of C50/60, the last strength of the ≤C50 branch of Table 3.1
+_C50_INDEX = int(round((50 - F_CK_MIN) / F_CK_STEP))
+
+
+@dataclass(frozen=True)
+class Concrete:
+    f_ck: float
+    f_ck_cube: float  # Cube strength of the class, interpolated between classes
+    f_cm: float
+    f_ctm: float
+    f_ctk_005: float
+    f_ctk_095: float
+    E_cm: float
+    eps_c1: float
+    eps_cu1: float
+    eps_c2: float
+    eps_cu2: float
+    n: float  # Exponent of the parabola-rectangle diagram
+    eps_c3: float
+    eps_cu3: float
+    lambda_block: float  # Depth factor λ of the rectangular stress block (3.1.7(3))
+    eta_block: float  # Strength factor η of the rectangular stress block
+    lever_coefficient: float
+    block_scale: float
+    k2: float
+    z_doubly: float
+
+
+FIELDS = tuple(field.name for field in fields(Concrete))
+
+_CUBE_STRENGTHS = tuple((f_ck, int(name.split('/')[1])) for name, f_ck in CONCRETE_STRENGTHS.items())
+
+
+def _cube_strength(f_ck):
+    # Linear between the classes, and proportional beyond them
+    points = _CUBE_STRENGTHS
+    if f_ck <= points[0][0]:
+        return f_ck * points[0][1] / points[0][0]
+    for (f_low, cube_low), (f_high, cube_high) in zip(points, points[1:]):
+        if f_ck <= f_high:
+            return cube_low + (cube_high - cube_low) * (f_ck - f_low) / (f_high - f_low)
+    return f_ck * points[-1][1] / points[-1][0]
+
+
+def table_3_1(f_ck):
+    """Concrete record of f_ck from the Table 3.1 expressions, without the lookup grid."""
+    f_ck = float(f_ck)
+    f_cm = f_ck + 8
+    high = f_ck > 50
+    over = max(f_ck - 50, 0.0)
+    reduction = ((90 - min(f_ck, 90)) / 100) ** 4
+
+    f_ctm = 2.12 * math.log(1 + f_cm / 10) if high else 0.30 * f_ck ** (2 / 3)
+    E_cm = 22000 * (f_cm / 10) ** 0.3
+    eps_c1 = min(0.7 * f_cm ** 0.31, 2.8) * 1e-3
+    eps_cu1 = (2.8 + 27 * ((98 - min(f_cm, 98)) / 100) ** 4 if high else 3.5) * 1e-3
+    eps_c2 = (2.0 + 0.085 * over ** 0.53 if high else 2.0) * 1e-3
+    eps_cu2 = (2.6 + 35 * reduction if high else 3.5) * 1e-3
+    n = 1.4 + 23.4 * reduction if high else 2.0
+    eps_c3 = (1.75 + 0.55 * over / 40 if high else 1.75) * 1e-3
+    eps_cu3 = eps_cu2
+    lambda_block = 0.8 - over / 400
+    eta_block = 1.0 - over / 200
+
+    # Simplified bending constants; the ≤C50 values are kept exactly as the check always used them
+    if high:
+        lever_coefficient = 0.881 / eta_block
+        block_scale = eta_block * lambda_block / 0.8
+        k2 = 0.6 + 0.0014 / eps_cu2
+        # Lever arm at the limiting neutral axis depth for the default 15% redistribution
+        z_doubly = 1 - 0.5 * lambda_block * (0.85 - 0.4) / k2
+    else:
+        lever_coefficient, block_scale, k2, z_doubly = 0.881, 1.0, 1.0, 0.82
+    return Concrete(f_ck, _cube_strength(f_ck), f_cm, f_ctm, 0.7 * f_ctm, 1.3 * f_ctm, E_cm, eps_c1, eps_cu1,
+                    eps_c2, eps_cu2, n, eps_c3, eps_cu3, lambda_block, eta_block, lever_coefficient, block_scale,
+                    k2, z_doubly)
+
+
+def table_3_1_arrays(f_ck):
+    """Fields of table_3_1 for an array of strengths, by name, from the same expressions."""
+    import numpy as np
+
+    f_ck = np.asarray(f_ck, dtype=float)
+    f_cm = f_ck + 8
+    high = f_ck > 50
+    over = np.maximum(f_ck - 50, 0.0)
+    reduction = ((90 - np.minimum(f_ck, 90)) / 100) ** 4
+    strengths, cubes = (np.array(column, dtype=float) for column in zip(*_CUBE_STRENGTHS))
+    f_ck_cube = np.where(f_ck <= strengths[0], f_ck * cubes[0] / strengths[0],
+                         np.where(f_ck > strengths[-1], f_ck * cubes[-1] / strengths[-1],
+                                  np.interp(f_ck, strengths, cubes)))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        f_ctm = np.where(high, 2.12 * np.log(1 + f_cm / 10), 0.30 * f_ck ** (2 / 3))
+        E_cm = 22000 * (f_cm / 10) ** 0.3
+        eps_c1 = np.minimum(0.7 * f_cm ** 0.31, 2.8) * 1e-3
+        eps_cu1 = np.where(high, 2.8 + 27 * ((98 - np.minimum(f_cm, 98)) / 100) ** 4, 3.5) * 1e-3
+        eps_c2 = np.where(high, 2.0 + 0.085 * over ** 0.53, 2.0) * 1e-3
+        eps_cu2 = np.where(high, 2.6 + 35 * reduction, 3.5) * 1e-3
+        n = np.where(high, 1.4 + 23.4 * reduction, 2.0)
+        eps_c3 = np.where(high, 1.75 + 0.55 * over / 40, 1.75) * 1e-3
+        lambda_block = 0.8 - over / 400
+        eta_block = 1.0 - over / 200
+
+        lever_coefficient = np.where(high, 0.881 / eta_block, 0.881)
+        block_scale = np.where(high, eta_block * lambda_block / 0.8, 1.0)
+        k2 = np.where(high, 0.6 + 0.0014 / eps_cu2, 1.0)
+        z_doubly = np.where(high, 1 - 0.5 * lambda_block * (0.85 - 0.4) / k2, 0.82)
+    values = (f_ck, f_ck_cube, f_cm, f_ctm, 0.7 * f_ctm, 1.3 * f_ctm, E_cm, eps_c1, eps_cu1, eps_c2, eps_cu2, n,
+              eps_c3, eps_cu2, lambda_block, eta_block, lever_coefficient, block_scale, k2, z_doubly)
+    return dict(zip(FIELDS, np.broadcast_arrays(*values)))
+
+
+# Records at every grid point, and the same values by field for interpolation
+GRID = tuple(table_3_1(F_CK_MIN + i * F_CK_STEP) for i in range(GRID_SIZE))
+_BY_STRENGTH = {record.f_ck: record for record in GRID}
+_COLUMNS = tuple(zip(*(astuple(record) for record in GRID)))
+_arrays = None
+
+
+def concrete_properties(f_ck):
+    """Concrete record for f_ck: prebuilt on the grid, interpolated between grid points."""
+    record = _BY_STRENGTH.get(f_ck)
+    if record is not None:
+        return record
+    position = (f_ck - F_CK_MIN) / F_CK_STEP
+    if not 0 <= position <= GRID_SIZE - 1:
+        return table_3_1(f_ck)
+    i = min(int(position), GRID_SIZE - 2)
+    t = position - i
+    return Concrete(*(column[i] * (1 - t) + column[i + 1] * t for column in _COLUMNS))
+
+
+def concrete_class_properties(concrete_class):
+    if concrete_class not in CONCRETE_STRENGTHS:
+        raise ValueError(f"Unknown concrete class {concrete_class!r}; expected one of {', '.join(CONCRETE_STRENGTHS)}")
+    return _BY_STRENGTH[float(CONCRETE_STRENGTHS[concrete_class])]
+
+
+def grid_arrays():
+    # Contiguous (GRID_SIZE,) arrays per field, built on the first batch lookup
+    global _arrays
+    if _arrays is None:
+        import numpy as np
+
+        _arrays = {name: np.ascontiguousarray(column, dtype=float) for name, column in zip(FIELDS, _COLUMNS)}
+    return _arrays
+
+
+class ConcreteArrays:
+    """Concrete fields over a batch of strengths, under the attribute names of Concrete.
+
+    Each field is looked up on first access, so a check only pays for the fields it
+    uses; rows that all sit on grid points are a plain gather.
+    """
+
+    def __init__(self, f_ck):
+        import numpy as np
+
+        f_ck = np.asarray(f_ck, dtype=float)
+        self.shape = f_ck.shape
+        f_ck = f_ck.ravel()
+        position = (f_ck - F_CK_MIN) / F_CK_STEP
+        inside = (position >= 0) & (position <= GRID_SIZE - 1)
+        position = np.where(inside, position, 0.0)
+        self.index = np.minimum(np.floor(position).astype(np.intp), GRID_SIZE - 2)
+        self.weight = position - self.index
+        self.on_grid = not self.weight.any()
+        # Off the grid: the expressions themselves, evaluated for all of those rows at once
+        self.outside = np.flatnonzero(~inside)
+        self._outside_f_ck = f_ck[self.outside]
+        self._outside_values = None
+        self._outside_steps = None
+        self._slopes = {}
+
+    def interpolate(self, column):
+        # Flat values of a (GRID_SIZE,) column at these strengths; rows off the grid are
+        # left at the first grid point for the caller to fill in
+        if self.on_grid:
+            return column[self.index]
+        return column[self.index] * (1 - self.weight) + column[self.index + 1] * self.weight
+
+    def __getattr__(self, name):
+        if name not in FIELDS:
+            raise AttributeError(name)
+        values = self.interpolate(grid_arrays()[name])
+        if self.outside.size:
+            if self._outside_values is None:
+                self._outside_values = table_3_1_arrays(self._outside_f_ck)
+            values[self.outside] = self._outside_values[name]
+        values = values.reshape(self.shape)
+        setattr(self, name, values)
+        return values
+
+    def slope(self, name):
+        # d(field)/d(f_ck) of the interpolated table, for the analytic sensitivities; off the
+        # grid a central difference of the expressions. On a grid point up to C50/60 it is the
+        # slope of the segment below, so C50 keeps the ≤C50 branch its check uses
+        if name not in self._slopes:
+            import numpy as np
+
+            column = grid_arrays()[name]
+            below = (self.weight == 0) & (self.index > 0) & (self.index <= _C50_INDEX)
+            segment = np.where(below, self.index - 1, self.index)
+            values = (column[segment + 1] - column[segment]) / F_CK_STEP
+            if self.outside.size:
+                f_ck = self._outside_f_ck
+                step = 1e-6 * np.maximum(np.abs(f_ck), 1.0)
+                if self._outside_steps is None:
+                    self._outside_steps = table_3_1_arrays(f_ck + step), table_3_1_arrays(f_ck - step)
+                up, down = self._outside_steps
+                values[self.outside] = (up[name] - down[name]) / (2 * step)
+            self._slopes[name] = values.reshape(self.shape)
+        return self._slopes[name]
+
+
+def concrete_arrays(f_ck):
+    """Concrete fields for an array of strengths, interpolated linearly on the grid."""
+    return ConcreteArrays(f_ck)
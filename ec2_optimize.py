@@ -0,0 +1,372 @@
+"""Search bar diameter x count x layer arrangements for the cheapest passing design.
+
+Layers follow the same rules as the centroid code in ec2_design: a clear gap of
+max(25, d) between successive layers, and every layer has to fit across the
+width inside the links. Any diameter and bar count may follow any other, since the
+order of the layers moves the centroid; only the cost and area bounds below prune
+the search, and neither can drop an arrangement cheaper than the one returned.
+
+The search is a depth-first branch and bound over the tension layers, with a
+second search over the compression layers for every tension arrangement that
+lands on the doubly reinforced branch:
+
+* a candidate is dropped once its cost, plus the least the other face can cost,
+  reaches the best passing cost found,
+* a tension arrangement is not evaluated unless its area exceeds A_s_req at its
+  own centroid, taken with the singly lever arm (never below z_doubly * d) or,
+  past K_bal, with the least A_sc_req the compression face can reach: A_sc_req
+  grows with the compression centroid depth, which grows with A_sc_req, and the
+  fixed point of the two is a lower bound. Inner layers only reduce d, so the
+  shortfall at the deepest centroid a prefix allows prunes whole subtrees,
+* compression arrangements are bounded the same way by A_sc_req at their own
+  centroid, and are only searched while the tension face carries enough steel
+  for the doubly reinforced A_s_req,
+* for a given prefix and diameter, bar counts are tried in increasing order and
+  the scan stops at the first count that passes with no further steel.
+"""
+import math
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+from ec2_design import (BAR_DIAMETERS, DOUBLY_REINFORCED, BarLayer, BendingResult, Reinforcement,
+                        SectionGeometry, balanced_k, check_bending, design_bending, layer_centroid)
+from ec2_materials import concrete_properties
+
+MAX_LAYERS = 6
+
+# Keeps the area bounds a hair below the exact requirement so rounding in the
+# bound can never prune an arrangement that passes by a sliver
+BOUND_MARGIN = 1 - 1e-9
+
+
+@dataclass(frozen=True)
+class OptimizationResult:
+    reinforcement: Reinforcement
+    result: BendingResult
+    cost: float
+    evaluations: int
+
+
+def steel_area_cost(diameter, count):
+    # Default objective: total steel area in mm²
+    return BarLayer(diameter, count).area
+
+
+def bars_across_width(section, diameter):
+    # Number of bars that fit inside the links with a clear gap of max(25, d)
+    clear_width = section.b - 2 * (section.c_nom + section.d_w)
+    gap = max(25, diameter)
+    return max(int((clear_width + gap) // (diameter + gap)), 0)
+
+
+def stack_height(layers):
+    # Depth taken up by a group of layers from the outer face of the first one
+    if not layers:
+        return 0
+    return sum(layer.diameter + max(25, layer.diameter) for layer in layers[:-1]) + layers[-1].diameter
+
+
+class _LayerSearch:
+    # Depth-first search over the layers of one face; subclasses supply the area bound,
+    # the least cost the other face adds, and the evaluation of a complete arrangement
+    def __init__(self, material, section, loads, diameters, max_layers, min_bars, cost, available_height):
+        self.material = material
+        self.section = section
+        self.loads = loads
+        self.diameters = sorted(diameters, reverse=True)
+        self.max_layers = max_layers
+        self.min_bars = min_bars
+        self.cost = cost
+        self.available_height = available_height
+        self.evaluations = 0
+        self.best_cost = math.inf
+        self.best = None
+
+        self.max_bars = {d: bars_across_width(section, d) for d in self.diameters}
+        options = [(d, n) for d in self.diameters for n in range(min_bars, self.max_bars[d] + 1)]
+        self.min_layer_cost = min((cost(d, n) for d, n in options), default=math.inf)
+        # Cheapest cost per mm² of steel, to turn a missing area into a missing cost
+        self.min_unit_cost = min((cost(d, n) / BarLayer(d, n).area for d, n in options), default=math.inf)
+        self.max_layer_area = max((BarLayer(d, n).area for d, n in options), default=0.0)
+        self.min_layer_area = min((BarLayer(d, n).area for d, n in options), default=0.0)
+
+        self.inner = section.c_nom + section.d_w
+        self.f_yd = material.f_yk_main / material.gamma_s
+        self.M_Ed = loads.uls_m_ed * 1e6
+        self.A_s_max = 0.04 * section.b * section.h
+        self.concrete = concrete_properties(material.f_ck)
+        self.K_bal = balanced_k(section.rdp, self.concrete)
+
+    def compression_need(self, d, dc):
+        # A_sc_req of the doubly reinforced branch: it decreases with d and grows with dc, and
+        # is not positive where the section is singly reinforced
+        return (self.M_Ed - self.K_bal * self.material.f_ck * self.section.b * (d * d)) / (self.f_yd * (d - dc))
+
+    def doubly_tension(self, d, dc):
+        # A_s_req of the doubly reinforced branch before the A_s_min/A_s_max clamps
+        return (self.K_bal * self.material.f_ck * self.section.b * d) / (self.concrete.z_doubly * self.f_yd) \
+            + self.compression_need(d, dc)
+
+    def other_cost(self, centroid):
+        return 0.0
+
+    def shortfall(self, A_total, moment, offset):
+        # Lower bound on the area that inner layers starting at offset must add. They sit at
+        # least half the smallest diameter below it, so whatever area they add pulls the
+        # centroid in at least that far; each pass raises the bound and stays below the truth
+        y = offset + self.diameters[-1] * 0.5
+        added = self.required_area(moment / A_total) - A_total
+        for _ in range(8):
+            if added <= 0 or added == math.inf:
+                break
+            needed = self.required_area((moment + added * y) / (A_total + added)) - A_total
+            if needed <= added:
+                break
+            added = needed
+        return added
+
+    def check(self, geometry):
+        self.evaluations += 1
+        if geometry.d_eff <= geometry.dc_eff:
+            return None
+        try:
+            return check_bending(self.material, self.section, geometry, self.loads)
+        except ZeroDivisionError:
+            return None
+
+    def run(self):
+        self._extend((), (), 0.0, 0, 0, 0)
+        return self.best
+
+    def _extend(self, prefix, layers, cost, A_total, moment, offset):
+        # prefix holds (diameter, count) per layer and layers the matching (diameter, area);
+        # A_total, moment and offset accumulate exactly as in ec2_design.layer_centroid
+        for d in self.diameters:
+            if offset + d > self.available_height:
+                continue
+            layer_depth = offset + d * 0.5
+            next_offset = offset + (d + max(25, d))
+            counts = range(self.min_bars, self.max_bars[d] + 1)
+
+            # First the cheapest count that completes a design with this layer on its own
+            passing = None
+            for n in counts:
+                layer_cost = cost + self.cost(d, n)
+                if layer_cost >= self.best_cost:
+                    break
+                A = BarLayer(d, n).area
+                new_total = A_total + A
+                new_moment = moment + A * layer_depth
+                centroid = new_moment / new_total
+                if new_total <= self.required_area(centroid):
+                    continue
+                if layer_cost + self.other_cost(centroid) >= self.best_cost:
+                    continue
+                if self.evaluate(prefix + ((d, n),), layers + ((d, A),), layer_cost, new_total, centroid):
+                    passing = n
+                    break
+
+            # Then smaller counts topped up by further layers
+            if len(prefix) + 1 >= self.max_layers or next_offset > self.available_height:
+                continue
+            for n in counts:
+                if passing is not None and n >= passing:
+                    break
+                layer_cost = cost + self.cost(d, n)
+                if layer_cost + self.min_layer_cost >= self.best_cost:
+                    break
+                A = BarLayer(d, n).area
+                new_total = A_total + A
+                new_moment = moment + A * layer_depth
+                shortfall = self.shortfall(new_total, new_moment, next_offset)
+                if shortfall == math.inf:
+                    continue
+                # Inner layers add at least that much area half the smallest diameter below
+                # next_offset, which moves the centroid in and raises the other face's cost too
+                d_min = self.diameters[-1]
+                added = max(shortfall, self.min_layer_area)
+                centroid = (new_moment + added * (next_offset + d_min * 0.5)) / (new_total + added)
+                if (layer_cost + max(self.min_layer_cost, shortfall * self.min_unit_cost)
+                        + self.other_cost(centroid) >= self.best_cost):
+                    continue
+                # Give up when even the largest layers in every remaining row cannot cover the shortfall
+                layers_left = min(self.max_layers - len(prefix) - 1,
+                                  int((self.available_height - next_offset - d_min) // (d_min + max(25, d_min))) + 1)
+                if layers_left * self.max_layer_area < shortfall:
+                    continue
+                self._extend(prefix + ((d, n),), layers + ((d, A),), layer_cost, new_total, new_moment, next_offset)
+
+
+class _TensionSearch(_LayerSearch):
+    # Tension layers, each complete arrangement with the cheapest compression steel it needs
+    def __init__(self, material, section, loads, diameters, max_layers, min_bars, cost):
+        inner = section.c_nom + section.d_w
+        super().__init__(material, section, loads, diameters, max_layers, min_bars, cost,
+                         section.h - 2 * inner - 25)
+        # No compression centroid can be nearer the face than half the smallest bar
+        self.dc_min = self.inner + self.diameters[-1] * 0.5
+        # Largest area a single layer of each diameter holds
+        self.layer_capacity = [(d, BarLayer(d, self.max_bars[d]).area) for d in self.diameters
+                               if self.max_bars[d] >= min_bars]
+        self._compression_bounds = {}
+
+    def compression_depth(self, area):
+        # Least centroid depth of any compression arrangement of at least this area: for each
+        # diameter of the outer layer, that layer full and whatever it cannot hold one gap deeper
+        d_min = self.diameters[-1]
+        depth = math.inf
+        for d, capacity in self.layer_capacity:
+            if capacity >= area:
+                depth = min(depth, d * 0.5)
+            else:
+                depth = min(depth, (capacity * d * 0.5 + (area - capacity) * (d + max(25, d) + d_min * 0.5)) / area)
+        return depth
+
+    def compression_bound(self, d):
+        # Lower bounds on A_sc_req and dc at this d, taken at the next 0.5 mm step up so they
+        # can be cached; both only grow as d decreases
+        d = math.ceil(d * 2) * 0.5
+        bound = self._compression_bounds.get(d)
+        if bound is None:
+            bound = self._compression_bounds[d] = self._compression_bound(d)
+        return bound
+
+    def _compression_bound(self, d):
+        # A larger A_sc_req needs a deeper centroid, which raises A_sc_req again; each pass
+        # stays below the truth
+        dc = self.dc_min
+        if self.M_Ed <= self.K_bal * self.material.f_ck * self.section.b * (d * d):
+            return 0.0, dc
+        if d <= dc:
+            return math.inf, dc
+        need = self.compression_need(d, dc)
+        for _ in range(4):
+            if need <= 0:
+                break
+            deeper = self.inner + self.compression_depth(need)
+            if deeper >= d:
+                return math.inf, dc
+            if deeper <= dc:
+                break
+            dc = deeper
+            need = self.compression_need(d, dc)
+        return need, dc
+
+    def required_area(self, centroid):
+        # Lower bound on the tension steel needed by any arrangement whose centroid is at
+        # least this far in from the face; extra inner layers only move the centroid
+        # further in, so this also bounds every extension of a prefix
+        d = self.section.h - self.inner - centroid
+        if d <= self.inner:
+            return math.inf
+        K = self.M_Ed / (self.section.b * (d * d) * self.material.f_ck)
+        if K > self.K_bal:
+            # Doubly reinforced; A_s_req decreases with d and grows with dc on this branch
+            need, dc = self.compression_bound(d)
+            if need == math.inf:
+                return math.inf
+            area = self.doubly_tension(d, dc)
+        else:
+            root = 0.25 - self.concrete.lever_coefficient * K
+            z = d * (0.95 if root < 0 else min(0.5 + math.sqrt(root), 0.95))
+            # A shallower d may cross K_bal, where the doubly reinforced branch still needs
+            # at least M_Ed / (z_doubly d f_yd); bound with the larger of the two lever arms
+            area = self.M_Ed / (max(z, self.concrete.z_doubly * d) * self.f_yd)
+        return min(area, self.A_s_max) * BOUND_MARGIN
+
+    def other_cost(self, centroid):
+        # Least cost of the compression steel at this centroid or a deeper one
+        need, _ = self.compression_bound(self.section.h - self.inner - centroid)
+        if need <= 0:
+            return 0.0
+        return max(self.min_layer_cost, need * self.min_unit_cost) * BOUND_MARGIN
+
+    def evaluate(self, prefix, layers, cost, A_total, centroid):
+        geometry = SectionGeometry(layers, (), A_total, centroid, 0, 0, self.section.h - self.inner - centroid,
+                                   self.inner)
+        result = self.check(geometry)
+        if result is None:
+            return False
+        if result.passed:
+            self.best_cost, self.best = cost, Reinforcement(tuple(BarLayer(d, n) for d, n in prefix), ())
+            return True
+        if result.section_type != DOUBLY_REINFORCED:
+            return False
+        search = _CompressionSearch(self.material, self.section, self.loads, self.diameters, self.max_layers,
+                                    self.min_bars, self.cost, layers, A_total, centroid)
+        search.best_cost = self.best_cost - cost
+        compression = search.run()
+        self.evaluations += search.evaluations
+        if compression is not None:
+            self.best_cost = cost + search.best_cost
+            self.best = Reinforcement(tuple(BarLayer(d, n) for d, n in prefix), compression)
+        return False
+
+
+class _CompressionSearch(_LayerSearch):
+    # Compression layers for a tension arrangement held constant
+    def __init__(self, material, section, loads, diameters, max_layers, min_bars, cost, tension, A_s_total, y_t):
+        inner = section.c_nom + section.d_w
+        stack = stack_height(tuple(BarLayer(d, 1) for d, _ in tension))
+        super().__init__(material, section, loads, diameters, max_layers, min_bars, cost,
+                         section.h - 2 * inner - 25 - stack)
+        self.tension = tension
+        self.A_s_total = A_s_total
+        self.y_t = y_t
+        self.d_eff = section.h - self.inner - y_t
+
+    def required_area(self, centroid):
+        # A_sc_req at this compression centroid, which only grows as inner layers move it in;
+        # infinite once the tension steel is short there, as it is for every deeper centroid
+        dc = self.inner + centroid
+        if self.d_eff <= dc:
+            return math.inf
+        if self.A_s_total <= min(self.doubly_tension(self.d_eff, dc), self.A_s_max) * BOUND_MARGIN:
+            return math.inf
+        return self.compression_need(self.d_eff, dc) * BOUND_MARGIN
+
+    def evaluate(self, prefix, layers, cost, A_total, centroid):
+        geometry = SectionGeometry(self.tension, layers, self.A_s_total, self.y_t, A_total, centroid, self.d_eff,
+                                   self.inner + centroid)
+        result = self.check(geometry)
+        if result is None or not result.passed:
+            return False
+        self.best_cost, self.best = cost, tuple(BarLayer(d, n) for d, n in prefix)
+        return True
+
+
+def optimize_reinforcement(material, section, loads, diameters=BAR_DIAMETERS, max_layers=MAX_LAYERS,
+                           min_bars=2, cost=steel_area_cost):
+    """Lowest-cost tension and compression layers that pass the bending check.
+
+    cost(diameter, count) gives the cost of one layer and must increase with the
+    number of bars. Raises ValueError when no arrangement within the limits passes.
+    """
+    search = _TensionSearch(material, section, loads, diameters, max_layers, min_bars, cost)
+    reinforcement = search.run()
+    if reinforcement is not None:
+        result = design_bending(material, section, reinforcement, loads)
+        if result.passed:
+            return OptimizationResult(reinforcement, result, search.best_cost, search.evaluations)
+    raise ValueError("No reinforcement arrangement within the bar and layer limits passes the bending check.")
+
+
+def _optimize_case(case, options):
+    material, section, loads = case
+    try:
+        return optimize_reinforcement(material, section, loads, **options)
+    except ValueError:
+        return None
+
+
+def optimize_schedule(cases, workers=None, chunksize=16, **options):
+    """Optimize a schedule of (Material, Section, Loads) cases across a process pool.
+
+    Returns one OptimizationResult per case, or None where nothing passes.
+    workers=1 runs in-process; keyword options are passed to optimize_reinforcement.
+    """
+    cases = list(cases)
+    if workers == 1:
+        return [_optimize_case(case, options) for case in cases]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_optimize_case, cases, [options] * len(cases), chunksize=chunksize))
@@ -0,0 +1,166 @@
+"""Section diagram rendering.
+
+SectionRenderer keeps its artists between updates: the concrete outline and the
+link are single rectangles whose bounds are updated, and each bar layer is one
+EllipseCollection whose offsets and sizes are replaced. On an interactive canvas
+the bars are blitted over a cached background of the outline and link, so a
+change to the bars alone does not redraw the rest of the figure.
+
+render_section_png and render_section_rgb draw the same diagram headless with
+the Agg backend into in-memory PNG bytes or raw RGB pixels, for reports.
+"""
+import io
+import math
+import threading
+
+import numpy as np
+from matplotlib.collections import EllipseCollection
+from matplotlib.patches import Rectangle
+
+from ec2_profile import count
+
+
+def bar_positions(c_nom, b, h, reinforcement_layers, d_w):
+    # (diameter, x array, y array) per layer; tension layers stack up from the bottom
+    # face and compression layers down from the top, max(25, d) apart
+    positions = []
+    for face in ('tension', 'compression'):
+        offset = c_nom + d_w
+        for i, (d_s, A_s) in enumerate(reinforcement_layers[face]):
+            if i > 0:
+                previous_diameter = reinforcement_layers[face][i - 1][0]
+                offset += previous_diameter + max(25, previous_diameter)
+            depth = offset + d_s * 0.5
+            y_position = depth if face == 'tension' else h - depth
+            n_bars = int(round(A_s / (math.pi * (d_s * d_s) * 0.25)))
+
+            # Spread the bars evenly between the links
+            spacing = (b - 2 * (c_nom + d_w + d_s * 0.5)) / (n_bars - 1) if n_bars > 1 else 0
+            xs = c_nom + d_w + d_s * 0.5 + np.arange(n_bars) * spacing
+            positions.append((d_s, xs, np.full(n_bars, y_position)))
+    return positions
+
+
+class SectionRenderer:
+    def __init__(self, figure, blit=False):
+        self.figure = figure
+        self.blit = blit
+        self.ax = figure.add_subplot(111)
+        self.ax.set_aspect('equal')
+        self.ax.axis('off')
+        self.outline = self.ax.add_patch(Rectangle((0, 0), 1, 1, fill=True, facecolor='lightblue', edgecolor='blue'))
+        # Shear link
+        self.link = self.ax.add_patch(Rectangle((0, 0), 1, 1, fill=False, edgecolor='red', linewidth=0))
+        self.bar_collections = []
+        self.bars_drawn = 0
+        self.frame_key = None
+        self.bars_key = None
+        self.background = None
+        self.frame_dirty = True
+        if blit:
+            figure.canvas.mpl_connect('draw_event', self._on_draw)
+
+    def _bar_collection(self, index):
+        while len(self.bar_collections) <= index:
+            collection = EllipseCollection([], [], [], units='xy', offsets=np.empty((0, 2)),
+                                           offset_transform=self.ax.transData, facecolors='black',
+                                           edgecolors='black', animated=self.blit)
+            self.ax.add_collection(collection, autolim=False)
+            self.bar_collections.append(collection)
+        return self.bar_collections[index]
+
+    def update(self, c_nom, b, h, reinforcement_layers, d_w):
+        # Returns False when nothing changed since the last update
+        frame_key = (c_nom, b, h, d_w)
+        bars_key = (frame_key, tuple(map(tuple, reinforcement_layers['tension'])),
+                    tuple(map(tuple, reinforcement_layers['compression'])))
+        if bars_key == self.bars_key:
+            return False
+
+        if frame_key != self.frame_key:
+            self.outline.set_bounds(0, 0, b, h)
+            self.link.set_bounds(c_nom, c_nom, b - 2 * c_nom, h - 2 * c_nom)
+            self.link.set_linewidth(d_w / 10)
+            self.ax.set_xlim(-10, b + 10)
+            self.ax.set_ylim(-10, h + 10)
+            self.frame_key = frame_key
+            self.frame_dirty = True
+
+        positions = bar_positions(c_nom, b, h, reinforcement_layers, d_w)
+        for i, (d_s, xs, ys) in enumerate(positions):
+            collection = self._bar_collection(i)
+            sizes = np.full(len(xs), d_s)
+            collection.set_offsets(np.column_stack((xs, ys)))
+            collection.set_widths(sizes)
+            collection.set_heights(sizes)
+            collection.set_angles(np.zeros(len(xs)))
+            collection.set_visible(True)
+        for collection in self.bar_collections[len(positions):]:
+            collection.set_visible(False)
+        self.bars_drawn = sum(len(xs) for _, xs, _ in positions)
+        count('bars drawn', self.bars_drawn)
+        self.bars_key = bars_key
+        return True
+
+    def _on_draw(self, event):
+        # After every full redraw (including resizes) cache the background and put the
+        # animated bars back on top; the canvas shows the buffer once the draw is done
+        self.background = self.figure.canvas.copy_from_bbox(self.figure.bbox)
+        self._draw_bars()
+
+    def _draw_bars(self):
+        for collection in self.bar_collections:
+            if collection.get_visible():
+                self.ax.draw_artist(collection)
+
+    def draw(self):
+        canvas = self.figure.canvas
+        if not self.blit or self.frame_dirty or self.background is None:
+            self.frame_dirty = False
+            canvas.draw()
+        else:
+            canvas.restore_region(self.background)
+            self._draw_bars()
+            canvas.blit(self.figure.bbox)
+
+
+# One headless figure per thread, reused for every render
+_headless = threading.local()
+
+
+def _headless_renderer(figsize, dpi):
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    renderers = getattr(_headless, 'renderers', None)
+    if renderers is None:
+        renderers = _headless.renderers = {}
+    renderer = renderers.get((figsize, dpi))
+    if renderer is None:
+        figure = Figure(figsize=figsize, dpi=dpi)
+        FigureCanvasAgg(figure)
+        renderer = renderers[(figsize, dpi)] = SectionRenderer(figure)
+    return renderer
+
+
+def figure_rgb(figure):
+    # (width, height, raw 8-bit RGB rows) of a figure on an Agg based canvas
+    figure.canvas.draw()
+    pixels = np.asarray(figure.canvas.buffer_rgba())
+    height, width = pixels.shape[:2]
+    return width, height, pixels[:, :, :3].tobytes()
+
+
+def render_section_png(c_nom, b, h, reinforcement_layers, d_w, figsize=(4, 4), dpi=100):
+    renderer = _headless_renderer(figsize, dpi)
+    renderer.update(c_nom, b, h, reinforcement_layers, d_w)
+    buffer = io.BytesIO()
+    renderer.figure.savefig(buffer, format='png')
+    return buffer.getvalue()
+
+
+def render_section_rgb(c_nom, b, h, reinforcement_layers, d_w, figsize=(4, 4), dpi=100):
+    # Raw pixels skip PNG encoding, for callers that compress them themselves
+    renderer = _headless_renderer(figsize, dpi)
+    renderer.update(c_nom, b, h, reinforcement_layers, d_w)
+    return figure_rgb(renderer.figure)
@@ -0,0 +1,226 @@
+"""Timing spans, counters and optional cProfile/tracemalloc capture.
+
+Instrumentation is off by default. While it is off, span() hands back one
+shared no-op context manager and count() returns after a single attribute
+check, so the hooks left in the GUI, the design engine and the batch runner
+cost well under a microsecond each.
+
+    with span('bending'):
+        ...
+    count('bars drawn', n)
+
+Spans opened inside other spans on the same thread are recorded under the
+joined path ('calculate/bending'), with their count and total, min and max
+time. enable(cprofile=True) also profiles the enabling thread with cProfile and
+enable(tracemalloc=True) traces allocations; both are summarised when the
+capture is disabled. report() returns everything as a JSON-ready dict and
+export_json() writes it to a file. Worker processes keep their own profiler,
+so only the spans of the calling process are reported.
+"""
+import json
+import threading
+import time
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ('profiler', 'name', 'path', 'start')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        stack = self.profiler._stack()
+        stack.append(self.name)
+        self.path = '/'.join(stack)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        elapsed = time.perf_counter() - self.start
+        self.profiler._stack().pop()
+        self.profiler._record(self.path, elapsed)
+        return False
+
+
+class Profiler:
+    def __init__(self):
+        self.enabled = False
+        self.spans = {}  # path -> [count, total, min, max] in seconds
+        self.counters = {}
+        self.profile = None  # Top functions of the last cProfile capture
+        self.memory = None  # Summary of the last tracemalloc capture
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._cprofile = None
+        self._tracing = False
+
+    def _stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _record(self, path, elapsed):
+        with self._lock:
+            entry = self.spans.get(path)
+            if entry is None:
+                self.spans[path] = [1, elapsed, elapsed, elapsed]
+            else:
+                entry[0] += 1
+                entry[1] += elapsed
+                entry[2] = min(entry[2], elapsed)
+                entry[3] = max(entry[3], elapsed)
+
+    def span(self, name):
+        return _Span(self, name) if self.enabled else _NULL_SPAN
+
+    def count(self, name, n=1):
+        if self.enabled:
+            with self._lock:
+                self.counters[name] = self.counters.get(name, 0) + n
+
+    def enable(self, cprofile=False, tracemalloc=False):
+        # cProfile and tracemalloc are only imported when a capture is asked for
+        self.enabled = True
+        if cprofile and self._cprofile is None:
+            import cProfile
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+        if tracemalloc:
+            import tracemalloc as _tracemalloc
+            if not _tracemalloc.is_tracing():
+                _tracemalloc.start()
+                self._tracing = True
+
+    def disable(self, top=25):
+        self.enabled = False
+        if self._cprofile is not None:
+            self._cprofile.disable()
+            self.profile = _profile_summary(self._cprofile, top)
+            self._cprofile = None
+        if self._tracing:
+            import tracemalloc as _tracemalloc
+            self.memory = _memory_summary(top)
+            _tracemalloc.stop()
+            self._tracing = False
+
+    def reset(self):
+        with self._lock:
+            self.spans = {}
+            self.counters = {}
+            self.profile = None
+            self.memory = None
+
+    def report(self):
+        with self._lock:
+            spans = {path: {'count': n, 'total_ms': total * 1e3, 'mean_ms': total / n * 1e3,
+                            'min_ms': low * 1e3, 'max_ms': high * 1e3}
+                     for path, (n, total, low, high) in sorted(self.spans.items())}
+            return {
+                'enabled': self.enabled,
+                'spans': spans,
+                'counters': dict(sorted(self.counters.items())),
+                'profile': self.profile,
+                'memory': self.memory,
+            }
+
+    def export_json(self, path):
+        with open(path, 'w', encoding='utf-8') as stream:
+            json.dump(self.report(), stream, indent=2)
+
+    def format_report(self):
+        # Plain-text tables of report(), for the diagnostics panel and the console
+        report = self.report()
+        lines = [f"{'span':<44} {'count':>7} {'total ms':>10} {'mean ms':>9} {'max ms':>9}"]
+        for path, entry in report['spans'].items():
+            lines.append(f"{path:<44} {entry['count']:>7} {entry['total_ms']:>10.2f} {entry['mean_ms']:>9.3f} "
+                         f"{entry['max_ms']:>9.3f}")
+        if report['counters']:
+            lines.append("")
+            lines.append(f"{'counter':<44} {'value':>7}")
+            lines.extend(f"{name:<44} {value:>7}" for name, value in report['counters'].items())
+        if report['profile']:
+            lines.append("")
+            lines.append(f"{'function (cProfile)':<60} {'calls':>8} {'cum ms':>10}")
+            lines.extend(f"{entry['function'][-60:]:<60} {entry['calls']:>8} {entry['cumulative_ms']:>10.2f}"
+                         for entry in report['profile'])
+        if report['memory']:
+            memory = report['memory']
+            lines.append("")
+            lines.append(f"memory (tracemalloc): current {memory['current_kb']:.0f} kB, peak {memory['peak_kb']:.0f} kB")
+            lines.extend(f"  {entry['size_kb']:>9.1f} kB {entry['count']:>7}  {entry['line']}" for entry in memory['top'])
+        return "\n".join(lines)
+
+
+def _profile_summary(profile, top):
+    # The top functions by cumulative time
+    import io
+    import pstats
+
+    stats = pstats.Stats(profile, stream=io.StringIO())
+    entries = []
+    for (filename, line, function), (_, calls, total, cumulative, _) in stats.stats.items():
+        entries.append({'function': f"{filename}:{line}({function})", 'calls': calls,
+                        'total_ms': total * 1e3, 'cumulative_ms': cumulative * 1e3})
+    entries.sort(key=lambda entry: entry['cumulative_ms'], reverse=True)
+    return entries[:top]
+
+
+def _memory_summary(top):
+    import tracemalloc as _tracemalloc
+
+    current, peak = _tracemalloc.get_traced_memory()
+    statistics = _tracemalloc.take_snapshot().statistics('lineno')[:top]
+    return {
+        'current_kb': current / 1024,
+        'peak_kb': peak / 1024,
+        'top': [{'line': str(stat.traceback[0]), 'size_kb': stat.size / 1024, 'count': stat.count}
+                for stat in statistics],
+    }
+
+
+# Process-wide profiler used by the hooks
+PROFILER = Profiler()
+
+
+def span(name):
+    return _Span(PROFILER, name) if PROFILER.enabled else _NULL_SPAN
+
+
+def count(name, n=1):
+    if PROFILER.enabled:
+        PROFILER.count(name, n)
+
+
+def enable(cprofile=False, tracemalloc=False):
+    PROFILER.enable(cprofile, tracemalloc)
+
+
+def disable():
+    PROFILER.disable()
+
+
+def reset():
+    PROFILER.reset()
+
+
+def report():
+    return PROFILER.report()
+
+
+def export_json(path):
+    PROFILER.export_json(path)
@@ -0,0 +1,451 @@
+"""Project files: many beams in one SQLite file, with incremental recompute.
+
+Materials, sections, reinforcement (bar layers plus the link legs and
+spacing) and load cases are named definitions shared by members, each member
+referencing one of each by name. Changing a definition marks every member
+that uses it dirty with one UPDATE, as does editing or adding a member, so
+after changing a concrete class used by 80 beams recompute() only checks
+those 80. Dirty members are checked in chunks across a process pool and their
+results written back with executemany; a stored ENGINE_VERSION older than the
+engine's marks the whole project dirty when it is opened.
+
+Edits and results stay in the open transaction until save(); close() without
+save() discards them. Definitions are held in memory while the file is open,
+so building the cases of thousands of members needs one SELECT.
+
+    python RC_Beam_EC2.py project import frame.prj beams.csv
+    python RC_Beam_EC2.py project set frame.prj material C30 f_ck=35
+    python RC_Beam_EC2.py project recompute frame.prj -j 8
+    python RC_Beam_EC2.py project export frame.prj -o results.jsonl
+"""
+import argparse
+import json
+import math
+import os
+import sqlite3
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import fields, replace
+
+from ec2_design import ENGINE_VERSION, BarLayer, Loads, Material, Reinforcement, Section, design_bending
+
+KINDS = ('material', 'section', 'reinforcement', 'loads')
+MEMBER_FIELDS = ('id', 'material', 'section', 'reinforcement', 'loads')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS materials (name TEXT PRIMARY KEY, f_ck REAL, f_yk_main REAL, f_yk_shear REAL,
+                                      gamma_c REAL, alpha_cc REAL, gamma_s REAL);
+CREATE TABLE IF NOT EXISTS sections (name TEXT PRIMARY KEY, b REAL, h REAL, min_cover REAL, cover_dev REAL,
+                                     d_w REAL, rdp REAL);
+CREATE TABLE IF NOT EXISTS reinforcements (name TEXT PRIMARY KEY, tension TEXT, compression TEXT, legs INTEGER,
+                                           spacing REAL);
+CREATE TABLE IF NOT EXISTS loads (name TEXT PRIMARY KEY, uls_m_ed REAL, sls_m_ed REAL, v_ed REAL, v_ef REAL,
+                                  t_ed REAL, t_ef REAL);
+CREATE TABLE IF NOT EXISTS members (id TEXT PRIMARY KEY, material TEXT, section TEXT, reinforcement TEXT,
+                                    loads TEXT, dirty INTEGER DEFAULT 1, result TEXT);
+CREATE INDEX IF NOT EXISTS members_material ON members (material);
+CREATE INDEX IF NOT EXISTS members_section ON members (section);
+CREATE INDEX IF NOT EXISTS members_reinforcement ON members (reinforcement);
+CREATE INDEX IF NOT EXISTS members_loads ON members (loads);
+CREATE INDEX IF NOT EXISTS members_dirty ON members (dirty) WHERE dirty = 1;
+"""
+
+# Table of each kind of definition
+TABLES = {'material': 'materials', 'section': 'sections', 'reinforcement': 'reinforcements', 'loads': 'loads'}
+
+
+def _layers_json(layers):
+    return json.dumps([[float(layer.diameter), int(layer.count)] for layer in layers], separators=(',', ':'))
+
+
+def _layers(text):
+    return tuple(BarLayer(d, int(n)) for d, n in json.loads(text))
+
+
+def _row_values(kind, value):
+    # Column values of a definition, in table order after the name
+    if kind == 'reinforcement':
+        reinforcement, legs, spacing = value
+        return (_layers_json(reinforcement.tension), _layers_json(reinforcement.compression), int(legs),
+                None if spacing is None else float(spacing))
+    return tuple(float(getattr(value, f.name)) for f in fields(value))
+
+
+def _from_row(kind, row):
+    if kind == 'material':
+        return Material(*row)
+    if kind == 'section':
+        return Section(*row)
+    if kind == 'loads':
+        return Loads(*row)
+    tension, compression, legs, spacing = row
+    return Reinforcement(_layers(tension), _layers(compression)), legs, spacing
+
+
+def check_member(case, legs=2, spacing=None):
+    """Result record of one member: the bending summary plus shear, torsion and SLS where loaded."""
+    material, section, reinforcement, loads = case
+    try:
+        bending = design_bending(material, section, reinforcement, loads)
+        record = {'status': 'ok', 'error': None, 'bending': bending.summary()}
+        passed = bending.passed
+        if loads.v_ed or loads.v_ef:
+            from ec2_shear import check_shear
+            shear = check_shear(material, section, bending.geometry, loads, legs, spacing)
+            record['shear'] = shear.summary()
+            passed = passed and shear.passed
+        if loads.t_ed or loads.t_ef:
+            from ec2_torsion import check_torsion
+            torsion = check_torsion(material, section, bending.geometry, loads, legs, spacing)
+            record['torsion'] = torsion.summary()
+            passed = passed and torsion.passed
+        if loads.sls_m_ed:
+            from ec2_sls import check_sls
+            sls = check_sls(material, section, bending.geometry, loads)
+            record['sls'] = sls.summary()
+            passed = passed and sls.passed
+        record['passed'] = bool(passed)
+    except Exception as e:
+        record = {'status': 'error', 'error': str(e), 'passed': False}
+    return record
+
+
+def _finite(value):
+    # JSON has no inf or NaN (link_utilisation is inf without shear links); write them as null
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {key: _finite(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_finite(item) for item in value]
+    return value
+
+
+def result_json(result):
+    return json.dumps(_finite(result), allow_nan=False)
+
+
+def _check_chunk(members):
+    # (result JSON, member id) rows ready for executemany
+    return [(result_json(check_member(case, legs, spacing)), member_id) for member_id, case, legs, spacing in members]
+
+
+class Project:
+    def __init__(self, path=':memory:'):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(SCHEMA)
+        version = self.connection.execute("SELECT value FROM meta WHERE key = 'engine_version'").fetchone()
+        if version is None or version[0] != ENGINE_VERSION:
+            # Results written by another engine version are stale
+            self.connection.execute("UPDATE members SET dirty = 1")
+            self.connection.execute("INSERT OR REPLACE INTO meta VALUES ('engine_version', ?)", (ENGINE_VERSION,))
+        self.definitions = {kind: {} for kind in KINDS}
+        for kind, table in TABLES.items():
+            for name, *row in self.connection.execute(f"SELECT * FROM {table}"):
+                self.definitions[kind][name] = _from_row(kind, row)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return self.connection.execute("SELECT COUNT(*) FROM members").fetchone()[0]
+
+    def __contains__(self, member_id):
+        return self.connection.execute("SELECT 1 FROM members WHERE id = ?", (member_id,)).fetchone() is not None
+
+    # Definitions
+
+    def put(self, kind, name, value):
+        """Add or change a definition; members using a changed one become dirty."""
+        if kind not in TABLES:
+            raise ValueError(f"Unknown definition kind {kind!r}; expected one of {', '.join(KINDS)}.")
+        previous = self.definitions[kind].get(name)
+        if previous == value:
+            return 0
+        row = _row_values(kind, value)
+        self.connection.execute(f"INSERT OR REPLACE INTO {TABLES[kind]} VALUES ({', '.join('?' * (len(row) + 1))})",
+                                (name,) + row)
+        self.definitions[kind][name] = value
+        if previous is None:
+            return 0
+        return self.connection.execute(f"UPDATE members SET dirty = 1 WHERE {kind} = ?", (name,)).rowcount
+
+    def put_material(self, name, material):
+        return self.put('material', name, material)
+
+    def put_section(self, name, section):
+        return self.put('section', name, section)
+
+    def put_reinforcement(self, name, reinforcement, legs=2, spacing=None):
+        # Links are stored with the layers: legs per set and spacing, None to design the spacing
+        return self.put('reinforcement', name, (reinforcement, int(legs), spacing))
+
+    def put_loads(self, name, loads):
+        return self.put('loads', name, loads)
+
+    def update(self, kind, name, **changes):
+        """Change some fields of a definition, e.g. update('material', 'C30', f_ck=35)."""
+        value = self.definition(kind, name)
+        allowed = ('tension', 'compression', 'legs', 'spacing') if kind == 'reinforcement' else \
+            tuple(f.name for f in fields(value))
+        unknown = [field for field in changes if field not in allowed]
+        if unknown:
+            raise ValueError(f"Unknown {kind} field {unknown[0]!r}; expected one of {', '.join(allowed)}.")
+        if kind == 'reinforcement':
+            reinforcement, legs, spacing = value
+            layer_changes = {k: v for k, v in changes.items() if k in ('tension', 'compression')}
+            value = (replace(reinforcement, **layer_changes), changes.get('legs', legs), changes.get('spacing', spacing))
+        else:
+            value = replace(value, **changes)
+        return self.put(kind, name, value)
+
+    def definition(self, kind, name):
+        try:
+            return self.definitions[kind][name]
+        except KeyError:
+            raise ValueError(f"Please provide an existing {kind} name; {name!r} is not defined.")
+
+    def users(self, kind, name):
+        return [row[0] for row in self.connection.execute(f"SELECT id FROM members WHERE {kind} = ?", (name,))]
+
+    # Members
+
+    def add_members(self, members):
+        """Add or replace members from (id, material, section, reinforcement, loads) name tuples."""
+        rows = []
+        for member in members:
+            for kind, name in zip(KINDS, member[1:]):
+                self.definition(kind, name)
+            rows.append(tuple(member) + (1, None))
+        self.connection.executemany("INSERT OR REPLACE INTO members VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+        return len(rows)
+
+    def add_member(self, member_id, material, section, reinforcement, loads):
+        return self.add_members([(member_id, material, section, reinforcement, loads)])
+
+    def update_member(self, member_id, **names):
+        # Point a member at other definitions, e.g. update_member('B12', section='300x600')
+        for kind, name in names.items():
+            if kind not in TABLES:
+                raise ValueError(f"Unknown definition kind {kind!r}; expected one of {', '.join(KINDS)}.")
+            self.definition(kind, name)
+        assignments = ', '.join(f"{kind} = ?" for kind in names)
+        updated = self.connection.execute(f"UPDATE members SET {assignments}, dirty = 1 WHERE id = ?",
+                                          tuple(names.values()) + (member_id,)).rowcount
+        if not updated:
+            raise ValueError(f"Please provide an existing member ID; {member_id!r} is not in the project.")
+
+    def remove_member(self, member_id):
+        self.connection.execute("DELETE FROM members WHERE id = ?", (member_id,))
+
+    def member(self, member_id):
+        row = self.connection.execute("SELECT * FROM members WHERE id = ?", (member_id,)).fetchone()
+        if row is None:
+            raise ValueError(f"Please provide an existing member ID; {member_id!r} is not in the project.")
+        return dict(zip(MEMBER_FIELDS + ('dirty', 'result'), row))
+
+    def member_case(self, member_id):
+        """(Material, Section, Reinforcement, Loads) of a member."""
+        member = self.member(member_id)
+        return self._case(member['material'], member['section'], member['reinforcement'], member['loads'])[0]
+
+    def _case(self, material, section, reinforcement, loads):
+        reinforcement, legs, spacing = self.definitions['reinforcement'][reinforcement]
+        case = (self.definitions['material'][material], self.definitions['section'][section], reinforcement,
+                self.definitions['loads'][loads])
+        return case, legs, spacing
+
+    def members(self):
+        return [row[0] for row in self.connection.execute("SELECT id FROM members ORDER BY id")]
+
+    def dirty_members(self):
+        return [row[0] for row in self.connection.execute("SELECT id FROM members WHERE dirty = 1 ORDER BY id")]
+
+    def mark_dirty(self, member_ids=None):
+        if member_ids is None:
+            return self.connection.execute("UPDATE members SET dirty = 1").rowcount
+        return self.connection.executemany("UPDATE members SET dirty = 1 WHERE id = ?",
+                                           ((member_id,) for member_id in member_ids)).rowcount
+
+    # Results
+
+    def recompute(self, workers=1, chunk_size=250, progress=None):
+        """Check the dirty members, workers=1 in-process; returns how many were checked."""
+        rows = self.connection.execute(
+            "SELECT id, material, section, reinforcement, loads FROM members WHERE dirty = 1 ORDER BY id").fetchall()
+        members = [(row[0],) + self._case(*row[1:]) for row in rows]  # (id, case, legs, spacing)
+        chunks = [members[i:i + chunk_size] for i in range(0, len(members), chunk_size)]
+        done = 0
+
+        def write(results):
+            nonlocal done
+            self.connection.executemany("UPDATE members SET result = ?, dirty = 0 WHERE id = ?", results)
+            done += len(results)
+            if progress is not None:
+                progress(done, len(members))
+
+        if workers <= 1 or len(chunks) <= 1:
+            for chunk in chunks:
+                write(_check_chunk(chunk))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for results in pool.map(_check_chunk, chunks):
+                    write(results)
+        return done
+
+    def result(self, member_id):
+        member = self.member(member_id)
+        return None if member['result'] is None else json.loads(member['result'])
+
+    def results(self):
+        # {id: result record} of every member checked since its last change
+        return {member_id: json.loads(result) for member_id, result in
+                self.connection.execute("SELECT id, result FROM members WHERE dirty = 0 ORDER BY id")}
+
+    # Files
+
+    def save(self, path=None):
+        """Commit; with a path, also write a copy of the whole project there."""
+        self.connection.commit()
+        if path is not None and path != self.path:
+            target = sqlite3.connect(path)
+            try:
+                self.connection.backup(target)
+            finally:
+                target.close()
+
+    def close(self):
+        # Unsaved edits are rolled back
+        self.connection.close()
+
+
+def open_project(path):
+    return Project(path)
+
+
+def import_records(project, rows, legs=2, spacing=None):
+    """Add members from batch-runner rows, sharing definitions with equal values.
+
+    New definitions are named M1, S1, R1, ... and each member gets a load case
+    named after it. Returns the (line, message) of the rows that could not be read.
+    """
+    from ec2_design import case_from_record
+
+    names = {kind: {value: name for name, value in project.definitions[kind].items()} for kind in KINDS}
+    prefixes = {'material': 'M', 'section': 'S', 'reinforcement': 'R'}
+    members, errors = [], []
+    for line, record in rows:
+        if isinstance(record, str):
+            errors.append((line, record))
+            continue
+        try:
+            material, section, reinforcement, loads = case_from_record(record)
+        except Exception as e:
+            errors.append((line, str(e)))
+            continue
+        member_id = str(record.get('id') or f"L{line}")
+        member = [member_id]
+        for kind, value in (('material', material), ('section', section),
+                            ('reinforcement', (reinforcement, legs, spacing))):
+            name = names[kind].get(value)
+            if name is None:
+                name = f"{prefixes[kind]}{len(names[kind]) + 1}"
+                while name in project.definitions[kind]:
+                    name += "'"
+                project.put(kind, name, value)
+                names[kind][value] = name
+            member.append(name)
+        project.put_loads(member_id, loads)
+        member.append(member_id)
+        members.append(tuple(member))
+    project.add_members(members)
+    return errors
+
+
+def _assignment(text):
+    name, _, value = text.partition('=')
+    if not value:
+        raise argparse.ArgumentTypeError(f"expected field=value, got {text!r}")
+    return name, value
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='RC_Beam_EC2.py project',
+                                     description='Project files holding many beams, with incremental recompute.')
+    commands = parser.add_subparsers(dest='command', required=True)
+    command = commands.add_parser('import', help='add members from CSV or JSONL rows')
+    command.add_argument('project')
+    command.add_argument('input')
+    command.add_argument('--input-format', choices=['csv', 'jsonl'], help='default: from the file extension, else csv')
+    command = commands.add_parser('set', help='change fields of a definition, marking its members dirty')
+    command.add_argument('project')
+    command.add_argument('kind', choices=KINDS)
+    command.add_argument('name')
+    command.add_argument('changes', nargs='+', type=_assignment, metavar='field=value')
+    command = commands.add_parser('recompute', help='check the dirty members')
+    command.add_argument('project')
+    command.add_argument('-j', '--workers', type=int, default=os.cpu_count() or 1,
+                         help='worker processes; 1 checks in-process (default: CPU count)')
+    command = commands.add_parser('export', help='write the member results as JSONL')
+    command.add_argument('project')
+    command.add_argument('-o', '--output', default='-', help="output file, or '-' for stdout (default)")
+    command = commands.add_parser('status', help='count the members and the dirty ones')
+    command.add_argument('project')
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    with Project(args.project) as project:
+        if args.command == 'import':
+            from ec2_cli import detect_format, read_csv_rows, read_jsonl_rows
+
+            input_format = args.input_format or detect_format(args.input, 'csv')
+            with open(args.input, encoding='utf-8-sig', newline='') as stream:
+                rows = read_csv_rows(stream) if input_format == 'csv' else read_jsonl_rows(stream)
+                errors = import_records(project, rows)
+            for line, message in errors:
+                print(f"line {line}: {message}", file=sys.stderr)
+        elif args.command == 'set':
+            changes = {}
+            for name, value in args.changes:
+                if args.kind == 'reinforcement' and name in ('tension', 'compression'):
+                    changes[name] = tuple(BarLayer(float(d), int(n)) for d, n in json.loads(value))
+                elif name == 'legs':
+                    changes[name] = int(value)
+                elif name == 'spacing':
+                    changes[name] = None if value.lower() == 'none' else float(value)
+                else:
+                    changes[name] = float(value)
+            try:
+                dirty = project.update(args.kind, args.name, **changes)
+            except (TypeError, ValueError) as e:
+                print(f"Error: {e}", file=sys.stderr)
+                return 1
+            print(f"{dirty} members marked dirty", file=sys.stderr)
+        elif args.command == 'recompute':
+            checked = project.recompute(workers=args.workers)
+            print(f"{checked} members checked", file=sys.stderr)
+        elif args.command == 'export':
+            output = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+            try:
+                for member_id, result in project.results().items():
+                    output.write(result_json({'id': member_id, **result}) + '\n')
+            finally:
+                if output is not sys.stdout:
+                    output.close()
+            return 0
+        else:
+            print(f"{len(project)} members, {len(project.dirty_members())} dirty", file=sys.stderr)
+            return 0
+        project.save()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
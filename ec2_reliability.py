@@ -0,0 +1,265 @@
+"""Monte Carlo reliability of a section in bending or shear.
+
+The random variables are the actual material strengths, the cover, the section
+dimensions and the load effect, each with its own distribution. Every sample
+is checked without partial factors: failure is g = R - E < 0, with the
+bending resistance R from the strain-compatibility engine (ec2_fibre) or the
+shear resistance from ec2_shear, evaluated a chunk of samples at a time as one
+NumPy batch.
+
+Chunks run across a process pool. Chunk i always draws from the stream
+SeedSequence(seed, spawn_key=(i,)), so a run is reproducible whatever the
+number of workers or the order in which chunks finish. Chunks are submitted in
+rounds and taken back in index order, updating the estimate
+
+    P_f = failures / n,   CoV(P_f) = sqrt((1 - P_f) / (n P_f))
+
+after each; the run stops at the first chunk where the CoV reaches the target
+(or at max_samples). The sensitivity of g to each variable is its correlation
+with g over all samples, from running sums.
+
+default_variables derives the distributions from the deterministic design
+inputs, which also give the reference result of the design check:
+
+    f_c    lognormal, mean f_ck + 8, f_ck at the 5 % fractile
+    f_y    lognormal, mean f_yk + 2 σ with σ = 30 N/mm² (f_yw for shear links)
+    cover  normal, mean c_nom, c_min at the 5 % fractile
+    b, h   normal, mean nominal, σ = 4 + 0.006 x dimension (mm)
+    M_E    Gumbel, mean M_Ed / load_factor, CoV 0.2 (V_E the same)
+"""
+import math
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from statistics import NormalDist
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from ec2_design import design_bending
+
+DISTRIBUTIONS = ('normal', 'lognormal', 'gumbel', 'fixed')
+LIMIT_STATES = ('bending', 'shear')
+
+# Mean load effect as a fraction of the design value
+LOAD_FACTOR = 1.4
+
+
+@dataclass(frozen=True)
+class Variable:
+    distribution: str
+    mean: float
+    std: float = 0.0
+
+    def __post_init__(self):
+        if self.distribution not in DISTRIBUTIONS:
+            raise ValueError(f"Unknown distribution {self.distribution!r}; expected one of {', '.join(DISTRIBUTIONS)}.")
+        if self.std < 0 or (self.distribution == 'lognormal' and self.mean <= 0):
+            raise ValueError(f"Invalid {self.distribution} parameters: mean {self.mean}, std {self.std}.")
+
+    def sample(self, rng, n):
+        if self.distribution == 'fixed' or self.std == 0:
+            return np.full(n, float(self.mean))
+        if self.distribution == 'normal':
+            return rng.normal(self.mean, self.std, n)
+        if self.distribution == 'lognormal':
+            sigma = math.sqrt(math.log1p((self.std / self.mean) ** 2))
+            return rng.lognormal(math.log(self.mean) - sigma * sigma / 2, sigma, n)
+        # Gumbel (largest values)
+        scale = self.std * math.sqrt(6) / math.pi
+        return rng.gumbel(self.mean - 0.5772156649 * scale, scale, n)
+
+
+def default_variables(material, section, loads, limit_state='bending', load_factor=LOAD_FACTOR):
+    # Distributions around the deterministic design inputs, see the module docstring
+    variables = {
+        'f_c': Variable('lognormal', material.f_ck + 8, 8 / 1.645),
+        'cover': Variable('normal', section.c_nom, section.cover_dev / 1.645),
+        'b': Variable('normal', section.b, 4 + 0.006 * section.b),
+        'h': Variable('normal', section.h, 4 + 0.006 * section.h),
+    }
+    if limit_state == 'bending':
+        variables['f_y'] = Variable('lognormal', material.f_yk_main + 60, 30.0)
+        variables['M_E'] = Variable('gumbel', abs(loads.uls_m_ed) / load_factor, 0.2 * abs(loads.uls_m_ed) / load_factor)
+    else:
+        variables['f_yw'] = Variable('lognormal', material.f_yk_shear + 60, 30.0)
+        variables['V_E'] = Variable('gumbel', abs(loads.v_ed) / load_factor, 0.2 * abs(loads.v_ed) / load_factor)
+    return variables
+
+
+def _bending_margin(samples, fixed):
+    from ec2_fibre import batch_layer_depths, fibre_analysis_batch
+
+    depths, areas = batch_layer_depths(samples['h'], samples['cover'], fixed['d_w'], fixed['tension_diameters'],
+                                       fixed['tension_counts'], fixed['compression_diameters'],
+                                       fixed['compression_counts'])
+    result = fibre_analysis_batch(samples['b'], samples['h'], samples['f_c'], samples['f_y'], depths, areas,
+                                  d_eff=depths[:, 0], alpha_cc=1.0, gamma_c=1.0, gamma_s=1.0)
+    return result.M_Rd - samples['M_E']
+
+
+def _shear_margin(samples, fixed):
+    from ec2_shear import shear_design_batch
+
+    d = samples['h'] - samples['cover'] - fixed['d_w'] - fixed['tension_offset']
+    result = shear_design_batch(samples['V_E'], samples['b'], d, fixed['A_sl'], samples['f_c'], samples['f_yw'],
+                                fixed['A_sw'], fixed['spacing'], alpha_cc=1.0, gamma_c=1.0, gamma_s=1.0)
+    resistance = np.maximum(result.V_Rd_c, np.minimum(result.V_Rd_s, result.V_Rd_max))
+    return resistance - samples['V_E']
+
+
+def _evaluate_chunk(limit_state, variables, fixed, seed, chunk_index, size):
+    # Failures and the running sums for the correlations of one chunk of samples
+    rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(chunk_index,)))
+    samples = {name: variable.sample(rng, size) for name, variable in variables.items()}
+    margin = (_bending_margin if limit_state == 'bending' else _shear_margin)(samples, fixed)
+    margin = np.nan_to_num(margin, nan=-np.inf)
+    finite = np.where(np.isfinite(margin), margin, 0.0)
+    names = list(variables)
+    values = np.stack([samples[name] for name in names])
+    return {
+        'n': size,
+        'failures': int((margin < 0).sum()),
+        'g': finite.sum(),
+        'g2': (finite * finite).sum(),
+        'x': values.sum(axis=1),
+        'x2': (values * values).sum(axis=1),
+        'xg': (values * finite).sum(axis=1),
+    }
+
+
+@dataclass
+class ReliabilityResult:
+    limit_state: str
+    samples: int
+    failures: int
+    target_cov: float
+    variables: Dict[str, Variable]
+    sensitivity: Dict[str, float]  # Correlation of g with each variable
+    reference: object  # Deterministic design check at the nominal inputs
+    history: List[Tuple[int, float, float]] = field(default_factory=list)  # (samples, P_f, CoV) per chunk
+
+    @property
+    def probability(self):
+        return self.failures / self.samples if self.samples else math.nan
+
+    @property
+    def cov(self):
+        p = self.probability
+        return math.sqrt((1 - p) / (self.samples * p)) if self.failures else math.inf
+
+    @property
+    def beta(self):
+        # Reliability index -Φ⁻¹(P_f); infinite when no sample failed
+        p = self.probability
+        if self.failures == 0:
+            return math.inf
+        if p >= 1:
+            return -math.inf
+        return -NormalDist().inv_cdf(p)
+
+    @property
+    def converged(self):
+        return self.cov <= self.target_cov
+
+    def summary(self):
+        return {
+            'limit_state': self.limit_state,
+            'samples': self.samples,
+            'failures': self.failures,
+            'P_f': self.probability,
+            'cov': self.cov,
+            'beta': self.beta,
+            'converged': self.converged,
+            'sensitivity': dict(self.sensitivity),
+        }
+
+
+def _fixed_inputs(section, reinforcement, legs, spacing):
+    # Everything a chunk needs that is not sampled
+    from ec2_batch import batch_layer_centroid, layer_arrays
+    from ec2_shear import link_area
+
+    tension_diameters, tension_counts = layer_arrays([reinforcement.tension])
+    compression_diameters, compression_counts = layer_arrays([reinforcement.compression])
+    A_sl, y_t = batch_layer_centroid(tension_diameters, tension_counts)
+    return {
+        'd_w': section.d_w,
+        'tension_diameters': tension_diameters, 'tension_counts': tension_counts,
+        'compression_diameters': compression_diameters, 'compression_counts': compression_counts,
+        'A_sl': float(A_sl[0]), 'tension_offset': float(y_t[0]),
+        'A_sw': link_area(section.d_w, legs), 'spacing': spacing,
+    }
+
+
+def _correlations(names, totals):
+    # Correlation of g with each variable from the running sums
+    n = totals['n']
+    with np.errstate(divide='ignore', invalid='ignore'):
+        covariance = totals['xg'] / n - totals['x'] / n * totals['g'] / n
+        spread = np.sqrt((totals['x2'] / n - (totals['x'] / n) ** 2) * (totals['g2'] / n - (totals['g'] / n) ** 2))
+        correlation = np.where(spread > 0, covariance / spread, 0.0)
+    return dict(zip(names, correlation.tolist()))
+
+
+def reliability_analysis(material, section, reinforcement, loads, limit_state='bending', variables=None,
+                         seed=0, target_cov=0.05, min_samples=100_000, max_samples=10_000_000,
+                         chunk_size=100_000, workers=1, legs=2, spacing=150.0, progress=None):
+    """Estimate P_f of one section by Monte Carlo, stopping once CoV(P_f) <= target_cov.
+
+    variables overrides entries of default_variables by name. progress, when
+    given, is called with the ReliabilityResult after every round.
+    """
+    if limit_state not in LIMIT_STATES:
+        raise ValueError(f"Unknown limit state {limit_state!r}; expected one of {', '.join(LIMIT_STATES)}.")
+    if limit_state == 'bending':
+        reference = design_bending(material, section, reinforcement, loads)
+    else:
+        from ec2_shear import design_shear
+        reference = design_shear(material, section, reinforcement, loads, legs, spacing)
+    chosen = default_variables(material, section, loads, limit_state)
+    for name, variable in (variables or {}).items():
+        if name not in chosen:
+            raise ValueError(f"Unknown variable {name!r} for {limit_state}; expected one of {', '.join(chosen)}.")
+        chosen[name] = variable
+    fixed = _fixed_inputs(section, reinforcement, legs, spacing)
+
+    names = list(chosen)
+    totals = {'n': 0, 'failures': 0, 'g': 0.0, 'g2': 0.0, 'x': np.zeros(len(names)), 'x2': np.zeros(len(names)),
+              'xg': np.zeros(len(names))}
+    result = ReliabilityResult(limit_state, 0, 0, target_cov, chosen, {}, reference)
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    chunk_index = 0
+    try:
+        while totals['n'] < max_samples:
+            sizes = []
+            for _ in range(max(workers, 1) * 2):
+                size = min(chunk_size, max_samples - totals['n'] - sum(sizes))
+                if size <= 0:
+                    break
+                sizes.append(size)
+            args = [(limit_state, chosen, fixed, seed, chunk_index + i, size) for i, size in enumerate(sizes)]
+            chunk_index += len(sizes)
+            if pool is None:
+                chunks = [_evaluate_chunk(*a) for a in args]
+            else:
+                chunks = [future.result() for future in [pool.submit(_evaluate_chunk, *a) for a in args]]
+            # Take the chunks in index order and stop at the first that converges, so the
+            # result does not depend on how many chunks each round held
+            done = False
+            for chunk in chunks:
+                for key in totals:
+                    totals[key] = totals[key] + chunk[key]
+                result.samples, result.failures = totals['n'], totals['failures']
+                result.history.append((result.samples, result.probability, result.cov))
+                done = result.samples >= min_samples and result.converged
+                if done:
+                    break
+            result.sensitivity = _correlations(names, totals)
+            if progress is not None:
+                progress(result)
+            if done:
+                break
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+    return result
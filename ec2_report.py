@@ -0,0 +1,408 @@
+"""PDF reports for a schedule of beams.
+
+Each member gets a page with its section diagram and bending results, after a
+summary table of the whole schedule. Members are checked and section images are
+rasterized across a process pool; the main process only lays out the pages.
+Images are rendered straight into memory and embedded as compressed RGB, and
+members with the same section and bars share one image in the file.
+
+    python RC_Beam_EC2.py report beams.csv -o schedule.pdf --workers 8
+
+fpdf and matplotlib are only imported when a report is written.
+"""
+import argparse
+import os
+import sys
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+from ec2_design import DOUBLY_REINFORCED, design_bending, layer_areas
+
+REPORT_FIELDS = [
+    ('#', 10), ('Member', 40), ('b x h', 25), ('M_Ed', 20), ('Type', 18),
+    ('A_s,prov', 22), ('A_s,req', 22), ('Util.', 15), ('Status', 18),
+]
+
+
+def format_value(value):
+    # Floats to 3 decimal places, as in the results window
+    return f"{value:.3f}" if isinstance(value, float) else value
+
+
+def bending_results_rows(material, result):
+    # Headings as strings and (label, value, unit) rows, shared by the results window
+    # and the PDF report
+    section_type = result.section_type
+    tension_utilisation_ratio = result.tension_utilisation_ratio
+    compression_utilisation_ratio = result.compression_utilisation_ratio
+    A_sc_req = result.A_sc_req
+    A_sc_total = result.A_sc_total
+
+    def check(ratio):
+        return "; Check Fail" if ratio >= 1 else "; Check ok"
+
+    rows = ["DESIGN SUMMARY", ("Section Type", section_type, "")]
+    rows.append(("Tension Reinforcement Utilisation Ratio", tension_utilisation_ratio,
+                 check(tension_utilisation_ratio)))
+
+    # Compression Reinforcement Utilization Check if Doubly Reinforced Section
+    if section_type == DOUBLY_REINFORCED:
+        if A_sc_req > 0 and A_sc_total == 0:
+            rows.append(("Compression Reinforcement", "not provided", "; Check Fail"))
+        elif compression_utilisation_ratio is not None:
+            rows.append(("Compression Reinforcement Utilisation Ratio", compression_utilisation_ratio,
+                         check(compression_utilisation_ratio)))
+
+    rows += [
+        "MATERIAL AND SECTION DETAILS",
+        ("Concrete strength (f_ck)", material.f_ck, "N/mm²"),
+        ("Main reinforcement strength (f_yk_main)", material.f_yk_main, "N/mm²"),
+        ("Shear reinforcement strength (f_yk_shear)", material.f_yk_shear, "N/mm²"),
+        ("Partial factor for concrete (gamma_c)", material.gamma_c, ""),
+        ("Compressive strength coefficient (alpha_cc)", material.alpha_cc, ""),
+        ("Partial factor for steel (gamma_s)", material.gamma_s, ""),
+        "BENDING DESIGN RESULTS",
+        ("Section Type", section_type, ""),
+        ("A_s_Pro", result.A_s_total, "mm²"),
+        ("A_s_req", result.A_s_req, "mm²"),
+        ("A_s_req / A_s_Pro", tension_utilisation_ratio, check(tension_utilisation_ratio)),
+    ]
+
+    # Compression Reinforcement Check if Doubly Reinforced Section
+    if section_type == DOUBLY_REINFORCED:
+        if A_sc_req > 0 and A_sc_total == 0:
+            rows.append(("Compression Reinforcement", "not provided", "; Check Fail"))
+        elif A_sc_req > 0:
+            rows.append(("A_sc_Pro", A_sc_total, "mm²"))
+            rows.append(("A_sc_req", A_sc_req, "mm²"))
+            if compression_utilisation_ratio is not None:
+                rows.append(("A_sc_req / A_sc_Pro", compression_utilisation_ratio,
+                             check(compression_utilisation_ratio)))
+    return rows
+
+
+def shear_results_rows(result):
+    # Rows for an ec2_shear.ShearResult, in the same form as bending_results_rows
+    def check(ratio):
+        return "; Check Fail" if ratio > 1 else "; Check ok"
+
+    rows = [
+        "SHEAR DESIGN RESULTS",
+        ("V_Ed", result.V_Ed, "kN"),
+        ("V_Ef", result.V_Ef, "kN"),
+        ("V_Rd,c", result.V_Rd_c, "kN"),
+        ("cot(theta)", result.cot_theta, ""),
+        ("V_Rd,max", result.V_Rd_max, "kN"),
+        ("max(V_Ed, V_Ef) / V_Rd,max (theta = 45 deg)", result.strut_utilisation, check(result.strut_utilisation)),
+        ("A_sw/s required", result.A_sw_s_req, "mm²/mm"),
+    ]
+    if result.s_req is None:
+        rows.append(("Shear Links", "not provided", "; Check Fail"))
+    else:
+        rows += [
+            ("Required link spacing", result.s_req, "mm"),
+            ("V_Rd,s", result.V_Rd_s, "kN"),
+            ("Link Utilisation Ratio", result.link_utilisation, check(result.link_utilisation)),
+        ]
+    return rows
+
+
+def torsion_results_rows(result):
+    # Rows for an ec2_torsion.TorsionResult, in the same form as bending_results_rows
+    def check(ratio):
+        return "; Check Fail" if ratio > 1 else "; Check ok"
+
+    rows = [
+        "TORSION DESIGN RESULTS",
+        ("T_Ed", result.T_Ed, "kNm"),
+        ("T_Ef", result.T_Ef, "kNm"),
+        ("Effective wall thickness (t_ef)", result.t_ef, "mm"),
+        ("Enclosed area (A_k)", result.A_k, "mm²"),
+        ("T_Rd,c", result.T_Rd_c, "kNm"),
+        ("cot(theta)", result.cot_theta, ""),
+        ("T_Rd,max", result.T_Rd_max, "kNm"),
+        ("T / T_Rd,max + V / V_Rd,max (theta = 45 deg)", result.interaction, check(result.interaction)),
+    ]
+    if result.concrete_only:
+        rows.append(("T_Ed / T_Rd,c + V_Ed / V_Rd,c", "<= 1", "; minimum links only"))
+    else:
+        rows += [
+            ("Additional longitudinal steel (A_sl)", result.A_sl_req, "mm²"),
+            ("Torsion links per leg (A_t/s)", result.A_t_s_req, "mm²/mm"),
+        ]
+    rows.append(("Shear + torsion links per leg", result.A_sw_s_req, "mm²/mm"))
+    if result.s_req is None:
+        rows.append(("Shear Links", "not provided", "; Check Fail"))
+    else:
+        rows += [
+            ("Required link spacing", result.s_req, "mm"),
+            ("Link Utilisation Ratio", result.link_utilisation, check(result.link_utilisation)),
+        ]
+    return rows
+
+
+def sls_results_rows(result):
+    # Rows for an ec2_sls.SLSResult, in the same form as bending_results_rows
+    def check(value, limit):
+        return "; Check Fail" if value > limit else "; Check ok"
+
+    return [
+        "SERVICEABILITY RESULTS",
+        ("SLS M_Ed", result.M, "kNm"),
+        ("Modular ratio (alpha_e)", result.alpha_e, ""),
+        ("Cracked neutral axis depth (x)", result.x, "mm"),
+        ("Cracked second moment (I_cr)", result.I_cr / 1e6, "x10^6 mm^4"),
+        ("Concrete stress (sigma_c)", result.sigma_c, "N/mm²"),
+        ("Concrete stress limit (0.45 f_ck)", result.sigma_c_limit, check(result.sigma_c, result.sigma_c_limit)),
+        ("Steel stress (sigma_s)", result.sigma_s, "N/mm²"),
+        ("Steel stress limit (0.8 f_yk)", result.sigma_s_limit, check(result.sigma_s, result.sigma_s_limit)),
+        ("Maximum crack spacing (s_r,max)", result.s_r_max, "mm"),
+        ("Crack width (w_k)", result.w_k, "mm"),
+        ("Crack width limit (w_max)", result.w_max, check(result.w_k, result.w_max)),
+    ]
+
+
+def section_image_key(section, reinforcement):
+    # Everything the section diagram depends on; members with equal keys share an image
+    return (section.c_nom, section.b, section.h, section.d_w,
+            layer_areas(reinforcement.tension), layer_areas(reinforcement.compression))
+
+
+def compress_image(image):
+    # (width, height, raw RGB) -> (width, height, Flate compressed RGB) for add_section_image
+    width, height, pixels = image
+    # The diagrams are mostly flat colour, so the fastest level compresses them nearly as well
+    return width, height, zlib.compress(pixels, 1)
+
+
+def add_section_image(pdf, name, image, x, y, w, h):
+    # Embed a compressed RGB image in an fpdf document without a file on disk. The image
+    # is stored once under name and every later call with that name reuses it.
+    if name not in pdf.images:
+        width, height, data = image
+        pdf.images[name] = {'i': len(pdf.images) + 1, 'w': width, 'h': height, 'cs': 'DeviceRGB',
+                            'bpc': 8, 'f': 'FlateDecode', 'data': data}
+    pdf.image(name, x=x, y=y, w=w, h=h)
+
+
+class _DocumentBuffer:
+    # Stands in for FPDF.buffer, which fpdf 1.7 grows one line at a time with string
+    # concatenation; that is quadratic in the document size and dominates large reports
+    def __init__(self):
+        self.parts = []
+        self.length = 0
+
+    def __iadd__(self, text):
+        self.parts.append(text)
+        self.length += len(text)
+        return self
+
+    def __len__(self):
+        return self.length
+
+    def encode(self, encoding):
+        return ''.join(self.parts).encode(encoding)
+
+
+def _latin1(text):
+    # The core PDF fonts only cover Latin-1
+    return str(text).encode('latin-1', 'replace').decode('latin-1')
+
+
+def prepare_member(name, case):
+    # case is (Material, Section, Reinforcement, Loads), or the message of an input error
+    entry = {'name': name, 'error': None, 'rows': None, 'summary': None}
+    if isinstance(case, str):
+        entry['error'] = case
+        return entry
+    material, section, reinforcement, loads = case
+    entry['size'] = f"{section.b:g} x {section.h:g}"
+    entry['m_ed'] = loads.uls_m_ed
+    try:
+        result = design_bending(material, section, reinforcement, loads)
+    except Exception as e:
+        entry['error'] = str(e)
+        return entry
+    entry['rows'] = bending_results_rows(material, result)
+    entry['summary'] = result.summary()
+    return entry
+
+
+def _prepare_chunk(members):
+    return [prepare_member(name, case) for name, case in members]
+
+
+def _render_chunk(keys, figsize, dpi):
+    from ec2_plot import render_section_rgb
+
+    images = []
+    for c_nom, b, h, d_w, tension, compression in keys:
+        layers = {'tension': list(tension), 'compression': list(compression)}
+        images.append(compress_image(render_section_rgb(c_nom, b, h, layers, d_w, figsize, dpi)))
+    return images
+
+
+def _chunks(items, size):
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def _summary_cells(index, entry):
+    cells = [str(index), entry['name'], entry.get('size', ''), '', '', '', '', '', 'ERROR']
+    if 'm_ed' in entry:
+        cells[3] = f"{entry['m_ed']:.1f}"
+    summary = entry['summary']
+    if summary is not None:
+        ratios = [summary['tension_utilisation_ratio']]
+        if summary['compression_utilisation_ratio'] is not None:
+            ratios.append(summary['compression_utilisation_ratio'])
+        cells[4:] = [summary['section_type'].split()[0], f"{summary['A_s_total']:.0f}",
+                     f"{summary['A_s_req']:.0f}", f"{max(ratios):.3f}", 'OK' if summary['passed'] else 'FAIL']
+    return cells
+
+
+def build_report(members, path, workers=None, title="Beam Schedule", chunk_size=32, figsize=(4, 4), dpi=100):
+    """Write a PDF report for (name, case) members to path.
+
+    case is (Material, Section, Reinforcement, Loads) or an error message for a
+    member whose input could not be read. workers=1 works in-process. Returns
+    the number of distinct section images embedded.
+    """
+    from fpdf import FPDF
+
+    members = list(members)
+    image_keys = [None if isinstance(case, str) else section_image_key(case[1], case[2]) for _, case in members]
+    unique_keys = list(dict.fromkeys(key for key in image_keys if key is not None))
+
+    member_chunks = _chunks(members, chunk_size)
+    key_chunks = _chunks(unique_keys, max(chunk_size // 4, 1))
+    if workers == 1:
+        entries = [entry for chunk in member_chunks for entry in _prepare_chunk(chunk)]
+        images = [image for chunk in key_chunks for image in _render_chunk(chunk, figsize, dpi)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # Submit the slower image renders first so they start straight away
+            image_futures = [pool.submit(_render_chunk, chunk, figsize, dpi) for chunk in key_chunks]
+            entry_futures = [pool.submit(_prepare_chunk, chunk) for chunk in member_chunks]
+            entries = [entry for future in entry_futures for entry in future.result()]
+            images = [image for future in image_futures for image in future.result()]
+    image_names = {key: f"section-{i}" for i, key in enumerate(unique_keys)}
+    images = dict(zip(unique_keys, images))
+
+    class ReportPDF(FPDF):
+        def footer(self):
+            self.set_y(-12)
+            self.set_font("Arial", size=8)
+            self.cell(0, 6, _latin1(f"{title} - page {self.page_no()} of {{nb}}"), align='C')
+
+    pdf = ReportPDF()
+    pdf.buffer = _DocumentBuffer()
+    pdf.alias_nb_pages()
+    pdf.set_auto_page_break(True, margin=15)
+
+    # Summary table, with the header repeated on every page
+    def table_header():
+        pdf.set_font("Arial", style='B', size=9)
+        for heading, width in REPORT_FIELDS:
+            pdf.cell(width, 6, heading, border=1, align='C')
+        pdf.ln()
+        pdf.set_font("Arial", size=8)
+
+    pdf.add_page()
+    pdf.set_font("Arial", style='B', size=14)
+    pdf.cell(0, 10, _latin1(title), ln=1)
+    failed = sum(1 for entry in entries if entry['summary'] is None or not entry['summary']['passed'])
+    pdf.set_font("Arial", size=10)
+    pdf.cell(0, 6, f"{len(entries)} members, {len(entries) - failed} passing, {failed} failing or in error", ln=1)
+    pdf.ln(2)
+    table_header()
+    for index, entry in enumerate(entries, 1):
+        if pdf.get_y() + 5 > pdf.page_break_trigger:
+            pdf.add_page()
+            table_header()
+        for text, (_, width) in zip(_summary_cells(index, entry), REPORT_FIELDS):
+            pdf.cell(width, 5, _latin1(text)[:28], border=1)
+        pdf.ln()
+
+    # One page per member
+    image_height = 70
+    for entry, key in zip(entries, image_keys):
+        pdf.add_page()
+        pdf.set_font("Arial", style='B', size=12)
+        pdf.cell(0, 8, _latin1(entry['name']), ln=1)
+        if key is not None:
+            width, height, _ = images[key]
+            w = image_height * width / height
+            add_section_image(pdf, image_names[key], images[key], (pdf.w - w) / 2, pdf.get_y() + 2, w, image_height)
+            pdf.set_y(pdf.get_y() + image_height + 6)
+        pdf.set_font("Arial", size=10)
+        if entry['error'] is not None:
+            pdf.multi_cell(0, 6, _latin1(f"Error: {entry['error']}"))
+            continue
+        for row in entry['rows']:
+            if isinstance(row, str):
+                pdf.set_font("Arial", style='B', size=10)
+                pdf.cell(0, 7, row, ln=1)
+                pdf.set_font("Arial", size=10)
+            else:
+                label, value, unit = row
+                pdf.cell(95, 5.5, _latin1(label))
+                pdf.cell(8, 5.5, "=", align='C')
+                if isinstance(value, str):
+                    pdf.cell(0, 5.5, _latin1(f"{value}{unit}"), ln=1)
+                else:
+                    pdf.cell(30, 5.5, _latin1(format_value(value)), align='R')
+                    pdf.cell(0, 5.5, _latin1(f"  {unit}"), ln=1)
+
+    pdf.output(path, 'F')
+    return len(unique_keys)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='RC_Beam_EC2.py report',
+                                     description='Write a PDF report for a schedule of beams in CSV or JSONL.')
+    parser.add_argument('input', nargs='?', default='-', help="input file, or '-' for stdin (default)")
+    parser.add_argument('-o', '--output', required=True, help='PDF file to write')
+    parser.add_argument('--input-format', choices=['csv', 'jsonl'], help='default: from the file extension, else csv')
+    parser.add_argument('--title', default='Beam Schedule', help='report title')
+    parser.add_argument('-j', '--workers', type=int, default=os.cpu_count() or 1,
+                        help='worker processes; 1 works in-process (default: CPU count)')
+    return parser
+
+
+def main(argv=None):
+    import io
+
+    from ec2_cli import detect_format, read_csv_rows, read_jsonl_rows
+    from ec2_design import case_from_record
+
+    args = build_parser().parse_args(argv)
+    input_format = args.input_format or detect_format(args.input, 'csv')
+    if args.input == '-':
+        input_stream = io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8-sig', newline='')
+        close_input = input_stream.detach  # Leave stdin itself open
+    else:
+        input_stream = open(args.input, encoding='utf-8-sig', newline='')
+        close_input = input_stream.close
+
+    members = []
+    try:
+        rows = read_csv_rows(input_stream) if input_format == 'csv' else read_jsonl_rows(input_stream)
+        for line, record in rows:
+            if isinstance(record, str):
+                members.append((f"Line {line}", record))
+                continue
+            name = record.get('id') or f"Line {line}"
+            try:
+                members.append((name, case_from_record(record)))
+            except Exception as e:
+                members.append((name, str(e)))
+    finally:
+        close_input()
+
+    images = build_report(members, args.output, workers=args.workers, title=args.title)
+    print(f"{args.output}: {len(members)} members, {images} section images", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,345 @@
+"""Analytic sensitivities of the EC2 bending check.
+
+Exact first derivatives of d_eff, dc_eff, K, z_m, A_s_req, A_sc_req and the
+utilisation ratios with respect to every numeric input of the check, by the
+chain rule through the same branches as ec2_design.check_bending: singly or
+doubly reinforced, the 0.95d cap on the lever arm and the A_s_min/A_s_max
+clamps. The stress block constants come from the ec2_materials lookup, whose
+linear interpolation in f_ck is differentiated as such. On a branch or clamp
+boundary the derivative is the one of the branch the check itself takes.
+
+    sensitivity = bending_sensitivity(material, section, reinforcement, loads)
+    sensitivity.derivative('tension_utilisation_ratio', 'h')   # per mm
+
+The inputs are those of ec2_batch.design_bending_batch: c_nom stands for the
+minimum cover and the cover deviation alike, M_Ed is in kNm, and A_s_total /
+A_sc_total scale every bar layer of a face together, which leaves the layer
+centroid and so d_eff unchanged. required_changes() uses the derivatives for
+Newton steps on a single input at a time, to find the value that brings the
+governing utilisation ratio to 1.0 in a handful of evaluations.
+"""
+import dataclasses
+import math
+from dataclasses import dataclass
+from typing import Dict
+
+import numpy as np
+
+from ec2_batch import BendingBatchResult, design_bending_batch, layer_arrays
+from ec2_design import BendingResult, check_bending, section_geometry
+from ec2_materials import concrete_arrays
+
+INPUTS = ('b', 'h', 'f_ck', 'f_yk', 'gamma_s', 'c_nom', 'd_w', 'rdp', 'M_Ed', 'A_s_total', 'A_sc_total')
+OUTPUTS = ('d_eff', 'dc_eff', 'K', 'z_m', 'A_s_req', 'A_sc_req', 'tension_utilisation_ratio',
+           'compression_utilisation_ratio')
+
+# Inputs a designer would change to make a section pass, with their units
+WHAT_IF_INPUTS = {'h': 'mm', 'b': 'mm', 'f_ck': 'MPa', 'f_yk': 'MPa', 'c_nom': 'mm', 'M_Ed': 'kNm',
+                  'A_s_total': 'mm²', 'A_sc_total': 'mm²'}
+
+
+def _input_index(name):
+    if name not in INPUTS:
+        raise ValueError(f"Unknown input {name!r}; expected one of {', '.join(INPUTS)}")
+    return INPUTS.index(name)
+
+
+def _output_name(name):
+    if name not in OUTPUTS:
+        raise ValueError(f"Unknown output {name!r}; expected one of {', '.join(OUTPUTS)}")
+    return name
+
+
+def bending_gradients(b, h, f_ck, f_yk, gamma_s, c_nom, d_w, rdp, M_Ed, A_s_total, A_sc_total, d_eff, dc_eff):
+    """Gradients of OUTPUTS with respect to INPUTS, one (n, len(INPUTS)) array per output.
+
+    All arguments are arrays of length n; d_eff and dc_eff are those of the section
+    geometry. Each quantity is recomputed with the operations of design_bending_batch,
+    so the branch and clamp masks are exactly the ones of the check.
+    """
+    n = len(b)
+
+    def unit(name, scale=1.0):
+        gradient = np.zeros((n, len(INPUTS)))
+        gradient[:, INPUTS.index(name)] = scale
+        return gradient
+
+    def col(values):
+        return values[:, None]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        dd = unit('h') - unit('c_nom') - unit('d_w')
+        ddc = unit('c_nom') + unit('d_w')
+        db, dh, df = unit('b'), unit('h'), unit('f_ck')
+
+        f_yd = f_yk / gamma_s
+        df_yd = unit('f_yk') / col(gamma_s) - unit('gamma_s') * col(f_yd / gamma_s)
+
+        # Stress block constants of the Table 3.1 lookup, with their slopes in f_ck
+        concrete = concrete_arrays(f_ck)
+        scale, lam, k2 = concrete.block_scale, concrete.lambda_block, concrete.k2
+        mr = 1 - (rdp / 100)
+        xi = (mr - 0.4) / k2
+        K_bal = 0.453 * scale * xi * (1 - 0.5 * lam * xi)
+        dxi = unit('rdp') * col(-0.01 / k2) - df * col(xi * concrete.slope('k2') / k2)
+        dK_bal = (col(0.453 * scale * (1 - lam * xi)) * dxi
+                  + df * col(0.453 * xi * (concrete.slope('block_scale') * (1 - 0.5 * lam * xi)
+                                           - scale * 0.5 * concrete.slope('lambda_block') * xi)))
+
+        M = M_Ed * 1e6
+        dM = unit('M_Ed', 1e6)
+        bd2f = b * (d_eff * d_eff) * f_ck
+        K = M / bd2f
+        # Derivative of b d² f_ck, shared by K and the doubly reinforced areas
+        dbd2f = col(d_eff * d_eff * f_ck) * db + col(2 * b * d_eff * f_ck) * dd + col(b * d_eff * d_eff) * df
+        dK = (dM - col(K) * dbd2f) / col(bd2f)
+        singly = K <= K_bal
+
+        # Singly reinforced: z = (0.5 + sqrt(0.25 - c K)) d, capped at 0.95 d
+        lever = concrete.lever_coefficient
+        root = 0.25 - lever * K
+        s = np.sqrt(np.maximum(root, 0.0))
+        capped = (root < 0) | ((0.5 + s) * d_eff >= 0.95 * d_eff)
+        droot = -(col(lever) * dK + df * col(K * concrete.slope('lever_coefficient')))
+        dz_singly = np.where(col(capped), 0.95 * dd, col(0.5 + s) * dd + col(d_eff / (2 * s)) * droot)
+        z_singly = np.where(root < 0, 0.95 * d_eff, np.minimum((0.5 + s) * d_eff, 0.95 * d_eff))
+        A_lever = M / (z_singly * f_yd)
+        dA_lever = (dM - col(A_lever) * (col(f_yd) * dz_singly + col(z_singly) * df_yd)) / col(z_singly * f_yd)
+        A_floor = 0.001572 * b * d_eff
+        dA_floor = 0.001572 * (col(d_eff) * db + col(b) * dd)
+        dA_s_singly = np.where(col(A_floor > A_lever), dA_floor, dA_lever)
+
+        # Doubly reinforced: A_sc = (K - K_bal) f_ck b d² / (f_yd (d - dc)), z = z_doubly d
+        numerator = (K - K_bal) * f_ck * b * (d_eff * d_eff)
+        dnumerator = (dK - dK_bal) * col(bd2f) + col(K - K_bal) * dbd2f
+        denominator = f_yd * (d_eff - dc_eff)
+        ddenominator = col(d_eff - dc_eff) * df_yd + col(f_yd) * (dd - ddc)
+        A_sc_doubly = numerator / denominator
+        dA_sc_doubly = (dnumerator - col(A_sc_doubly) * ddenominator) / col(denominator)
+        z_doubly = d_eff * concrete.z_doubly
+        dz_doubly = col(concrete.z_doubly) * dd + df * col(d_eff * concrete.slope('z_doubly'))
+        A_bal = (K_bal * f_ck * b * (d_eff * d_eff)) / (z_doubly * f_yd)
+        dA_bal = ((dK_bal * col(bd2f) + col(K_bal) * dbd2f)
+                  - col(A_bal) * (col(f_yd) * dz_doubly + col(z_doubly) * df_yd)) / col(z_doubly * f_yd)
+        dA_s_doubly = dA_bal + dA_sc_doubly
+
+        z_m = np.where(singly, z_singly, z_doubly)
+        dz_m = np.where(col(singly), dz_singly, dz_doubly)
+        dA_sc_req = np.where(col(singly), 0.0, dA_sc_doubly)
+        A_sc_req = np.where(singly, 0.0, A_sc_doubly)
+        A_s_req = np.where(singly, np.maximum(A_lever, A_floor), A_bal + A_sc_doubly)
+        dA_s_req = np.where(col(singly), dA_s_singly, dA_s_doubly)
+
+        # Minimum and maximum reinforcement clamps
+        A_s_min = 0.001572 * b * d_eff
+        A_s_max = 0.04 * b * h
+        below = A_s_min > A_s_req
+        A_s_req = np.maximum(A_s_req, A_s_min)
+        dA_s_req = np.where(col(below), dA_floor, dA_s_req)
+        above = A_s_max < A_s_req
+        dA_s_req = np.where(col(above), 0.04 * (col(h) * db + col(b) * dh), dA_s_req)
+        A_s_req = np.minimum(A_s_req, A_s_max)
+
+        tension = A_s_req / A_s_total
+        dtension = (dA_s_req - col(tension) * unit('A_s_total')) / col(A_s_total)
+        compression = A_sc_req / A_sc_total
+        dcompression = np.where(col(A_sc_total > 0),
+                                (dA_sc_req - col(compression) * unit('A_sc_total')) / col(A_sc_total), np.nan)
+
+    gradients = {
+        'd_eff': dd,
+        'dc_eff': ddc,
+        'K': dK,
+        'z_m': dz_m,
+        'A_s_req': dA_s_req,
+        'A_sc_req': dA_sc_req,
+        'tension_utilisation_ratio': dtension,
+        'compression_utilisation_ratio': dcompression,
+    }
+    invalid = ~(A_s_total > 0)
+    if invalid.any():
+        for name, gradient in gradients.items():
+            if name not in ('d_eff', 'dc_eff'):
+                gradient[invalid] = np.nan
+    return gradients
+
+
+@dataclass
+class BendingSensitivityBatch:
+    result: BendingBatchResult
+    gradients: Dict[str, np.ndarray]  # output -> (n, len(INPUTS)), NaN where the output is undefined
+
+    def __len__(self):
+        return len(self.result)
+
+    def derivative(self, output, input):
+        return self.gradients[_output_name(output)][:, _input_index(input)]
+
+
+def bending_sensitivity_batch(b, h, f_ck, f_yk, c_nom, d_w, tension_diameters, tension_counts,
+                              M_Ed, rdp=15.0, compression_diameters=None, compression_counts=None,
+                              gamma_s=1.15):
+    """design_bending_batch together with the gradients of its outputs; same arguments."""
+    result = design_bending_batch(b, h, f_ck, f_yk, c_nom, d_w, tension_diameters, tension_counts, M_Ed, rdp,
+                                  compression_diameters, compression_counts, gamma_s)
+    n = len(result)
+    b, h, f_ck, f_yk, c_nom, d_w, M_Ed, rdp, gamma_s = (
+        np.broadcast_to(np.asarray(v, dtype=float), (n,))
+        for v in (b, h, f_ck, f_yk, c_nom, d_w, M_Ed, rdp, gamma_s))
+    # The batch result holds NaN for d_eff of invalid rows; the geometry itself is still defined
+    d_eff = np.where(result.valid, result.d_eff, h - c_nom - d_w)
+    gradients = bending_gradients(b, h, f_ck, f_yk, gamma_s, c_nom, d_w, rdp, M_Ed,
+                                  result.A_s_total, result.A_sc_total, d_eff, result.dc_eff)
+    return BendingSensitivityBatch(result, gradients)
+
+
+def bending_sensitivity_cases(cases):
+    """Batch sensitivities of (Material, Section, Reinforcement, Loads) tuples."""
+    materials, sections, reinforcements, loads = zip(*cases) if cases else ((), (), (), ())
+    tension_diameters, tension_counts = layer_arrays([r.tension for r in reinforcements])
+    compression_diameters, compression_counts = layer_arrays([r.compression for r in reinforcements])
+    return bending_sensitivity_batch(
+        b=[s.b for s in sections],
+        h=[s.h for s in sections],
+        f_ck=[m.f_ck for m in materials],
+        f_yk=[m.f_yk_main for m in materials],
+        c_nom=[s.c_nom for s in sections],
+        d_w=[s.d_w for s in sections],
+        tension_diameters=tension_diameters,
+        tension_counts=tension_counts,
+        M_Ed=[l.uls_m_ed for l in loads],
+        rdp=[s.rdp for s in sections],
+        compression_diameters=compression_diameters,
+        compression_counts=compression_counts,
+        gamma_s=[m.gamma_s for m in materials],
+    )
+
+
+@dataclass(frozen=True)
+class BendingSensitivity:
+    result: BendingResult
+    derivatives: Dict[str, Dict[str, float]]  # output -> input -> derivative
+
+    def derivative(self, output, input):
+        _input_index(input)
+        return self.derivatives[_output_name(output)][input]
+
+    @property
+    def governing(self):
+        # The utilisation ratio that decides the check; compression only counts when steel is provided
+        compression = self.result.compression_utilisation_ratio
+        if compression is not None and compression > self.result.tension_utilisation_ratio:
+            return 'compression_utilisation_ratio'
+        return 'tension_utilisation_ratio'
+
+    @property
+    def utilisation(self):
+        return getattr(self.result, self.governing)
+
+
+def check_bending_sensitivity(material, section, geometry, loads):
+    result = check_bending(material, section, geometry, loads)
+    gradients = bending_gradients(*(np.array([float(v)]) for v in (
+        section.b, section.h, material.f_ck, material.f_yk_main, material.gamma_s, section.c_nom, section.d_w,
+        section.rdp, loads.uls_m_ed, geometry.A_s_total, geometry.A_sc_total, geometry.d_eff, geometry.dc_eff)))
+    derivatives = {}
+    for output, gradient in gradients.items():
+        if output == 'compression_utilisation_ratio' and result.compression_utilisation_ratio is None:
+            derivatives[output] = None
+            continue
+        derivatives[output] = dict(zip(INPUTS, gradient[0].tolist()))
+    return BendingSensitivity(result, derivatives)
+
+
+def bending_sensitivity(material, section, reinforcement, loads):
+    return check_bending_sensitivity(material, section, section_geometry(section, reinforcement), loads)
+
+
+def _with_input(material, section, geometry, loads, input, value):
+    # The case with one input replaced; cover changes go to the minimum cover
+    if input in ('b', 'h', 'd_w', 'rdp', 'c_nom'):
+        if input == 'c_nom':
+            section = dataclasses.replace(section, min_cover=value - section.cover_dev)
+        else:
+            section = dataclasses.replace(section, **{input: value})
+        # The layer centroids stay put; d_eff and dc_eff move with h, the cover and the links
+        geometry = dataclasses.replace(geometry, d_eff=section.h - section.c_nom - section.d_w - geometry.y_t,
+                                       dc_eff=section.c_nom + section.d_w + geometry.y_c)
+    elif input in ('f_ck', 'gamma_s'):
+        material = dataclasses.replace(material, **{input: value})
+    elif input == 'f_yk':
+        material = dataclasses.replace(material, f_yk_main=value)
+    elif input == 'M_Ed':
+        loads = dataclasses.replace(loads, uls_m_ed=value)
+    else:
+        geometry = dataclasses.replace(geometry, **{input: value})
+    return material, section, geometry, loads
+
+
+def _input_value(material, section, geometry, loads, input):
+    if input in ('f_ck', 'gamma_s'):
+        return getattr(material, input)
+    if input == 'f_yk':
+        return material.f_yk_main
+    if input == 'M_Ed':
+        return loads.uls_m_ed
+    if input in ('A_s_total', 'A_sc_total'):
+        return getattr(geometry, input)
+    if input == 'c_nom':
+        return section.c_nom
+    return getattr(section, input)
+
+
+def required_change(material, section, geometry, loads, input, target=1.0, tolerance=1e-9, max_iterations=30):
+    """Value of one input that brings the governing utilisation ratio to target, or None.
+
+    Newton steps with the analytic derivative, every step re-checked with the exact
+    scalar check. None when the ratio does not respond to the input (for example when
+    A_s_req sits on the A_s_min clamp) or the step leaves the positive range.
+    """
+    _input_index(input)
+    value = _input_value(material, section, geometry, loads, input)
+    for _ in range(max_iterations):
+        sensitivity = check_bending_sensitivity(*_with_input(material, section, geometry, loads, input, value))
+        error = sensitivity.utilisation - target
+        if abs(error) <= tolerance * max(target, 1.0):
+            return value
+        slope = sensitivity.derivative(sensitivity.governing, input)
+        if not slope or not math.isfinite(slope):
+            return None
+        value -= error / slope
+        if not value > 0:
+            return None
+    return None
+
+
+def required_changes(material, section, reinforcement, loads, target=1.0, inputs=tuple(WHAT_IF_INPUTS)):
+    """required_change for each input in turn: input -> (current value, required value or None)."""
+    geometry = section_geometry(section, reinforcement)
+    changes = {}
+    for input in inputs:
+        current = _input_value(material, section, geometry, loads, input)
+        if input == 'A_sc_total' and not geometry.A_sc_total > 0:
+            changes[input] = (current, None)  # Compression steel has to be provided before it can be scaled
+            continue
+        changes[input] = (current, required_change(material, section, geometry, loads, input, target))
+    return changes
+
+
+def format_what_if(sensitivity, changes, target=1.0):
+    # Plain-text table of required_changes with the governing ratio's derivatives
+    ratio = sensitivity.governing.replace('_', ' ')
+    lines = [f"Governing {ratio}: {sensitivity.utilisation:.3f} (target {target:g})", "",
+             f"{'input':<12} {'current':>12} {'for target':>12} {'change':>10} {'d ratio / d input':>20}"]
+    for input, (current, required) in changes.items():
+        unit = WHAT_IF_INPUTS.get(input, '')
+        slope = sensitivity.derivative(sensitivity.governing, input)
+        if required is None:
+            lines.append(f"{input:<12} {current:>12.3f} {'-':>12} {'-':>10} {slope:>20.3e}")
+        else:
+            lines.append(f"{input:<12} {current:>12.3f} {required:>12.3f} {required - current:>+10.3f} "
+                         f"{slope:>20.3e}  {unit}")
+    lines.append("")
+    lines.append("Each row changes one input with the others held; '-' where that input alone cannot reach the "
+                 "target.")
+    return "\n".join(lines)
@@ -0,0 +1,351 @@
+"""Local HTTP/JSON design service for other tools.
+
+An asyncio server on the loopback interface, with no dependencies beyond the
+standard library and NumPy:
+
+    POST /check     one case record, a list of them, or {"cases": [...]}, with
+                    the fields of the batch runner (ec2_cli); ?engine=fibre for
+                    the strain-compatibility resistance. Answers one result
+                    record per case, as the batch runner writes them.
+    GET  /health    liveness and the current queue depth
+    GET  /metrics   request counts, latency percentiles, queue depth and batch sizes
+
+Cases from concurrent requests are micro-batched: the first case to arrive
+opens a batch window of --batch-window ms (or until --max-batch cases are
+queued), and the whole batch is checked as one NumPy evaluation in a worker
+process, so the event loop only parses and answers requests. At most two
+batches per worker are in flight. Backpressure: when more than --max-queue
+cases are waiting a request is refused with 503 and Retry-After, and bodies
+over --max-body bytes with 413.
+
+    python RC_Beam_EC2.py serve --port 8765 -j 4
+    curl -d '{"concrete_class": "C30/37", "b": 300, "h": 500, "m_ed": 200, "t1_d": 20, "t1_n": 4}' \\
+        localhost:8765/check
+"""
+import argparse
+import asyncio
+import ipaddress
+import json
+import multiprocessing
+import os
+import socket
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+from ec2_cli import check_chunk_fibre
+from ec2_design import ENGINE_VERSION, case_from_record
+
+ENGINES = ('simplified', 'fibre')
+LATENCY_WINDOW = 10_000  # Requests kept for the latency percentiles
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           413: 'Payload Too Large', 503: 'Service Unavailable'}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message, headers=None):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or {}
+
+
+def check_batch(rows, engine='simplified'):
+    """Result records of (line, record) rows, checked as one vectorized batch."""
+    if engine == 'fibre':
+        return check_chunk_fibre(rows)
+    from ec2_batch import design_bending_cases
+
+    results, cases, checked = [], [], []
+    for line, record in rows:
+        output = {'line': line, 'id': record.get('id'), 'status': 'error', 'error': None}
+        results.append(output)
+        try:
+            cases.append(case_from_record(record))
+        except Exception as e:
+            output['error'] = str(e)
+            continue
+        checked.append(output)
+    if cases:
+        for output, summary in zip(checked, design_bending_cases(cases).summaries()):
+            if summary is None:
+                output['error'] = ("Total tension reinforcement area is zero. "
+                                   "Please provide valid tension reinforcement data.")
+                continue
+            output['status'] = 'ok'
+            output.update(summary)
+    return results
+
+
+def _watch_server(pid):
+    # Worker initializer: exit when the server is gone, even when it was killed outright
+    def watch():
+        while True:
+            time.sleep(1)
+            try:
+                os.kill(pid, 0)
+            except ProcessLookupError:
+                os._exit(0)
+
+    threading.Thread(target=watch, daemon=True).start()
+
+
+def _percentile(ordered, fraction):
+    if not ordered:
+        return None
+    return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)]
+
+
+class DesignService:
+    def __init__(self, workers=1, batch_window=0.002, max_batch=4096, max_queue=50_000, max_body=4 << 20):
+        self.workers = max(workers, 1)
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.max_queue = max_queue
+        self.max_body = max_body
+        self.pool = None
+        self.queues = {engine: deque() for engine in ENGINES}  # (rows, future) per request
+        self.queued = 0  # Cases waiting for a batch
+        self.wakeup = None
+        self.in_flight = None
+        self.started = time.time()
+        self.requests = 0
+        self.responses = {}
+        self.cases = 0
+        self.batches = 0
+        self.batch_cases = 0
+        self.largest_batch = 0
+        self.rejected = 0
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+
+    async def start(self, host='127.0.0.1', port=8765):
+        if not ipaddress.ip_address(socket.gethostbyname(host)).is_loopback:
+            raise ValueError(f"Please provide a loopback host; {host!r} would expose the service.")
+        # Forked workers would inherit the listening and client sockets and keep them open;
+        # the forkserver starts them from a clean process instead
+        self.pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context('forkserver'),
+                                        initializer=_watch_server, initargs=(os.getpid(),))
+        self.wakeup = asyncio.Event()
+        self.in_flight = asyncio.Semaphore(self.workers * 2)
+        self.batcher = asyncio.create_task(self._batch_loop())
+        self.server = await asyncio.start_server(self._handle_connection, host, port)
+        return self.server
+
+    async def close(self):
+        self.server.close()
+        await self.server.wait_closed()
+        self.batcher.cancel()
+        self.pool.shutdown(cancel_futures=True)
+
+    # Batching
+
+    async def submit(self, rows, engine):
+        if self.queued + len(rows) > self.max_queue:
+            self.rejected += 1
+            raise HTTPError(503, f"Queue full ({self.queued} cases waiting); retry shortly.", {'Retry-After': '1'})
+        future = asyncio.get_running_loop().create_future()
+        self.queues[engine].append((rows, future))
+        self.queued += len(rows)
+        self.wakeup.set()
+        return await future
+
+    def _take(self, engine):
+        # Whole requests up to max_batch cases; a larger request makes a batch of its own
+        queue = self.queues[engine]
+        requests, size = [], 0
+        while queue and (not requests or size + len(queue[0][0]) <= self.max_batch):
+            rows, future = queue.popleft()
+            requests.append((rows, future))
+            size += len(rows)
+        self.queued -= size
+        return requests, size
+
+    async def _batch_loop(self):
+        while True:
+            await self.wakeup.wait()
+            self.wakeup.clear()
+            if self.queued < self.max_batch:
+                await asyncio.sleep(self.batch_window)  # Let concurrent requests join the batch
+            for engine in ENGINES:
+                while self.queues[engine]:
+                    await self.in_flight.acquire()
+                    requests, size = self._take(engine)
+                    asyncio.create_task(self._run_batch(engine, requests, size))
+
+    async def _run_batch(self, engine, requests, size):
+        try:
+            rows = [row for request_rows, _ in requests for row in request_rows]
+            self.batches += 1
+            self.batch_cases += size
+            self.largest_batch = max(self.largest_batch, size)
+            try:
+                results = await asyncio.get_running_loop().run_in_executor(self.pool, check_batch, rows, engine)
+            except Exception as e:
+                for _, future in requests:
+                    if not future.done():
+                        future.set_exception(e)
+                return
+            start = 0
+            for request_rows, future in requests:
+                if not future.done():
+                    future.set_result(results[start:start + len(request_rows)])
+                start += len(request_rows)
+        finally:
+            self.in_flight.release()
+
+    # HTTP
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader)
+                except HTTPError as e:
+                    await self._respond(writer, e.status, {'error': str(e)}, e.headers, keep_alive=False)
+                    break
+                if request is None:
+                    break
+                method, target, headers, body = request
+                start = time.perf_counter()
+                self.requests += 1
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                try:
+                    status, payload, extra = 200, await self._route(method, target, body), {}
+                except HTTPError as e:
+                    status, payload, extra = e.status, {'error': str(e)}, e.headers
+                self.responses[status] = self.responses.get(status, 0) + 1
+                self.latencies.append(time.perf_counter() - start)
+                await self._respond(writer, status, payload, extra, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader):
+        line = await reader.readline()
+        if not line:
+            return None
+        try:
+            method, target, _ = line.decode('latin-1').split(' ', 2)
+        except ValueError:
+            raise HTTPError(400, "Malformed request line.")
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        try:
+            length = int(headers.get('content-length', 0))
+        except ValueError:
+            raise HTTPError(400, "Invalid Content-Length.")
+        if length > self.max_body:
+            raise HTTPError(413, f"Request body over {self.max_body} bytes.")
+        body = await reader.readexactly(length) if length else b''
+        return method.upper(), target, headers, body
+
+    async def _respond(self, writer, status, payload, headers=None, keep_alive=True):
+        body = json.dumps(payload).encode()
+        lines = [f"HTTP/1.1 {status} {REASONS.get(status, '')}", "Content-Type: application/json",
+                 f"Content-Length: {len(body)}", f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+        lines.extend(f"{name}: {value}" for name, value in (headers or {}).items())
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode('latin-1') + body)
+        await writer.drain()
+
+    async def _route(self, method, target, body):
+        url = urlsplit(target)
+        if url.path == '/check':
+            if method != 'POST':
+                raise HTTPError(405, "Use POST for /check.")
+            engine = parse_qs(url.query).get('engine', ['simplified'])[0]
+            if engine not in ENGINES:
+                raise HTTPError(400, f"Unknown engine {engine!r}; expected one of {', '.join(ENGINES)}.")
+            return await self.check(body, engine)
+        if method != 'GET':
+            raise HTTPError(405, f"Use GET for {url.path}.")
+        if url.path == '/health':
+            return {'status': 'ok', 'engine_version': ENGINE_VERSION, 'queue_depth': self.queued,
+                    'uptime_s': time.time() - self.started}
+        if url.path == '/metrics':
+            return self.metrics()
+        raise HTTPError(404, f"No endpoint {url.path}.")
+
+    async def check(self, body, engine='simplified'):
+        try:
+            payload = json.loads(body or b'null')
+        except ValueError as e:
+            raise HTTPError(400, f"Invalid JSON: {e}")
+        single = isinstance(payload, dict) and 'cases' not in payload
+        records = [payload] if single else payload.get('cases') if isinstance(payload, dict) else payload
+        if not isinstance(records, list) or not records or not all(isinstance(r, dict) for r in records):
+            raise HTTPError(400, "Please provide a case object, a list of them, or {\"cases\": [...]}.")
+        results = await self.submit(list(enumerate(records, 1)), engine)
+        self.cases += len(records)
+        for result in results:
+            result.pop('line', None)
+        return results[0] if single else {'results': results}
+
+    def metrics(self):
+        ordered = sorted(self.latencies)
+        return {
+            'uptime_s': time.time() - self.started,
+            'workers': self.workers,
+            'requests': self.requests,
+            'responses': {str(status): n for status, n in sorted(self.responses.items())},
+            'rejected': self.rejected,
+            'cases': self.cases,
+            'queue_depth': self.queued,
+            'batches': self.batches,
+            'mean_batch': self.batch_cases / self.batches if self.batches else 0.0,
+            'largest_batch': self.largest_batch,
+            'latency_ms': {name: None if value is None else value * 1e3 for name, value in (
+                ('p50', _percentile(ordered, 0.5)), ('p90', _percentile(ordered, 0.9)),
+                ('p99', _percentile(ordered, 0.99)), ('max', ordered[-1] if ordered else None))},
+        }
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='RC_Beam_EC2.py serve',
+                                     description='Serve EC2 bending checks as JSON over HTTP on localhost.')
+    parser.add_argument('--host', default='127.0.0.1', help='loopback address to bind (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8765, help='port (default: 8765)')
+    parser.add_argument('-j', '--workers', type=int, default=os.cpu_count() or 1,
+                        help='worker processes (default: CPU count)')
+    parser.add_argument('--batch-window', type=float, default=2.0,
+                        help='ms to wait for more cases before checking a batch (default: 2)')
+    parser.add_argument('--max-batch', type=int, default=4096, help='cases per batch (default: 4096)')
+    parser.add_argument('--max-queue', type=int, default=50_000,
+                        help='waiting cases before requests are refused with 503 (default: 50000)')
+    parser.add_argument('--max-body', type=int, default=4 << 20, help='largest request body in bytes (default: 4 MiB)')
+    return parser
+
+
+async def serve(args):
+    service = DesignService(args.workers, args.batch_window / 1e3, args.max_batch, args.max_queue, args.max_body)
+    server = await service.start(args.host, args.port)
+    print(f"Serving on http://{args.host}:{server.sockets[0].getsockname()[1]}", file=sys.stderr)
+    try:
+        await server.serve_forever()
+    finally:
+        await service.close()
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,277 @@
+"""EC2 6.2 shear design of rectangular RC beams with vertical links.
+
+The concrete resistance V_Rd,c (6.2.2), the link resistance V_Rd,s and the strut
+crushing limit V_Rd,max (6.2.3) use the variable strut inclination method:
+cot θ is taken as large as the strut allows, between 1 and 2.5, for the larger
+of V_Ed and the shear at the support face V_Ef, and the links are designed for
+V_Ed with that θ.
+Minimum links follow 9.2.2 (ρ_w,min = 0.08 √f_ck / f_yk, s_l,max = 0.75 d).
+
+shear_design_batch evaluates arrays of sections or stations at once;
+check_shear runs one section through the same code. shear_along_span takes a
+shear force diagram sampled at many stations (or one row per load case, which
+is enveloped) and returns the link spacing needed at each station and the
+zones along the span where the spacing can change.
+
+Shear forces are in kN, lengths in mm and link areas in mm².
+"""
+import math
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import numpy as np
+
+from ec2_design import section_geometry
+
+# Practical link spacings are multiples of this
+SPACING_STEP = 25.0
+
+COT_THETA_MIN = 1.0
+COT_THETA_MAX = 2.5
+
+
+@dataclass
+class ShearBatchResult:
+    V_Ed: np.ndarray  # kN, magnitude
+    V_Ef: np.ndarray
+    z: np.ndarray  # Lever arm 0.9 d
+    V_Rd_c: np.ndarray  # kN, members without shear reinforcement
+    cot_theta: np.ndarray
+    V_Rd_max: np.ndarray  # kN, strut crushing at the chosen θ
+    V_Rd_max_45: np.ndarray  # kN, strut crushing at θ = 45°, the largest it can be
+    A_sw_s_min: np.ndarray  # mm²/mm
+    A_sw_s_req: np.ndarray  # mm²/mm, at least the minimum
+    s_max: np.ndarray  # Largest longitudinal link spacing, mm
+    s_req: np.ndarray  # Largest spacing of the given links that works, NaN without links
+    V_Rd_s: np.ndarray  # kN, from the given links at the given spacing
+    link_utilisation: np.ndarray  # A_sw/s required / provided, inf without links
+    strut_utilisation: np.ndarray  # max(V_Ed, V_Ef) / V_Rd,max at θ = 45°
+
+    def __len__(self):
+        return len(self.V_Ed)
+
+    @property
+    def concrete_only(self):
+        # Where the concrete carries V_Ed and only minimum links are needed
+        return self.V_Ed <= self.V_Rd_c
+
+    @property
+    def passed(self):
+        # On the inclined range θ makes V_Rd,max equal the strut demand; allow for rounding
+        return ((self.strut_utilisation <= 1) & (self.link_utilisation <= 1)
+                & (self.V_Ed <= self.V_Rd_max * (1 + 1e-9)))
+
+    def result(self, i):
+        s_req = float(self.s_req[i])
+        return ShearResult(
+            V_Ed=float(self.V_Ed[i]),
+            V_Ef=float(self.V_Ef[i]),
+            z=float(self.z[i]),
+            V_Rd_c=float(self.V_Rd_c[i]),
+            cot_theta=float(self.cot_theta[i]),
+            V_Rd_max=float(self.V_Rd_max[i]),
+            V_Rd_max_45=float(self.V_Rd_max_45[i]),
+            A_sw_s_min=float(self.A_sw_s_min[i]),
+            A_sw_s_req=float(self.A_sw_s_req[i]),
+            s_max=float(self.s_max[i]),
+            s_req=None if math.isnan(s_req) else s_req,
+            V_Rd_s=float(self.V_Rd_s[i]),
+            link_utilisation=float(self.link_utilisation[i]),
+            strut_utilisation=float(self.strut_utilisation[i]),
+        )
+
+
+def link_area(diameter, legs):
+    return math.pi * (diameter * diameter) * 0.25 * legs
+
+
+def concrete_shear_resistance(b, d, A_sl, f_ck, gamma_c=1.5):
+    # V_Rd,c in kN of a member without shear reinforcement (6.2.2)
+    k = np.minimum(1 + np.sqrt(200 / d), 2.0)
+    rho_l = np.minimum(A_sl / (b * d), 0.02)
+    v_min = 0.035 * k ** 1.5 * np.sqrt(f_ck)
+    v_Rd_c = np.maximum(0.18 / gamma_c * k * np.cbrt(100 * rho_l * f_ck), v_min)
+    return v_Rd_c * b * d / 1e3
+
+
+def strut_capacity(b, z, f_ck, f_cd):
+    # b z ν1 f_cd in kN, so that V_Rd,max = strut_capacity / (cot θ + tan θ) (6.9)
+    nu_1 = 0.6 * (1 - f_ck / 250)
+    return b * z * nu_1 * f_cd / 1e3
+
+
+def strut_cot_theta(ratio):
+    # Largest cot θ in [1, 2.5] with ratio (cot θ + tan θ) <= 1, i.e. the flattest strut
+    # that a demand of ratio times the strut capacity does not crush (cot θ = 1 beyond)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # ratio = sin θ cos θ, so sin 2θ = 2 ratio
+        theta = 0.5 * np.arcsin(np.minimum(2 * ratio, 1.0))
+        return np.clip(1 / np.tan(theta), COT_THETA_MIN, COT_THETA_MAX)
+
+
+def minimum_links(f_ck, f_ywk, b):
+    # A_sw/s in mm²/mm for ρ_w,min of 9.2.2 with vertical links
+    return 0.08 * np.sqrt(f_ck) / f_ywk * b
+
+
+def shear_design_batch(V_Ed, b, d, A_sl, f_ck, f_ywk, A_sw=0.0, s=None, V_Ef=None,
+                       alpha_cc=0.85, gamma_c=1.5, gamma_s=1.15):
+    """Shear check of n sections or stations; scalar inputs are broadcast.
+
+    A_sl is the anchored tension steel for ρ_l, A_sw the area of all legs of one
+    set of links and s their spacing (s_req is still found when s is None).
+    V_Ef defaults to V_Ed.
+    """
+    V_Ed = np.abs(np.atleast_1d(np.asarray(V_Ed, dtype=float)))
+    n = len(V_Ed)
+    V_Ef = V_Ed if V_Ef is None else np.abs(np.broadcast_to(np.asarray(V_Ef, dtype=float), (n,)))
+    b, d, A_sl, f_ck, f_ywk, A_sw, alpha_cc, gamma_c, gamma_s = (
+        np.broadcast_to(np.asarray(v, dtype=float), (n,))
+        for v in (b, d, A_sl, f_ck, f_ywk, A_sw, alpha_cc, gamma_c, gamma_s))
+    s = np.full(n, np.nan) if s is None else np.broadcast_to(np.asarray(s, dtype=float), (n,))
+    f_cd = alpha_cc * f_ck / gamma_c
+    f_ywd = f_ywk / gamma_s
+    z = 0.9 * d
+
+    V_Rd_c = concrete_shear_resistance(b, d, A_sl, f_ck, gamma_c)
+
+    # 6.2.3: flattest strut that neither V_Ed nor V_Ef crushes
+    strut = strut_capacity(b, z, f_ck, f_cd)
+    V_Rd_max_45 = strut / 2
+    V_strut = np.maximum(V_Ed, V_Ef)
+    cot_theta = strut_cot_theta(V_strut / strut)
+    V_Rd_max = strut / (cot_theta + 1 / cot_theta)
+
+    # Links for V_Ed at that θ, and never less than the minimum of 9.2.2
+    A_sw_s_min = minimum_links(f_ck, f_ywk, b)
+    A_sw_s_req = np.where(V_Ed <= V_Rd_c, A_sw_s_min,
+                          np.maximum(V_Ed * 1e3 / (z * f_ywd * cot_theta), A_sw_s_min))
+    s_max = 0.75 * d
+    with np.errstate(divide='ignore', invalid='ignore'):
+        s_req = np.where(A_sw > 0, np.minimum(A_sw / A_sw_s_req, s_max), np.nan)
+        A_sw_s = A_sw / s
+        link_utilisation = np.where(A_sw > 0, np.maximum(A_sw_s_req / A_sw_s, s / s_max), np.inf)
+    V_Rd_s = np.where(A_sw > 0, A_sw_s * z * f_ywd * cot_theta / 1e3, 0.0)
+    strut_utilisation = V_strut / V_Rd_max_45
+    return ShearBatchResult(V_Ed, V_Ef, z, V_Rd_c, cot_theta, V_Rd_max, V_Rd_max_45, A_sw_s_min, A_sw_s_req,
+                            s_max, s_req, V_Rd_s, link_utilisation, strut_utilisation)
+
+
+@dataclass(frozen=True)
+class ShearResult:
+    V_Ed: float
+    V_Ef: float
+    z: float
+    V_Rd_c: float
+    cot_theta: float
+    V_Rd_max: float
+    V_Rd_max_45: float
+    A_sw_s_min: float
+    A_sw_s_req: float
+    s_max: float
+    s_req: Optional[float]
+    V_Rd_s: float
+    link_utilisation: float
+    strut_utilisation: float
+
+    @property
+    def concrete_only(self):
+        return self.V_Ed <= self.V_Rd_c
+
+    @property
+    def passed(self):
+        # As ShearBatchResult.passed
+        return (self.strut_utilisation <= 1 and self.link_utilisation <= 1
+                and self.V_Ed <= self.V_Rd_max * (1 + 1e-9))
+
+    def summary(self):
+        # Flat record of the headline results, e.g. for CSV/JSON output
+        return {
+            'V_Rd_c': self.V_Rd_c,
+            'cot_theta': self.cot_theta,
+            'V_Rd_max': self.V_Rd_max,
+            'V_Rd_s': self.V_Rd_s,
+            's_req': self.s_req,
+            'link_utilisation': self.link_utilisation,
+            'strut_utilisation': self.strut_utilisation,
+            'passed': self.passed,
+        }
+
+
+def check_shear(material, section, geometry, loads, legs=2, spacing=None):
+    """Shear check of one section with links of diameter section.d_w."""
+    batch = shear_design_batch(loads.v_ed, section.b, geometry.d_eff, geometry.A_s_total, material.f_ck,
+                               material.f_yk_shear, link_area(section.d_w, legs), spacing, loads.v_ef,
+                               material.alpha_cc, material.gamma_c, material.gamma_s)
+    return batch.result(0)
+
+
+def design_shear(material, section, reinforcement, loads, legs=2, spacing=None):
+    # Counterpart of ec2_design.design_bending
+    return check_shear(material, section, section_geometry(section, reinforcement), loads, legs, spacing)
+
+
+@dataclass(frozen=True)
+class LinkZone:
+    start: float  # mm along the span
+    end: float
+    spacing: float  # NaN where no spacing of these links is enough
+
+
+@dataclass
+class SpanShearResult:
+    x: np.ndarray  # Station positions, mm
+    V_Ed: np.ndarray  # kN, enveloped over the load cases
+    shear: ShearBatchResult
+    spacing: np.ndarray  # s_req rounded down to SPACING_STEP, NaN where it cannot work
+    zones: Tuple[LinkZone, ...]
+
+    @property
+    def passed(self):
+        return bool(len(self.zones)) and not any(math.isnan(zone.spacing) for zone in self.zones)
+
+
+def link_zones(x, spacing):
+    """Runs of stations needing the same link spacing, as contiguous LinkZones.
+
+    Between two stations in different zones the tighter spacing (NaN counts as
+    the tightest) is carried across the gap, so every point between stations is
+    covered by a spacing at least as close as its neighbours need.
+    """
+    x = np.asarray(x, dtype=float)
+    key = np.where(np.isnan(spacing), -1.0, spacing)
+    starts = np.concatenate(([0], np.flatnonzero(key[1:] != key[:-1]) + 1))
+    ends = np.concatenate((starts[1:], [len(x)]))
+    zones = []
+    start = x[0]
+    for first, stop in zip(starts, ends):
+        if stop == len(x):
+            end = x[-1]
+        else:
+            # The tighter of the two neighbouring zones covers the gap
+            end = x[stop] if key[stop - 1] < key[stop] else x[stop - 1]
+        zones.append(LinkZone(float(start), float(end), float(spacing[first])))
+        start = end
+    return tuple(zones)
+
+
+def shear_along_span(x, V_Ed, b, d, A_sl, f_ck, f_ywk, A_sw, alpha_cc=0.85, gamma_c=1.5, gamma_s=1.15,
+                     step=SPACING_STEP):
+    """Link spacing along a span from a sampled shear force diagram.
+
+    x holds the station positions in increasing order and V_Ed the shear at each
+    station in kN, or a (cases, stations) array that is enveloped by magnitude.
+    Each station is checked with its own shear for both the strut and the links.
+    b, d, A_sl and A_sw may be per station.
+    """
+    x = np.asarray(x, dtype=float)
+    V_Ed = np.abs(np.asarray(V_Ed, dtype=float))
+    if V_Ed.ndim == 2:
+        V_Ed = V_Ed.max(axis=0)
+    if V_Ed.shape != x.shape or not len(x):
+        raise ValueError("Please provide one shear force per station.")
+    shear = shear_design_batch(V_Ed, b, d, A_sl, f_ck, f_ywk, A_sw, None, None, alpha_cc, gamma_c, gamma_s)
+    with np.errstate(invalid='ignore'):
+        spacing = np.floor(shear.s_req / step) * step
+        spacing[(spacing < step) | (shear.strut_utilisation > 1)] = np.nan
+    return SpanShearResult(x, V_Ed, shear, spacing, link_zones(x, spacing))
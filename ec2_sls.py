@@ -0,0 +1,257 @@
+"""EC2 7.2/7.3 serviceability checks: service stresses and crack widths.
+
+The section is taken as cracked and linear elastic with the concrete in
+tension ignored. With a modular ratio α_e = E_s / E_c,eff (long-term, through
+the creep coefficient) the neutral axis depth x solves
+
+    b x² / 2 + Σ n_i A_i x - Σ n_i A_i y_i = 0
+
+where n_i is α_e for tension layers and α_e - 1 for compression layers (the
+displaced concrete), so x, the cracked second moment I_cr and the crack
+spacing s_r,max (7.11) depend on the section alone. Everything that varies
+with the moment is then a product: σ_c = M x / I_cr, σ_s = α_e M (d - x) / I_cr
+and w_k = s_r,max (ε_sm - ε_cm) (7.8, 7.9).
+
+cracked_section_batch evaluates the section terms for arrays of sections once;
+CrackedSectionBatch.check applies one moment per section or a (sections,
+cases) array of them. check_sls keeps the terms of recently checked sections
+in an LRU cache, and sls_check_cases computes them once per distinct section
+in a list of cases. Moments are in kNm, stresses in N/mm² and w_k in mm.
+
+Stresses are limited to 0.45 f_ck in the concrete (quasi-permanent loads, so
+creep stays linear) and 0.8 f_yk in the steel (7.2), and w_k to w_max
+(Table 7.1N: 0.3 mm). σ_s is taken at the outermost tension layer.
+"""
+import math
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+
+from ec2_design import E_s, section_geometry
+from ec2_fibre import batch_layer_depths
+from ec2_materials import concrete_arrays
+
+CREEP_COEFFICIENT = 2.0
+W_MAX = 0.3
+
+# Long-term loading in (7.9)
+K_T = 0.4
+
+
+def mean_tensile_strength(f_ck):
+    # f_ctm in N/mm² from EC2 Table 3.1
+    return concrete_arrays(f_ck).f_ctm
+
+
+def secant_modulus(f_ck):
+    # E_cm in N/mm² from EC2 Table 3.1
+    return concrete_arrays(f_ck).E_cm
+
+
+@dataclass
+class SLSBatchResult:
+    M: np.ndarray  # kNm, magnitude
+    sigma_c: np.ndarray  # Concrete stress at the compression face
+    sigma_s: np.ndarray  # Steel stress in the outermost tension layer
+    strain_difference: np.ndarray  # ε_sm - ε_cm
+    w_k: np.ndarray
+    sigma_c_limit: np.ndarray
+    sigma_s_limit: np.ndarray
+    w_max: np.ndarray
+
+    def __len__(self):
+        return len(self.M)
+
+    @property
+    def passed(self):
+        return (self.sigma_c <= self.sigma_c_limit) & (self.sigma_s <= self.sigma_s_limit) & (self.w_k <= self.w_max)
+
+
+@dataclass
+class CrackedSectionBatch:
+    valid: np.ndarray  # False where the section has no tension steel
+    alpha_e: np.ndarray  # E_s / E_c,eff
+    x: np.ndarray  # Neutral axis depth, mm
+    I_cr: np.ndarray  # Cracked second moment, mm⁴
+    d_max: np.ndarray  # Depth of the outermost tension layer
+    s_r_max: np.ndarray  # Maximum crack spacing, mm
+    rho_p_eff: np.ndarray
+    crack_term: np.ndarray  # k_t f_ct,eff (1 + α_e,short ρ_p,eff) / ρ_p,eff in (7.9), N/mm²
+    sigma_c_limit: np.ndarray
+    sigma_s_limit: np.ndarray
+
+    def __len__(self):
+        return len(self.x)
+
+    def check(self, M, w_max=W_MAX):
+        """Stresses and crack widths for M in kNm, shaped (n,) or (n, cases)."""
+        M = np.abs(np.asarray(M, dtype=float))
+        terms = [self.alpha_e, self.x, self.I_cr, self.d_max, self.s_r_max, self.rho_p_eff, self.crack_term,
+                 self.sigma_c_limit, self.sigma_s_limit]
+        if M.ndim == 2:
+            terms = [v[:, None] for v in terms]
+        alpha_e, x, I_cr, d_max, s_r_max, rho_p_eff, crack_term, sigma_c_limit, sigma_s_limit = terms
+        moment = M * 1e6
+        sigma_c = moment * x / I_cr
+        sigma_s = alpha_e * moment * (d_max - x) / I_cr
+        strain_difference = np.maximum(sigma_s - crack_term, 0.6 * sigma_s) / E_s
+        w_k = s_r_max * strain_difference
+        shape = np.shape(w_k)
+        return SLSBatchResult(np.broadcast_to(M, shape), sigma_c, sigma_s, strain_difference, w_k,
+                              np.broadcast_to(sigma_c_limit, shape), np.broadcast_to(sigma_s_limit, shape),
+                              np.broadcast_to(np.asarray(w_max, dtype=float), shape))
+
+
+def cracked_section_batch(b, h, f_ck, f_yk, c_nom, d_w, tension_diameters, tension_counts,
+                          compression_diameters=None, compression_counts=None, creep=CREEP_COEFFICIENT):
+    """Section terms of the cracked elastic analysis for n sections.
+
+    Layer arrays are (n, layers), outer face inwards, as for
+    ec2_batch.design_bending_batch; scalar inputs are broadcast.
+    """
+    tension_diameters = np.atleast_2d(np.asarray(tension_diameters, dtype=float))
+    tension_counts = np.atleast_2d(np.asarray(tension_counts, dtype=float))
+    n = tension_diameters.shape[0]
+    b, h, f_ck, f_yk, c_nom, d_w, creep = (np.broadcast_to(np.asarray(v, dtype=float), (n,))
+                                           for v in (b, h, f_ck, f_yk, c_nom, d_w, creep))
+    depths, areas = batch_layer_depths(h, c_nom, d_w, tension_diameters, tension_counts,
+                                       compression_diameters, compression_counts)
+    n_tension = tension_diameters.shape[1]
+    tension = np.arange(depths.shape[1]) < n_tension
+
+    E_cm = secant_modulus(f_ck)
+    alpha_e = E_s * (1 + creep) / E_cm
+    ratios = np.where(tension, alpha_e[:, None], alpha_e[:, None] - 1) * areas
+
+    # Closed-form root of the first moment of area about the neutral axis
+    first = ratios.sum(axis=1)
+    second = (ratios * depths).sum(axis=1)
+    x = (np.sqrt(first * first + 2 * b * second) - first) / b
+    offsets = depths - x[:, None]
+    I_cr = b * x ** 3 / 3 + (ratios * offsets * offsets).sum(axis=1)
+
+    tension_areas = areas[:, :n_tension]
+    A_s = tension_areas.sum(axis=1)
+    valid = A_s > 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        d_max = np.where(tension_areas > 0, depths[:, :n_tension], 0.0).max(axis=1)
+        d_eff = (tension_areas * depths[:, :n_tension]).sum(axis=1) / A_s
+
+        # Effective tension area around the bars (7.3.2(3)) and its steel ratio
+        h_c_ef = np.minimum(np.minimum(2.5 * (h - d_eff), (h - x) / 3), h / 2)
+        rho_p_eff = A_s / (b * h_c_ef)
+
+        # Equivalent diameter Σ n φ² / Σ n φ, with n φ² proportional to the layer area (7.12)
+        diameter = A_s / np.where(tension_areas > 0, tension_areas / tension_diameters, 0.0).sum(axis=1)
+        cover = c_nom + d_w
+        s_r_max = 3.4 * cover + 0.8 * 0.5 * 0.425 * diameter / rho_p_eff
+
+        # Bars of the outer layer spaced wider than 5 (c + φ / 2) crack at 1.3 (h - x) (7.14)
+        outer_diameter, outer_count = tension_diameters[:, 0], tension_counts[:, 0]
+        spacing = np.where(outer_count > 1, (b - 2 * (cover + outer_diameter * 0.5)) / (outer_count - 1), b)
+        s_r_max = np.where(spacing > 5 * (cover + outer_diameter * 0.5), 1.3 * (h - x), s_r_max)
+
+        crack_term = K_T * mean_tensile_strength(f_ck) * (1 + E_s / E_cm * rho_p_eff) / rho_p_eff
+
+    invalid = ~valid
+    if invalid.any():
+        for values in (x, I_cr, s_r_max, crack_term):
+            values[invalid] = np.nan
+    return CrackedSectionBatch(valid, alpha_e, x, I_cr, d_max, s_r_max, rho_p_eff, crack_term, 0.45 * f_ck,
+                               0.8 * f_yk)
+
+
+@dataclass(frozen=True)
+class SLSResult:
+    M: float
+    alpha_e: float
+    x: float
+    I_cr: float
+    sigma_c: float
+    sigma_s: float
+    s_r_max: float
+    w_k: float
+    sigma_c_limit: float
+    sigma_s_limit: float
+    w_max: float
+
+    @property
+    def passed(self):
+        return self.sigma_c <= self.sigma_c_limit and self.sigma_s <= self.sigma_s_limit and self.w_k <= self.w_max
+
+    def summary(self):
+        # Flat record of the headline results, e.g. for CSV/JSON output
+        return {
+            'x': self.x,
+            'I_cr': self.I_cr,
+            'sigma_c': self.sigma_c,
+            'sigma_s': self.sigma_s,
+            's_r_max': self.s_r_max,
+            'w_k': self.w_k,
+            'passed': self.passed,
+        }
+
+
+def _layer_counts(layers):
+    # (diameters, counts) rows back from the (diameter, area) layers of a SectionGeometry
+    return ([[d for d, _ in layers]], [[round(A / (math.pi * (d * d) * 0.25)) for d, A in layers]])
+
+
+@lru_cache(maxsize=4096)
+def cracked_section(material, section, geometry, creep=CREEP_COEFFICIENT):
+    """Section terms of one section, cached across load cases."""
+    if not geometry.tension_layers:
+        raise ValueError("Total tension reinforcement area is zero. Please provide valid tension reinforcement data.")
+    tension_diameters, tension_counts = _layer_counts(geometry.tension_layers)
+    compression_diameters, compression_counts = _layer_counts(geometry.compression_layers)
+    return cracked_section_batch(section.b, section.h, material.f_ck, material.f_yk_main, section.c_nom,
+                                 section.d_w, tension_diameters, tension_counts, compression_diameters,
+                                 compression_counts, creep)
+
+
+def check_sls(material, section, geometry, loads, creep=CREEP_COEFFICIENT, w_max=W_MAX):
+    """Service stresses and crack width of one section under loads.sls_m_ed."""
+    terms = cracked_section(material, section, geometry, creep)
+    checked = terms.check([loads.sls_m_ed], w_max)
+    return SLSResult(float(checked.M[0]), float(terms.alpha_e[0]), float(terms.x[0]), float(terms.I_cr[0]),
+                     float(checked.sigma_c[0]), float(checked.sigma_s[0]), float(terms.s_r_max[0]),
+                     float(checked.w_k[0]), float(checked.sigma_c_limit[0]), float(checked.sigma_s_limit[0]),
+                     float(checked.w_max[0]))
+
+
+def design_sls(material, section, reinforcement, loads, creep=CREEP_COEFFICIENT, w_max=W_MAX):
+    # Counterpart of ec2_design.design_bending
+    return check_sls(material, section, section_geometry(section, reinforcement), loads, creep, w_max)
+
+
+def sls_check_cases(cases, creep=CREEP_COEFFICIENT, w_max=W_MAX):
+    """Batch SLS check of (Material, Section, Reinforcement, Loads) tuples.
+
+    The section terms are computed once per distinct (Material, Section,
+    Reinforcement), however many load cases share it.
+    """
+    from ec2_batch import layer_arrays
+
+    index, unique = [], {}
+    for material, section, reinforcement, _ in cases:
+        index.append(unique.setdefault((material, section, reinforcement), len(unique)))
+    materials, sections, reinforcements = zip(*unique) if unique else ((), (), ())
+    tension_diameters, tension_counts = layer_arrays([r.tension for r in reinforcements])
+    compression_diameters, compression_counts = layer_arrays([r.compression for r in reinforcements])
+    terms = cracked_section_batch(
+        b=[s.b for s in sections],
+        h=[s.h for s in sections],
+        f_ck=[m.f_ck for m in materials],
+        f_yk=[m.f_yk_main for m in materials],
+        c_nom=[s.c_nom for s in sections],
+        d_w=[s.d_w for s in sections],
+        tension_diameters=tension_diameters,
+        tension_counts=tension_counts,
+        compression_diameters=compression_diameters,
+        compression_counts=compression_counts,
+        creep=creep,
+    )
+    index = np.asarray(index, dtype=int)
+    per_case = CrackedSectionBatch(*(getattr(terms, name)[index] for name in CrackedSectionBatch.__dataclass_fields__))
+    return per_case.check([loads.sls_m_ed for *_, loads in cases], w_max)
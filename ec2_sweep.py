@@ -0,0 +1,308 @@
+"""Parametric sweeps over the batch engines and design charts from them.
+
+A sweep takes a grid of values for any engine inputs (the rest keep their
+defaults) and evaluates the full Cartesian product in chunks: each chunk of
+flat indices is unravelled into input columns and checked as one NumPy batch,
+so memory stays bounded by the chunk size however large the grid is. Results
+come back as a structured array with one field per swept input and per
+selected output, in the C order of the grid, optionally written straight to a
+.npy file through a memory map.
+
+    python RC_Beam_EC2.py sweep --axis h=300:900:25 --axis f_ck=20,30,40,50 \\
+        --set M_Ed=250 --outputs A_s_req --chart chart.png --x h --y A_s_req
+
+Engines are 'bending' (ec2_batch, the rectangular-block check) and 'fibre'
+(ec2_fibre, with M_Rd). matplotlib is only imported when a chart is drawn.
+"""
+import argparse
+import csv
+import itertools
+import sys
+from dataclasses import dataclass
+from typing import Tuple
+
+import numpy as np
+
+DEFAULT_CHUNK_SIZE = 200_000
+
+# Inputs of every engine and their defaults; one tension and one compression layer
+SECTION_INPUTS = {
+    'b': 300.0, 'h': 500.0, 'f_ck': 30.0, 'f_yk': 500.0, 'c_nom': 40.0, 'd_w': 0.0,
+    'tension_diameter': 20.0, 'tension_count': 3.0, 'compression_diameter': 0.0, 'compression_count': 0.0,
+    'M_Ed': 0.0, 'rdp': 15.0, 'gamma_s': 1.15,
+}
+BENDING_OUTPUTS = {
+    'd_eff': float, 'K': float, 'K_bal': float, 'z_m': float, 'A_s_total': float, 'A_s_req': float,
+    'A_sc_req': float, 'A_s_min': float, 'A_s_max': float, 'tension_utilisation_ratio': float,
+    'compression_utilisation_ratio': float, 'section_type': np.int8, 'passed': bool,
+}
+FIBRE_OUTPUTS = {
+    'x': float, 'M_Rd': float, 'x_limit': float, 'utilisation': float, 'converged': bool, 'ductile': bool,
+    'passed': bool,
+}
+
+
+def _bending(inputs):
+    from ec2_batch import design_bending_batch
+
+    result = design_bending_batch(
+        inputs['b'], inputs['h'], inputs['f_ck'], inputs['f_yk'], inputs['c_nom'], inputs['d_w'],
+        inputs['tension_diameter'][:, None], inputs['tension_count'][:, None], inputs['M_Ed'], inputs['rdp'],
+        inputs['compression_diameter'][:, None], inputs['compression_count'][:, None], inputs['gamma_s'])
+    return lambda name: getattr(result, name)
+
+
+def _fibre(inputs):
+    from ec2_fibre import batch_layer_depths, fibre_analysis_batch
+
+    depths, areas = batch_layer_depths(
+        inputs['h'], inputs['c_nom'], inputs['d_w'], inputs['tension_diameter'][:, None],
+        inputs['tension_count'][:, None], inputs['compression_diameter'][:, None],
+        inputs['compression_count'][:, None])
+    result = fibre_analysis_batch(
+        inputs['b'], inputs['h'], inputs['f_ck'], inputs['f_yk'], depths, areas, inputs['M_Ed'], inputs['rdp'],
+        depths[:, 0], inputs['alpha_cc'], inputs['gamma_c'], inputs['gamma_s'])
+    return lambda name: getattr(result, name)
+
+
+# name: (inputs with defaults, outputs with dtypes, default outputs, evaluator)
+ENGINES = {
+    'bending': (SECTION_INPUTS, BENDING_OUTPUTS, ('A_s_req', 'tension_utilisation_ratio', 'passed'), _bending),
+    'fibre': (dict(SECTION_INPUTS, alpha_cc=0.85, gamma_c=1.5), FIBRE_OUTPUTS, ('M_Rd', 'x', 'ductile'), _fibre),
+}
+
+
+@dataclass
+class SweepResult:
+    engine: str
+    axes: Tuple[Tuple[str, np.ndarray], ...]  # (input name, values) per swept input, outermost first
+    data: np.ndarray  # Structured, one record per grid point in C order
+
+    def __len__(self):
+        return len(self.data)
+
+    @property
+    def shape(self):
+        return tuple(len(values) for _, values in self.axes)
+
+    @property
+    def outputs(self):
+        names = {name for name, _ in self.axes}
+        return tuple(name for name in self.data.dtype.names if name not in names)
+
+    def axis(self, name):
+        for axis_name, values in self.axes:
+            if axis_name == name:
+                return values
+        raise ValueError(f"{name!r} is not a swept input.")
+
+    def grid(self, field):
+        # Field reshaped to the grid, one dimension per swept input
+        return np.asarray(self.data[field]).reshape(self.shape)
+
+
+def _engine(engine):
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine {engine!r}; expected one of {', '.join(ENGINES)}.")
+    return ENGINES[engine]
+
+
+def sweep_axes(grid, engine='bending'):
+    # Validated (name, float values) pairs in the order given
+    inputs = _engine(engine)[0]
+    axes = []
+    for name, values in grid.items():
+        if name not in inputs:
+            raise ValueError(f"Unknown input {name!r} for the {engine} engine; expected one of {', '.join(inputs)}.")
+        values = np.atleast_1d(np.asarray(values, dtype=float))
+        if values.ndim != 1 or not len(values):
+            raise ValueError(f"Please provide a list of values for {name!r}.")
+        axes.append((name, values))
+    return tuple(axes)
+
+
+def sweep_dtype(axes, engine='bending', outputs=None):
+    engine_outputs, default_outputs = _engine(engine)[1:3]
+    outputs = default_outputs if outputs is None else tuple(outputs)
+    for name in outputs:
+        if name not in engine_outputs:
+            raise ValueError(f"Unknown output {name!r} for the {engine} engine; "
+                             f"expected one of {', '.join(engine_outputs)}.")
+    return np.dtype([(name, float) for name, _ in axes] + [(name, engine_outputs[name]) for name in outputs])
+
+
+def iter_sweep(grid, engine='bending', outputs=None, fixed=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield the sweep as structured arrays of at most chunk_size grid points.
+
+    grid maps input names to value lists, fixed maps further inputs to single
+    values; every other input keeps its default.
+    """
+    inputs, _, _, evaluate = _engine(engine)
+    axes = sweep_axes(grid, engine)
+    dtype = sweep_dtype(axes, engine, outputs)
+    constants = dict(inputs)
+    for name, value in (fixed or {}).items():
+        if name not in inputs:
+            raise ValueError(f"Unknown input {name!r} for the {engine} engine.")
+        constants[name] = float(value)
+    shape = tuple(len(values) for _, values in axes)
+    total = int(np.prod(shape, dtype=np.int64))
+    chunk_size = max(int(chunk_size), 1)
+    for start in range(0, total, chunk_size):
+        flat = np.arange(start, min(start + chunk_size, total))
+        columns = {name: np.full(len(flat), value) for name, value in constants.items()}
+        for (name, values), index in zip(axes, np.unravel_index(flat, shape)):
+            columns[name] = values[index]
+        result = evaluate(columns)
+        chunk = np.empty(len(flat), dtype)
+        for name in dtype.names:
+            chunk[name] = columns[name] if name in grid else result(name)
+        yield chunk
+
+
+def sweep(grid, engine='bending', outputs=None, fixed=None, chunk_size=DEFAULT_CHUNK_SIZE, path=None):
+    """Evaluate the whole grid into a SweepResult.
+
+    With path the records go to a .npy file through a memory map instead of
+    memory, so only one chunk is held at a time.
+    """
+    axes = sweep_axes(grid, engine)
+    dtype = sweep_dtype(axes, engine, outputs)
+    total = int(np.prod([len(values) for _, values in axes], dtype=np.int64))
+    if path is None:
+        data = np.empty(total, dtype)
+    else:
+        data = np.lib.format.open_memmap(path, mode='w+', dtype=dtype, shape=(total,))
+    start = 0
+    for chunk in iter_sweep(grid, engine, outputs, fixed, chunk_size):
+        data[start:start + len(chunk)] = chunk
+        start += len(chunk)
+    if path is not None:
+        data.flush()
+    return SweepResult(engine, axes, data)
+
+
+def _series_label(names, values):
+    return ", ".join(f"{name}={value:g}" for name, value in zip(names, values))
+
+
+def plot_sweep(result, x, y, figure=None, select=None, title=None):
+    """Draw y against the swept input x, one line per combination of the other inputs.
+
+    select maps swept inputs to the value to hold them at (the nearest grid
+    value is used) instead of drawing a line for each of their values.
+    """
+    if figure is None:
+        from matplotlib.figure import Figure
+        figure = Figure(figsize=(8, 5))
+    if y not in result.outputs:
+        raise ValueError(f"{y!r} is not an output of this sweep; expected one of {', '.join(result.outputs)}.")
+    x_values = result.axis(x)
+    values = result.grid(y).astype(float)
+    names = [name for name, _ in result.axes]
+    index = [slice(None)] * len(names)
+    for name, value in (select or {}).items():
+        index[names.index(name)] = int(np.argmin(np.abs(result.axis(name) - value)))
+    values = values[tuple(index)]
+    kept = [name for name, i in zip(names, index) if isinstance(i, slice)]
+    values = np.moveaxis(values, kept.index(x), -1)
+    series = [name for name in kept if name != x]
+
+    ax = figure.add_subplot(111)
+    for combination in itertools.product(*(range(len(result.axis(name))) for name in series)):
+        label = _series_label(series, [result.axis(name)[i] for name, i in zip(series, combination)])
+        ax.plot(x_values, values[combination], label=label or None)
+    ax.set_xlabel(x)
+    ax.set_ylabel(y)
+    ax.grid(True, alpha=0.3)
+    if series:
+        ax.legend(fontsize='small')
+    fixed = _series_label([name for name in names if name not in kept],
+                          [result.axis(name)[i] for name, i in zip(names, index) if not isinstance(i, slice)])
+    ax.set_title(title or f"{y} against {x} ({result.engine})" + (f", {fixed}" if fixed else ""))
+    return figure
+
+
+def render_chart(result, path, x, y, select=None, title=None, dpi=150):
+    # Save a chart headless; the format follows the file extension
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    figure = Figure(figsize=(8, 5))
+    FigureCanvasAgg(figure)
+    plot_sweep(result, x, y, figure, select, title)
+    figure.tight_layout()
+    figure.savefig(path, dpi=dpi)
+
+
+def parse_values(text):
+    # '300:900:50' is an inclusive range, '20,25,30' a list
+    try:
+        if ':' in text:
+            start, stop, step = (float(v) for v in text.split(':'))
+            if step <= 0:
+                raise ValueError
+            return np.arange(start, stop + step * 0.5, step)
+        return np.array([float(v) for v in text.split(',')])
+    except ValueError:
+        raise ValueError(f"Invalid values {text!r}; expected start:stop:step or a comma separated list.")
+
+
+def _assignments(items):
+    pairs = {}
+    for item in items:
+        name, separator, text = item.partition('=')
+        if not separator:
+            raise ValueError(f"Expected name=values, got {item!r}.")
+        pairs[name.strip()] = parse_values(text)
+    return pairs
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='RC_Beam_EC2.py sweep',
+                                     description='Evaluate an engine over the Cartesian product of input values.')
+    parser.add_argument('--engine', choices=list(ENGINES), default='bending')
+    parser.add_argument('--axis', action='append', default=[], metavar='NAME=VALUES',
+                        help='swept input, as start:stop:step or a comma separated list (repeatable)')
+    parser.add_argument('--set', action='append', default=[], metavar='NAME=VALUE', help='fixed input (repeatable)')
+    parser.add_argument('--outputs', help='comma separated outputs (default depends on the engine)')
+    parser.add_argument('-o', '--output', help='.npy (memory mapped) or .csv file for the records')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--chart', help='chart file (.png, .pdf, .svg)')
+    parser.add_argument('--x', help='swept input on the chart x axis (default: the first)')
+    parser.add_argument('--y', help='output on the chart y axis (default: the first)')
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        grid = _assignments(args.axis)
+        if not grid:
+            raise ValueError("Please give at least one --axis.")
+        fixed = {name: values[0] for name, values in _assignments(args.set).items()}
+        outputs = args.outputs.split(',') if args.outputs else None
+        if args.output and args.output.endswith('.csv'):
+            # Stream the records so the whole grid is never held in memory
+            with open(args.output, 'w', newline='') as stream:
+                writer = None
+                for chunk in iter_sweep(grid, args.engine, outputs, fixed, args.chunk_size):
+                    if writer is None:
+                        writer = csv.writer(stream)
+                        writer.writerow(chunk.dtype.names)
+                    writer.writerows(chunk.tolist())
+            result = sweep(grid, args.engine, outputs, fixed, args.chunk_size) if args.chart else None
+        else:
+            result = sweep(grid, args.engine, outputs, fixed, args.chunk_size, args.output)
+        if args.chart:
+            render_chart(result, args.chart, args.x or result.axes[0][0], args.y or result.outputs[0])
+    except ValueError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    if not args.output and not args.chart:
+        print(f"{len(result)} points; use -o or --chart to keep the results", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+"""Background tasks for the Qt window.
+
+Task runs a function on a QThreadPool worker thread. The function is called
+with the Task itself: task.progress(percent, message) reports back to the
+window and task.check() raises TaskCancelled once the task has been
+cancelled, so long jobs stop at their next stage. Results, errors and
+progress are emitted as signals, which Qt queues to the GUI thread; nothing
+that runs on a worker may touch a widget.
+
+TaskRunner keeps at most one live task per name. Submitting a new
+'calculate' cancels the previous one, and the result of a superseded task is
+dropped even when it finished before noticing. busy_changed and progress
+drive the window's busy indicator.
+"""
+import threading
+
+from PyQt5.QtCore import QCoreApplication, QObject, QRunnable, QThreadPool, pyqtSignal, pyqtSlot
+
+
+class TaskCancelled(Exception):
+    pass
+
+
+class TaskSignals(QObject):
+    finished = pyqtSignal(object, object)  # (task, result)
+    failed = pyqtSignal(object, object)  # (task, exception)
+    progress = pyqtSignal(object, int, str)  # (task, percent, message)
+
+
+class Task(QRunnable):
+    def __init__(self, name, function, on_result=None, on_error=None):
+        super().__init__()
+        # The runner holds the reference, so Qt must not delete the wrapped object
+        self.setAutoDelete(False)
+        self.name = name
+        self.function = function
+        self.on_result = on_result
+        self.on_error = on_error
+        self.signals = TaskSignals()
+        self._cancelled = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def check(self):
+        if self._cancelled.is_set():
+            raise TaskCancelled(self.name)
+
+    def progress(self, percent, message=""):
+        self.check()
+        self.signals.progress.emit(self, int(percent), message)
+
+    def run(self):
+        try:
+            self.check()
+            result = self.function(self)
+        except Exception as e:
+            self.signals.failed.emit(self, e)
+        else:
+            self.signals.finished.emit(self, result)
+
+
+class TaskRunner(QObject):
+    busy_changed = pyqtSignal(bool)
+    progress = pyqtSignal(str, int, str)  # (task name, percent, message)
+
+    def __init__(self, max_threads=2, parent=None):
+        super().__init__(parent)
+        # A pool of its own, so wait() only waits for the window's tasks; two threads
+        # keep a calculation from queueing behind a PDF export
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max(max_threads, QThreadPool.globalInstance().maxThreadCount()))
+        self.current = {}  # name -> latest Task
+        self.running = set()
+
+    @property
+    def busy(self):
+        return bool(self.running)
+
+    def submit(self, name, function, on_result=None, on_error=None):
+        """Run function(task) on a worker; a previous task of the same name is cancelled."""
+        previous = self.current.get(name)
+        if previous is not None:
+            previous.cancel()
+        task = Task(name, function, on_result, on_error)
+        task.signals.finished.connect(self._finished)
+        task.signals.failed.connect(self._failed)
+        task.signals.progress.connect(self._progress)
+        self.current[name] = task
+        self.running.add(task)
+        if len(self.running) == 1:
+            self.busy_changed.emit(True)
+        self.pool.start(task)
+        return task
+
+    def cancel(self, name=None):
+        # Cancel the named task, or all of them
+        for task_name, task in list(self.current.items()):
+            if name is None or task_name == name:
+                task.cancel()
+                del self.current[task_name]
+
+    def wait(self, msecs=-1):
+        # Block until the pool is idle and deliver the queued results, for scripts and benchmarks
+        done = self.pool.waitForDone(msecs)
+        QCoreApplication.processEvents()
+        return done
+
+    def _latest(self, task):
+        return self.current.get(task.name) is task and not task.cancelled
+
+    def _release(self, task):
+        self.running.discard(task)
+        if not self.running:
+            self.busy_changed.emit(False)
+
+    @pyqtSlot(object, object)
+    def _finished(self, task, result):
+        latest = self._latest(task)
+        if latest:
+            del self.current[task.name]
+        self._release(task)
+        if latest and task.on_result is not None:
+            task.on_result(result)
+
+    @pyqtSlot(object, object)
+    def _failed(self, task, error):
+        latest = self._latest(task)
+        if latest:
+            del self.current[task.name]
+        self._release(task)
+        if latest and not isinstance(error, TaskCancelled) and task.on_error is not None:
+            task.on_error(error)
+
+    @pyqtSlot(object, int, str)
+    def _progress(self, task, percent, message):
+        if self._latest(task):
+            self.progress.emit(task.name, percent, message)
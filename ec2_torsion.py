@@ -0,0 +1,215 @@
+"""EC2 6.3 torsion design of rectangular RC beams, with the V/T interaction.
+
+The solid section is replaced by the thin-walled closed section of 6.3.2:
+t_ef = A / u, but at least twice the distance from the face to the centre of
+the longitudinal bars, enclosing A_k with perimeter u_k. Torsion and shear
+share one strut angle, taken as flat as the combined crushing check
+
+    T_Ed / T_Rd,max + V_Ed / V_Rd,max <= 1    (6.29)
+
+allows for the larger of the design and the support face (T_Ef, V_Ef)
+values. Both resistances scale with sin θ cos θ, so that θ follows in closed
+form the same way as for shear alone (ec2_shear). Where
+
+    T_Ed / T_Rd,c + V_Ed / V_Rd,c <= 1        (6.31)
+
+only the minimum links of 9.2.2 are needed. Otherwise each outer link leg
+carries T_Ed / (2 A_k f_ywd cot θ) per mm on top of its share of the shear
+links, and ΣA_sl = T_Ed u_k cot θ / (2 A_k f_yd) of longitudinal steel is
+added around the perimeter.
+
+torsion_design_batch broadcasts every input against the others, so a
+(sections, 1) array of section properties checked against (sections, pairs)
+load arrays gives the whole V/T envelope of each section in one call.
+check_torsion and torsion_envelope are the per-section forms. Torsion is in
+kNm, shear in kN, lengths in mm and areas in mm².
+"""
+import math
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from ec2_design import section_geometry
+from ec2_shear import concrete_shear_resistance, link_area, minimum_links, strut_capacity, strut_cot_theta
+from ec2_sls import mean_tensile_strength
+
+
+def concrete_tensile_strength(f_ck, gamma_c=1.5, alpha_ct=1.0):
+    # f_ctd = α_ct f_ctk,0.05 / γ_c with f_ctk,0.05 = 0.7 f_ctm
+    return alpha_ct * 0.7 * mean_tensile_strength(f_ck) / gamma_c
+
+
+def thin_walled_section(b, h, edge_distance):
+    # (t_ef, A_k, u_k) of the equivalent thin-walled section (6.3.2(1))
+    t_ef = np.minimum(np.maximum(b * h / (2 * (b + h)), 2 * edge_distance), np.minimum(b, h) / 2)
+    A_k = (b - t_ef) * (h - t_ef)
+    u_k = 2 * ((b - t_ef) + (h - t_ef))
+    return t_ef, A_k, u_k
+
+
+@dataclass
+class TorsionBatchResult:
+    T_Ed: np.ndarray  # kNm, magnitude
+    T_Ef: np.ndarray
+    V_Ed: np.ndarray  # kN, magnitude
+    V_Ef: np.ndarray
+    t_ef: np.ndarray
+    A_k: np.ndarray
+    u_k: np.ndarray
+    T_Rd_c: np.ndarray  # kNm, cracking torque
+    V_Rd_c: np.ndarray  # kN
+    cot_theta: np.ndarray
+    T_Rd_max: np.ndarray  # kNm, at the chosen θ
+    V_Rd_max: np.ndarray  # kN, at the chosen θ
+    A_sl_req: np.ndarray  # Additional longitudinal steel for torsion, mm²
+    A_t_s_req: np.ndarray  # Torsion links per outer leg, mm²/mm
+    A_sw_s_req: np.ndarray  # Shear and torsion links per outer leg, mm²/mm
+    s_max: np.ndarray  # Largest link spacing, mm (9.2.2 and 9.2.3)
+    s_req: np.ndarray  # Largest spacing of the given links that works, NaN without links
+    link_utilisation: np.ndarray  # Required / provided per outer leg, inf without links
+    interaction: np.ndarray  # T / T_Rd,max + V / V_Rd,max at θ = 45°, the larger of the design and face values
+
+    def __len__(self):
+        return len(self.T_Ed)
+
+    @property
+    def concrete_only(self):
+        # Where only minimum links are needed (6.31)
+        return self.T_Ed / self.T_Rd_c + self.V_Ed / self.V_Rd_c <= 1
+
+    @property
+    def passed(self):
+        return (self.interaction <= 1) & (self.link_utilisation <= 1)
+
+    def result(self, index):
+        s_req = float(self.s_req[index])
+        return TorsionResult(
+            **{name: float(getattr(self, name)[index]) for name in self.__dataclass_fields__ if name != 's_req'},
+            s_req=None if math.isnan(s_req) else s_req,
+        )
+
+
+def torsion_design_batch(T_Ed, V_Ed, b, h, d, A_s, edge_distance, f_ck, f_yk, f_ywk, A_leg=0.0, legs=2, s=None,
+                         T_Ef=None, V_Ef=None, alpha_cc=0.85, gamma_c=1.5, gamma_s=1.15):
+    """Torsion and shear check; all inputs broadcast against each other.
+
+    A_s is the tension steel for ρ_l, edge_distance the depth from the faces to
+    the centre of the longitudinal bars, A_leg the area of one link leg of
+    which legs make up a set at spacing s. T_Ef and V_Ef (at the support face)
+    default to T_Ed and V_Ed.
+    """
+    T_Ef = T_Ed if T_Ef is None else T_Ef
+    V_Ef = V_Ed if V_Ef is None else V_Ef
+    s = np.nan if s is None else s
+    (T_Ed, V_Ed, T_Ef, V_Ef, b, h, d, A_s, edge_distance, f_ck, f_yk, f_ywk, A_leg, legs, s, alpha_cc, gamma_c,
+     gamma_s) = np.broadcast_arrays(*(np.atleast_1d(np.asarray(v, dtype=float)) for v in (
+        T_Ed, V_Ed, T_Ef, V_Ef, b, h, d, A_s, edge_distance, f_ck, f_yk, f_ywk, A_leg, legs, s, alpha_cc, gamma_c,
+        gamma_s)))
+    T_Ed, V_Ed, T_Ef, V_Ef = (np.abs(v) for v in (T_Ed, V_Ed, T_Ef, V_Ef))
+    f_cd = alpha_cc * f_ck / gamma_c
+    f_yd = f_yk / gamma_s
+    f_ywd = f_ywk / gamma_s
+    z = 0.9 * d
+
+    t_ef, A_k, u_k = thin_walled_section(b, h, edge_distance)
+    T_Rd_c = 2 * A_k * t_ef * concrete_tensile_strength(f_ck, gamma_c) / 1e6
+    V_Rd_c = concrete_shear_resistance(b, d, A_s, f_ck, gamma_c)
+
+    # T_Rd,max = torsion_strut / (cot θ + tan θ) (6.30), with ν = ν1 and α_cw = 1
+    torsion_strut = 2 * 0.6 * (1 - f_ck / 250) * f_cd * A_k * t_ef / 1e6
+    shear_strut = strut_capacity(b, z, f_ck, f_cd)
+    # The struts carry the larger of the design and support face values
+    demand = np.maximum(T_Ed, T_Ef) / torsion_strut + np.maximum(V_Ed, V_Ef) / shear_strut
+    cot_theta = strut_cot_theta(demand)
+    sin_cos = 1 / (cot_theta + 1 / cot_theta)
+    T_Rd_max = torsion_strut * sin_cos
+    V_Rd_max = shear_strut * sin_cos
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        designed = T_Ed / T_Rd_c + V_Ed / V_Rd_c > 1
+    A_sl_req = np.where(designed, T_Ed * 1e6 * u_k * cot_theta / (2 * A_k * f_yd), 0.0)
+    A_t_s_req = np.where(designed, T_Ed * 1e6 / (2 * A_k * f_ywd * cot_theta), 0.0)
+    A_v_s_min = minimum_links(f_ck, f_ywk, b)
+    A_v_s_req = np.where(designed & (V_Ed > V_Rd_c),
+                         np.maximum(V_Ed * 1e3 / (z * f_ywd * cot_theta), A_v_s_min), A_v_s_min)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        A_sw_s_req = A_v_s_req / legs + A_t_s_req
+        # Torsion links are also limited to u / 8 and the smaller section dimension
+        s_max = np.where(designed, np.minimum(np.minimum(0.75 * d, (b + h) / 4), np.minimum(b, h)), 0.75 * d)
+        s_req = np.where(A_leg > 0, np.minimum(A_leg / A_sw_s_req, s_max), np.nan)
+        link_utilisation = np.where(A_leg > 0, np.maximum(A_sw_s_req * s / A_leg, s / s_max), np.inf)
+    interaction = 2 * demand
+    return TorsionBatchResult(T_Ed, T_Ef, V_Ed, V_Ef, t_ef, A_k, u_k, T_Rd_c, V_Rd_c, cot_theta, T_Rd_max, V_Rd_max,
+                              A_sl_req, A_t_s_req, A_sw_s_req, s_max, s_req, link_utilisation, interaction)
+
+
+@dataclass(frozen=True)
+class TorsionResult:
+    T_Ed: float
+    T_Ef: float
+    V_Ed: float
+    V_Ef: float
+    t_ef: float
+    A_k: float
+    u_k: float
+    T_Rd_c: float
+    V_Rd_c: float
+    cot_theta: float
+    T_Rd_max: float
+    V_Rd_max: float
+    A_sl_req: float
+    A_t_s_req: float
+    A_sw_s_req: float
+    s_max: float
+    link_utilisation: float
+    interaction: float
+    s_req: Optional[float]
+
+    @property
+    def concrete_only(self):
+        return self.T_Ed / self.T_Rd_c + self.V_Ed / self.V_Rd_c <= 1
+
+    @property
+    def passed(self):
+        return self.interaction <= 1 and self.link_utilisation <= 1
+
+    def summary(self):
+        # Flat record of the headline results, e.g. for CSV/JSON output
+        return {
+            'T_Rd_c': self.T_Rd_c,
+            'cot_theta': self.cot_theta,
+            'T_Rd_max': self.T_Rd_max,
+            'A_sl_req': self.A_sl_req,
+            's_req': self.s_req,
+            'link_utilisation': self.link_utilisation,
+            'interaction': self.interaction,
+            'passed': self.passed,
+        }
+
+
+def _section_inputs(material, section, geometry):
+    # Keyword arguments of torsion_design_batch that only depend on the section
+    bar = geometry.tension_layers[0][0] if geometry.tension_layers else 0.0
+    return dict(b=section.b, h=section.h, d=geometry.d_eff, A_s=geometry.A_s_total,
+                edge_distance=section.c_nom + section.d_w + bar * 0.5, f_ck=material.f_ck,
+                f_yk=material.f_yk_main, f_ywk=material.f_yk_shear, A_leg=link_area(section.d_w, 1),
+                alpha_cc=material.alpha_cc, gamma_c=material.gamma_c, gamma_s=material.gamma_s)
+
+
+def check_torsion(material, section, geometry, loads, legs=2, spacing=None):
+    """Torsion and shear check of one section with links of diameter section.d_w."""
+    batch = torsion_design_batch(loads.t_ed, loads.v_ed, legs=legs, s=spacing, T_Ef=loads.t_ef, V_Ef=loads.v_ef,
+                                 **_section_inputs(material, section, geometry))
+    return batch.result(0)
+
+
+def design_torsion(material, section, reinforcement, loads, legs=2, spacing=None):
+    # Counterpart of ec2_design.design_bending
+    return check_torsion(material, section, section_geometry(section, reinforcement), loads, legs, spacing)
+
+
+def torsion_envelope(material, section, geometry, T_Ed, V_Ed, T_Ef=None, V_Ef=None, legs=2, spacing=None):
+    """Check one section against arrays of (T_Ed, V_Ed) load pairs in one batch."""
+    return torsion_design_batch(T_Ed, V_Ed, legs=legs, s=spacing, T_Ef=T_Ef, V_Ef=V_Ef,
+                                **_section_inputs(material, section, geometry))
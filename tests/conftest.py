@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The ec2_* modules sit flat at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
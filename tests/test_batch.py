@@ -0,0 +1,28 @@
+import math
+
+import pytest
+
+from ec2_batch import design_bending_cases
+from ec2_bench import DOUBLY_CASE, SINGLY_CASE, random_cases
+from ec2_design import design_bending
+
+
+def test_batch_matches_scalar():
+    cases = random_cases(500, seed=3) + [SINGLY_CASE, DOUBLY_CASE]
+    summaries = design_bending_cases(cases).summaries()
+    for case, batch in zip(cases, summaries):
+        scalar = design_bending(*case).summary()
+        assert batch.keys() == scalar.keys()
+        for name, value in scalar.items():
+            if isinstance(value, float):
+                assert batch[name] == pytest.approx(value, rel=1e-9, abs=1e-12), name
+            else:
+                assert batch[name] == value, name
+
+
+def test_batch_marks_missing_tension_steel_invalid():
+    material, section, reinforcement, loads = SINGLY_CASE
+    batch = design_bending_cases([SINGLY_CASE, (material, section, type(reinforcement)(), loads)])
+    assert batch.valid.tolist() == [True, False]
+    assert batch.summaries()[1] is None
+    assert not math.isnan(batch.K[0])
@@ -0,0 +1,39 @@
+import pytest
+
+from ec2_beam import FIXED, PINNED, Beam, LoadCase, PointLoad, analyse_beam
+
+w, L = 20.0, 6.0
+
+
+def test_two_span_udl_support_moment():
+    analysis = analyse_beam(Beam((L, L)), [LoadCase((w, w))])
+    assert analysis.support_moments[0] == pytest.approx([0.0, -w * L * L / 8, 0.0])
+    # End reactions of 3wL/8
+    assert analysis.V[0, 0] == pytest.approx(3 * w * L / 8)
+
+
+def test_fixed_ended_span():
+    analysis = analyse_beam(Beam((L,), (FIXED, FIXED)), [LoadCase((w,))])
+    assert analysis.support_moments[0] == pytest.approx([-w * L * L / 12, -w * L * L / 12])
+    assert analysis.M_max.max() == pytest.approx(w * L * L / 24)
+
+
+def test_propped_cantilever():
+    analysis = analyse_beam(Beam((L,), (FIXED, PINNED)), [LoadCase((w,))])
+    assert analysis.support_moments[0] == pytest.approx([-w * L * L / 8, 0.0])
+
+
+def test_central_point_load_on_fixed_span():
+    P = 100.0
+    analysis = analyse_beam(Beam((L,), (FIXED, FIXED)), [LoadCase((0.0,), (PointLoad(0, L / 2, P),))])
+    assert analysis.support_moments[0] == pytest.approx([-P * L / 8, -P * L / 8])
+    assert analysis.M_max.max() == pytest.approx(P * L / 8)
+
+
+def test_redistribution_keeps_equilibrium():
+    analysis = analyse_beam(Beam((L, L)), [LoadCase((w, w))], rdp=15)
+    assert analysis.support_moments[0, 1] == pytest.approx(-0.85 * w * L * L / 8)
+    assert analysis.elastic_support_moments[0, 1] == pytest.approx(-w * L * L / 8)
+    # Free moment wL²/8 less half the support moment at midspan
+    midspan = analysis.span(0).start + (analysis.span(0).stop - analysis.span(0).start) // 2
+    assert analysis.M[0, midspan] == pytest.approx(w * L * L / 8 + analysis.support_moments[0, 1] / 2)
@@ -0,0 +1,42 @@
+from ec2_cache import DesignCache, canonical_inputs, case_key
+from ec2_design import BarLayer, Loads, Material, Reinforcement, Section, design_bending
+
+MATERIAL = Material(30)
+SECTION = Section(300, 500, d_w=10)
+REINFORCEMENT = Reinforcement([BarLayer(20, 4)], [BarLayer(12, 2)])
+LOADS = Loads(uls_m_ed=180)
+
+
+def key(material=MATERIAL, section=SECTION, reinforcement=REINFORCEMENT, loads=LOADS):
+    return case_key(material, section, reinforcement, loads)
+
+
+def test_numbers_typed_differently_share_a_key():
+    assert key(Material(30.0, f_yk_main='500')) == key()
+    assert key(section=Section('300', 500.0, d_w=10.0)) == key()
+    assert key(section=Section(300, 500, d_w=10, rdp=-0.0)) == key(section=Section(300, 500, d_w=10, rdp=0.0))
+
+
+def test_empty_layers_are_dropped():
+    padded = Reinforcement([BarLayer(20, 4), BarLayer(0, 3), BarLayer(16, 0)], [BarLayer(12, 2), BarLayer(0, 0)])
+    assert key(reinforcement=padded) == key()
+
+
+def test_only_the_bending_load_is_keyed():
+    assert key(loads=Loads(uls_m_ed=180, sls_m_ed=120, v_ed=90)) == key()
+    assert key(loads=Loads(uls_m_ed=181)) != key()
+
+
+def test_inputs_and_order_that_matter_change_the_key():
+    assert key(Material(35)) != key()
+    swapped = Reinforcement([BarLayer(12, 2)], [BarLayer(20, 4)])
+    assert key(reinforcement=swapped) != key()
+    assert canonical_inputs(MATERIAL, SECTION, REINFORCEMENT, LOADS)['tension'] == [[20.0, 4]]
+
+
+def test_cache_returns_the_stored_result():
+    cache = DesignCache(maxsize=8)
+    first = cache.design_bending(MATERIAL, SECTION, REINFORCEMENT, LOADS)
+    again = cache.design_bending(Material(30.0), SECTION, REINFORCEMENT, Loads(uls_m_ed=180.0, sls_m_ed=50))
+    assert again == first == design_bending(MATERIAL, SECTION, REINFORCEMENT, LOADS)
+    assert len(cache) == 1
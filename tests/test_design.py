@@ -0,0 +1,45 @@
+import random
+
+import pytest
+
+from ec2_design import (BarLayer, LayerGroup, Reinforcement, Section, geometry_from_centroids, layer_areas,
+                        layer_centroid, section_geometry)
+
+
+def test_layer_centroid_spacing():
+    # Second layer centre at 20 + max(25, 20) + 16 / 2 from the outer face of the first
+    A_total, y = layer_centroid(((20, 1000.0), (16, 500.0)))
+    assert A_total == 1500.0
+    assert y == pytest.approx((1000 * 10 + 500 * (20 + 25 + 8)) / 1500)
+
+
+def test_empty_compression_group_is_float_zero():
+    geometry = section_geometry(Section(300, 500, d_w=10), Reinforcement([BarLayer(20, 3)]))
+    assert geometry.compression_layers == ()
+    assert type(geometry.A_sc_total) is float and geometry.A_sc_total == 0.0
+    assert type(geometry.y_c) is float and geometry.y_c == 0.0
+    assert layer_centroid(()) == (0.0, 0.0)
+    assert all(type(v) is float for v in layer_centroid(()))
+
+
+def test_no_tension_steel_is_rejected():
+    with pytest.raises(ValueError, match="tension reinforcement"):
+        section_geometry(Section(300, 500), Reinforcement([BarLayer(20, 0)]))
+
+
+def test_layer_group_edits_match_a_full_recompute():
+    # Any sequence of row edits gives exactly the numbers of layer_centroid on the rows left
+    rnd = random.Random(0)
+    group, rows = LayerGroup(4), [None] * 4
+    section = Section(300, 600, d_w=10)
+    for _ in range(300):
+        i = rnd.randrange(4)
+        rows[i] = rnd.choice([None, BarLayer(0, 3), BarLayer(rnd.choice((10, 16, 20, 32)), rnd.randint(0, 5))])
+        group.set(i, rows[i])
+        layers = layer_areas(row for row in rows if row is not None)
+        assert group.layers == layers
+        assert group.centroid() == layer_centroid(layers)
+        if layers:
+            reinforcement = Reinforcement([row for row in rows if row is not None])
+            assert geometry_from_centroids(section, group.layers, group.centroid(), (), (0.0, 0.0)) == \
+                section_geometry(section, reinforcement)
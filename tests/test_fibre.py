@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from ec2_bench import random_cases
+from ec2_design import BarLayer, Loads, Material, Reinforcement, Section, design_bending
+from ec2_fibre import design_fibre, fibre_analysis_batch, fibre_analysis_cases, stress_block_factors
+
+
+def test_parabola_rectangle_block_up_to_c50():
+    # The exact integrals are α = 17/21 and β = 99/238 for every class up to C50/60
+    alpha, beta = stress_block_factors(np.array([12.0, 30.0, 50.0]))
+    assert alpha == pytest.approx(17 / 21, rel=1e-4)
+    assert beta == pytest.approx(99 / 238, rel=1e-4)
+
+
+def test_grid_lookup_matches_direct_integration():
+    f_ck = np.random.default_rng(0).uniform(12, 95, 200)
+    batch = fibre_analysis_batch(300, 500, f_ck, 500, np.full((200, 1), 450.0), np.full((200, 1), 1500.0))
+    for i in range(0, 200, 20):
+        alpha, beta = (v[0] for v in stress_block_factors(f_ck[i:i + 1]))
+        f_cd = 0.85 * f_ck[i] / 1.5
+        x = batch.x[i]
+        assert batch.concrete_force[i] == pytest.approx(alpha * 300 * f_cd * x, rel=1e-4)
+        # The steel balances the concrete, so M_Rd is that force times the lever arm
+        assert batch.M_Rd[i] == pytest.approx(alpha * 300 * f_cd * x * (450 - beta * x) / 1e6, rel=1e-4)
+
+
+@pytest.mark.parametrize("f_ck, M_Ed", [(20, 80), (20, 150), (30, 150), (30, 250), (40, 150), (40, 250), (50, 250)])
+def test_fibre_agrees_with_simplified_check_up_to_c50(f_ck, M_Ed):
+    # A_s_req of the rectangular block, as one layer at d, is within 1 % of M_Ed in the fibre engine
+    simplified = design_bending(Material(f_ck), Section(300, 500, d_w=10), Reinforcement([BarLayer(16, 3)]),
+                                Loads(uls_m_ed=M_Ed))
+    assert simplified.section_type.startswith('Singly')
+    assert simplified.z_m < 0.95 * simplified.d_eff
+    batch = fibre_analysis_batch(300, 500, f_ck, 500, [[simplified.d_eff]], [[simplified.A_s_req]], M_Ed=M_Ed)
+    assert batch.converged[0]
+    assert batch.utilisation[0] == pytest.approx(1.0, abs=0.01)
+
+
+def test_batch_matches_scalar():
+    cases = random_cases(150, seed=5)
+    batch = fibre_analysis_cases(cases)
+    checked = 0
+    for i, case in enumerate(cases):
+        if not batch.valid[i]:
+            continue
+        scalar, result = design_fibre(*case), batch.result(i)
+        for name in ('x', 'M_Rd', 'utilisation', 'x_limit'):
+            assert getattr(result, name) == pytest.approx(getattr(scalar, name), rel=1e-6), name
+        assert result.tension_strains == pytest.approx(scalar.tension_strains, rel=1e-6)
+        checked += 1
+    assert checked > 100
@@ -0,0 +1,59 @@
+import itertools
+import math
+import random
+
+import pytest
+
+from ec2_design import BarLayer, Loads, Material, Reinforcement, Section, design_bending
+from ec2_optimize import bars_across_width, optimize_reinforcement
+
+DIAMETERS = (10, 16, 25)
+
+
+def arrangements(section, max_layers):
+    options = [BarLayer(d, n) for d in DIAMETERS for n in range(2, bars_across_width(section, d) + 1)]
+    found = [layers for k in range(1, max_layers + 1) for layers in itertools.product(options, repeat=k)]
+    return sorted(found, key=lambda layers: sum(layer.area for layer in layers))
+
+
+def exhaustive_cost(material, section, loads, max_layers):
+    # Cheapest passing area over every ordered arrangement on both faces
+    tension = arrangements(section, max_layers)
+    best = math.inf
+    for compression in [()] + arrangements(section, max_layers):
+        compression_area = sum(layer.area for layer in compression)
+        if compression_area >= best:
+            break
+        for layers in tension:
+            area = compression_area + sum(layer.area for layer in layers)
+            if area >= best:
+                break
+            try:
+                result = design_bending(material, section, Reinforcement(layers, compression), loads)
+            except (ValueError, ZeroDivisionError):
+                continue
+            if result.passed:
+                best = area
+                break
+    return best
+
+
+def test_known_mixed_layer_design():
+    # 3H20 + 2H10 was the old answer; a layer of smaller bars first is cheaper
+    result = optimize_reinforcement(Material(30), Section(300, 600, d_w=8), Loads(uls_m_ed=227.9))
+    assert result.cost == pytest.approx(1080.7, abs=0.1)
+    assert result.result.passed
+
+
+@pytest.mark.parametrize("seed", range(12))
+def test_matches_exhaustive_search(seed):
+    rnd = random.Random(seed)
+    material = Material(rnd.choice([25, 30, 40, 50, 60, 80]))
+    section = Section(rnd.choice([250, 300]), rnd.choice([400, 500, 600]), d_w=10, rdp=rnd.choice([0, 15, 30]))
+    loads = Loads(uls_m_ed=round(rnd.uniform(40, 450), 1))
+    expected = exhaustive_cost(material, section, loads, 2)
+    try:
+        cost = optimize_reinforcement(material, section, loads, diameters=DIAMETERS, max_layers=2).cost
+    except ValueError:
+        cost = math.inf
+    assert cost == pytest.approx(expected, rel=1e-9)
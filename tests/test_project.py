@@ -0,0 +1,39 @@
+import json
+import math
+
+from ec2_design import BarLayer, Loads, Material, Reinforcement, Section
+from ec2_project import Project, main, result_json
+
+
+def reject_constant(name):
+    raise ValueError(f"non-standard JSON constant {name}")
+
+
+def test_result_json_writes_non_finite_values_as_null():
+    text = result_json({'a': math.inf, 'b': [1.0, -math.inf, math.nan], 'c': {'d': 2.5}, 'e': 'ok'})
+    assert json.loads(text, parse_constant=reject_constant) == {'a': None, 'b': [1.0, None, None],
+                                                                'c': {'d': 2.5}, 'e': 'ok'}
+
+
+def test_export_round_trips_non_finite_results_as_null(tmp_path, capsys):
+    path = str(tmp_path / 'frame.prj')
+    with Project(path) as project:
+        project.put_material('C30', Material(30))
+        project.put_section('300x500', Section(300, 500, d_w=10))
+        # No link spacing given, so the shear link utilisation is infinite
+        project.put_reinforcement('4H20', Reinforcement([BarLayer(20, 4)]), legs=0)
+        project.put_loads('L1', Loads(uls_m_ed=150, v_ed=120))
+        project.add_member('B1', 'C30', '300x500', '4H20', 'L1')
+        assert project.recompute(workers=1) == 1
+        stored = project.result('B1')
+        project.save()
+    assert stored['shear']['link_utilisation'] is None
+
+    output = tmp_path / 'results.jsonl'
+    assert main(['export', path, '-o', str(output)]) == 0
+    lines = output.read_text(encoding='utf-8').splitlines()
+    assert len(lines) == 1
+    record = json.loads(lines[0], parse_constant=reject_constant)
+    assert record['id'] == 'B1'
+    assert record['shear']['link_utilisation'] is None
+    assert record['bending'] == stored['bending']
@@ -0,0 +1,46 @@
+import math
+
+import pytest
+
+from ec2_shear import shear_design_batch
+
+# 300 x 500 (d) beam, C30/37, ρ_l = 1 %, B500 links, V_Ed = 300 kN
+b, d, A_sl, f_ck, f_ywk = 300, 500, 1500, 30, 500
+
+
+def test_concrete_resistance_by_hand():
+    result = shear_design_batch(300, b, d, A_sl, f_ck, f_ywk)
+    k = 1 + math.sqrt(200 / d)
+    v_Rd_c = 0.18 / 1.5 * k * (100 * 0.01 * f_ck) ** (1 / 3)
+    assert v_Rd_c > 0.035 * k ** 1.5 * math.sqrt(f_ck)
+    assert result.V_Rd_c[0] == pytest.approx(v_Rd_c * b * d / 1e3, rel=1e-9)
+    assert result.V_Rd_c[0] == pytest.approx(91.30, abs=0.01)
+
+
+def test_strut_and_links_by_hand():
+    result = shear_design_batch(300, b, d, A_sl, f_ck, f_ywk)
+    z, f_cd, f_ywd = 0.9 * d, 0.85 * f_ck / 1.5, f_ywk / 1.15
+    strut = b * z * 0.6 * (1 - f_ck / 250) * f_cd / 1e3
+    # 300 kN is well below the strut at cot θ = 2.5, so θ stays at its flattest
+    assert result.cot_theta[0] == 2.5
+    assert result.V_Rd_max_45[0] == pytest.approx(strut / 2)
+    assert result.V_Rd_max[0] == pytest.approx(strut / (2.5 + 0.4))
+    assert result.V_Rd_max[0] == pytest.approx(417.85, abs=0.01)
+    assert result.A_sw_s_req[0] == pytest.approx(300e3 / (z * f_ywd * 2.5))
+    assert result.A_sw_s_min[0] == pytest.approx(0.08 * math.sqrt(f_ck) / f_ywk * b)
+    assert result.s_max[0] == 0.75 * d
+
+
+def test_link_spacing_and_resistance():
+    # H10 links, two legs at 200 mm
+    A_sw = 2 * math.pi * 25
+    result = shear_design_batch(300, b, d, A_sl, f_ck, f_ywk, A_sw=A_sw, s=200)
+    assert result.V_Rd_s[0] == pytest.approx(A_sw / 200 * 0.9 * d * (f_ywk / 1.15) * 2.5 / 1e3)
+    assert result.s_req[0] == pytest.approx(A_sw / (300e3 / (0.9 * d * f_ywk / 1.15 * 2.5)))
+    assert result.passed[0]
+
+
+def test_concrete_only_below_v_rd_c():
+    result = shear_design_batch(50, b, d, A_sl, f_ck, f_ywk)
+    assert result.concrete_only[0]
+    assert result.A_sw_s_req[0] == pytest.approx(result.A_sw_s_min[0])
@@ -0,0 +1,48 @@
+import pytest
+
+from ec2_torsion import torsion_design_batch
+
+# 300 x 600 beam, d = 550, bars 50 mm in from the faces, C30/37, B500
+b, h, d, A_s, edge, f_ck, f_yk = 300, 600, 550, 1500, 50, 30, 500
+# t_ef = max(A / u, 2 x 50) = 100, so A_k = 200 x 500 and u_k = 1400
+A_k, u_k, t_ef = 200 * 500, 1400, 100
+f_cd, f_yd = 0.85 * f_ck / 1.5, f_yk / 1.15
+torsion_strut = 2 * 0.6 * (1 - f_ck / 250) * f_cd * A_k * t_ef / 1e6
+shear_strut = b * 0.9 * d * 0.6 * (1 - f_ck / 250) * f_cd / 1e3
+
+
+def check(T_Ed, V_Ed, **kwargs):
+    return torsion_design_batch(T_Ed, V_Ed, b, h, d, A_s, edge, f_ck, f_yk, f_yk, **kwargs)
+
+
+def test_thin_walled_section_and_cracking_torque():
+    result = check(40, 0)
+    assert (result.t_ef[0], result.A_k[0], result.u_k[0]) == (t_ef, A_k, u_k)
+    f_ctd = 0.7 * 0.30 * f_ck ** (2 / 3) / 1.5
+    assert result.T_Rd_c[0] == pytest.approx(2 * A_k * t_ef * f_ctd / 1e6)
+    assert result.T_Rd_c[0] == pytest.approx(27.03, abs=0.01)
+
+
+def test_torsion_steel_by_hand():
+    result = check(40, 0)
+    assert not result.concrete_only[0]
+    assert result.cot_theta[0] == 2.5
+    assert result.T_Rd_max[0] == pytest.approx(torsion_strut / (2.5 + 0.4))
+    assert result.A_sl_req[0] == pytest.approx(40e6 * u_k * 2.5 / (2 * A_k * f_yd))
+    assert result.A_sl_req[0] == pytest.approx(1610.0)
+    assert result.A_t_s_req[0] == pytest.approx(40e6 / (2 * A_k * f_yd * 2.5))
+    assert result.interaction[0] == pytest.approx(2 * 40 / torsion_strut)
+
+
+def test_interaction_adds_torsion_and_shear():
+    # 6.29 at θ = 45°: T / T_Rd,max + V / V_Rd,max with both resistances at sin θ cos θ = 1/2
+    result = check(40, 300)
+    assert result.interaction[0] == pytest.approx(2 * (40 / torsion_strut + 300 / shear_strut))
+    assert result.interaction[0] == pytest.approx(0.8958, abs=1e-4)
+
+
+def test_interaction_takes_the_larger_of_design_and_face_values():
+    result = check(20, 300, T_Ef=40, V_Ef=350)
+    assert result.interaction[0] == pytest.approx(2 * (40 / torsion_strut + 350 / shear_strut))
+    result = check(40, 300, T_Ef=20, V_Ef=250)
+    assert result.interaction[0] == pytest.approx(2 * (40 / torsion_strut + 300 / shear_strut))